@@ -1,6 +1,14 @@
 from __future__ import annotations
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+import csv
+import os
+from pathlib import Path
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
+from typing import Iterator, Optional, List, Sequence, Tuple
+
+# Streaming CSV parse: rows are validated as they are read and handed out in batches
+CSV_BATCH_SIZE = int(os.getenv("APP_CSV_BATCH_SIZE", "1000"))
+# stop collecting (and reading) after this many bad rows
+CSV_MAX_ERRORS = int(os.getenv("APP_CSV_MAX_ERRORS", "100"))
 
 def split_csv_list(value: str | None) -> List[str]:
     if not value:
@@ -67,4 +75,124 @@ class SiteRow(BaseModel):
         return bool(self.srst_ip)
     
     def device_mobility_enabled_bool(self) -> bool:
-        return bool(self.mobility_subnet and self.mobility_mask)
\ No newline at end of file
+        return bool(self.mobility_subnet and self.mobility_mask)
+
+
+# One pydantic-core pass over a whole batch instead of a SiteRow(**row) call per row
+_SITE_ROWS = TypeAdapter(List[SiteRow])
+
+
+def validate_site_rows(records: List[dict], row_numbers: Optional[Sequence[int]] = None) -> Tuple[List[SiteRow], List[str]]:
+    """
+    Validate many CSV records at once. Returns the valid rows (in order) and a
+    "Row N: ..." message per invalid one, worded exactly as SiteRow(**record)
+    reports it. row_numbers gives N per record (default: 2, 3, ...).
+    """
+    rows, _, errors = _validate_records(records, row_numbers or range(2, len(records) + 2))
+    return rows, [message for _, message in errors]
+
+
+def _validate_records(
+    records: List[dict], numbers: Sequence[int]
+) -> Tuple[List[SiteRow], List[int], List[Tuple[int, str]]]:
+    """(valid rows, their numbers, (number, message) per invalid record)."""
+    try:
+        return _SITE_ROWS.validate_python(records), list(numbers), []
+    except ValidationError as e:
+        bad = {err["loc"][0] for err in e.errors() if err["loc"]}
+
+    errors: List[Tuple[int, str]] = []
+    for i in sorted(bad):
+        # bad rows are rare; validating them alone gives the per-row message
+        try:
+            SiteRow(**records[i])
+        except Exception as row_error:
+            errors.append((numbers[i], f"Row {numbers[i]}: {row_error}"))
+
+    good = [i for i in range(len(records)) if i not in bad]
+    return _SITE_ROWS.validate_python([records[i] for i in good]), [numbers[i] for i in good], errors
+
+
+class CsvValidationError(ValueError):
+    def __init__(self, message: str, errors: Optional[List[str]] = None, truncated: bool = False):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+        # True when reading stopped at max_errors; more rows may be bad
+        self.truncated = truncated
+
+
+def iter_site_batches(
+    path: Path,
+    batch_size: int = CSV_BATCH_SIZE,
+    max_errors: int = CSV_MAX_ERRORS,
+) -> Iterator[List[SiteRow]]:
+    """
+    Read a sites CSV row by row and yield validated SiteRows in batches, so the
+    raw file is never held in memory. Each batch is validated in one pass
+    (validate_site_rows). Bad rows are collected as "Row N: ..." (N is the CSV
+    line the row starts on, the header being line 1); once max_errors are seen
+    reading stops, and CsvValidationError is raised after the last good batch.
+    """
+    for _, batch in iter_numbered_site_batches(path, batch_size, max_errors):
+        yield batch
+
+
+def iter_numbered_site_batches(
+    path: Path,
+    batch_size: int = CSV_BATCH_SIZE,
+    max_errors: int = CSV_MAX_ERRORS,
+) -> Iterator[Tuple[List[int], List[SiteRow]]]:
+    """iter_site_batches, each batch with the CSV line number of every row."""
+    batch_size = max(1, batch_size)
+    with open(path, "r", encoding="utf-8-sig", newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if not header:
+            raise CsvValidationError("CSV appears to have no header row")
+        # normalize keys to lower snake-ish (assume headers already match)
+        fields = [h.strip() for h in header]
+        width = len(fields)
+
+        records: List[dict] = []
+        numbers: List[int] = []
+        errors: List[str] = []
+        column_errors: List[Tuple[int, str]] = []
+
+        def flush() -> Tuple[List[int], List[SiteRow]]:
+            batch, lines, batch_errors = _validate_records(records, numbers)
+            errors.extend(m for _, m in sorted(column_errors + batch_errors, key=lambda e: e[0]))
+            if len(errors) >= max_errors:
+                raise CsvValidationError("CSV validation failed", errors[:max_errors], truncated=True)
+            return lines, batch
+
+        last_line = reader.line_num
+        for values in reader:
+            # a quoted value can span lines; the row is numbered by the line it starts on
+            idx, last_line = last_line + 1, reader.line_num
+            if not values:
+                continue  # blank line
+            if len(values) > width:
+                # kept in row order with this batch's validation errors
+                column_errors.append((idx, f"Row {idx}: expected {width} columns, got {len(values)}"))
+                if len(errors) + len(column_errors) >= max_errors:
+                    errors.extend(m for _, m in column_errors)
+                    raise CsvValidationError("CSV validation failed", errors, truncated=True)
+                continue
+            if len(values) < width:
+                values = values + [None] * (width - len(values))
+            records.append({k: (v.strip() if isinstance(v, str) else v) for k, v in zip(fields, values)})
+            numbers.append(idx)
+
+            if len(records) >= batch_size:
+                lines, batch = flush()
+                if batch:
+                    yield lines, batch
+                records, numbers, column_errors = [], [], []
+
+        if records or column_errors:
+            lines, batch = flush()
+            if batch:
+                yield lines, batch
+    if errors:
+        raise CsvValidationError("CSV validation failed", errors)
@@ -3,6 +3,8 @@ import os
 import sqlite3
 from pathlib import Path
 
+from app.csv_schema import SiteRow
+
 def get_db_path() -> str:
     data_dir = os.getenv("APP_DATA_DIR", "/data")
     Path(data_dir).mkdir(parents=True, exist_ok=True)
@@ -37,9 +39,51 @@ def init_db() -> None:
             created_at TEXT NOT NULL
         )
         """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            plan_id TEXT NOT NULL,
+            env_name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            params_json TEXT,
+            result_json TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_plan ON jobs(plan_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_plans_env ON plans(env_name, created_at)")
+        # validated CSV rows per upload (see app.site_store); one column per SiteRow field
+        site_columns = list(SiteRow.model_fields)
+        cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS sites (
+            upload_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            line INTEGER,
+            {", ".join(f"{c} TEXT" for c in site_columns)},
+            PRIMARY KEY (upload_id, seq)
+        )
+        """)
+        _ensure_columns(cur, "sites", site_columns)
+        # CSV line each row came from (NULL for rows stored before it was recorded)
+        _ensure_columns(cur, "sites", ["line"], "INTEGER")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sites_code ON sites(upload_id, site_code)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sites_state ON sites(upload_id, state)")
+        # NULL row_count: uploaded before rows were stored; parsed on first plan
+        _ensure_columns(cur, "uploads", ["row_count"], "INTEGER")
         conn.commit()
     finally:
         conn.close()
 
+def _ensure_columns(cur: sqlite3.Cursor, table: str, columns, sql_type: str = "TEXT") -> None:
+    """Add columns missing from a table created by an older version."""
+    existing = {r[1] for r in cur.execute(f"PRAGMA table_info({table})")}
+    for column in columns:
+        if column not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+
 def db_connect() -> sqlite3.Connection:
     return sqlite3.connect(get_db_path())
\ No newline at end of file
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# In-process progress bus. Worker threads (executions, rollbacks, jobs) publish;
+# SSE endpoints subscribe on the event loop. Channels are "<kind>:<plan_id>",
+# e.g. "execution:1234" or "rollback:1234".
+
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def channel_name(kind: str, plan_id: str) -> str:
+    return f"{kind}:{plan_id}"
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        """Must be called from the event loop that will consume the queue."""
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append((loop, queue))
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subs = self._subscribers.get(channel, [])
+            self._subscribers[channel] = [s for s in subs if s[1] is not queue]
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        """Thread-safe; a no-op when nobody is listening."""
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for loop, queue in subs:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # subscriber's loop already closed
+                pass
+
+
+bus = EventBus()
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def sse_stream(
+    channel: str,
+    snapshot: Callable[[], Optional[dict]],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    done_events: Tuple[str, ...] = ("finish",),
+    is_done: Callable[[dict], bool] = lambda state: False,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one channel: a snapshot of the current state first,
+    then every published event as it happens. Ends after a terminal event, or
+    right after the snapshot when is_done(snapshot) says nothing more will come.
+
+    The queue is subscribed before the snapshot is read so nothing is missed in
+    between; events whose "seq" the snapshot already covers are dropped.
+    """
+    queue = bus.subscribe(channel)
+    try:
+        state = await asyncio.to_thread(snapshot) or {"status": "NOT_STARTED"}
+        yield _sse("snapshot", state)
+        if is_done(state):
+            return
+
+        covered = state.get("seq", 0)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+
+            name = event.get("event", "message")
+            if name == "start" and event.get("header", {}).get("started_at") != state.get("started_at"):
+                covered = 0  # a new run restarts the numbering
+            elif event.get("seq", covered + 1) <= covered:
+                continue
+            yield _sse(name, event)
+            if name in done_events:
+                return
+    finally:
+        bus.unsubscribe(channel, queue)
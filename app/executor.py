@@ -1,12 +1,22 @@
 from __future__ import annotations
 from typing import Dict, Any, List, Tuple, Optional
-import os, json, tempfile
+import os, json, tempfile, threading
+from collections import defaultdict
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
 
+from app.integrations.ucm_axl import AxlDuplicateError
+from app.journal import Journal, KIND_EXECUTION, KIND_ROLLBACK, RESUME_KEEP_STATUSES, read_state
+
 
 EXECUTION_MODE = os.getenv("EXECUTION_MODE", "dry-run").lower()
-EXECUTIONS_DIR = os.getenv("APP_DATA_EXECUTIONS_DIR", "/data/executions")
+
+# Parallel execution of plan objects (1 = sequential, plan order;
+# 0 = follow the AXL client's adaptive concurrency limit)
+EXECUTION_WORKERS = int(os.getenv("EXECUTION_WORKERS", "1"))
+EXECUTION_MAX_WORKERS_PER_ENV = int(os.getenv("EXECUTION_MAX_WORKERS_PER_ENV", "8"))
 
 EXECUTABLE_TYPES = {
     "region",
@@ -21,13 +31,62 @@ EXECUTABLE_TYPES = {
     "device_mobility",
 }
 
-def handle_region(obj, client, apply):
+# Rollback removes one type at a time, referencing objects before what they reference
+BACKOUT_ORDER = [
+    "device_mobility",
+    "device_pool",
+    "mrgl",
+    "mrg",
+    "css",
+    "partition",
+    "srst",
+    "physical_location",
+    "location",
+    "region",
+]
+
+def _exists(obj_type: str, name: str, getter, exists_lookup=None) -> bool:
+    """
+    Answer from the preloaded lookup when it covers this type (O(1), no AXL call),
+    otherwise fall back to the live getXxx call.
+    """
+    if exists_lookup is not None:
+        covers = getattr(exists_lookup, "covers", None)
+        if covers is None or covers(obj_type):
+            return bool(exists_lookup(obj_type, name))
+    return getter(name)
+
+
+class OptimisticLookup:
+    """
+    exists_lookup for optimistic creates: types the wrapped lookup does not cover
+    are assumed absent, so handlers skip the getXxx round trip and go straight to
+    add*. A duplicate fault on add is then reported as EXISTS.
+    """
+
+    def __init__(self, inner=None):
+        self.inner = inner
+
+    def covers(self, obj_type: str) -> bool:
+        return True
+
+    def __call__(self, obj_type: str, name: str) -> bool:
+        inner = self.inner
+        if inner is None:
+            return False
+        covers = getattr(inner, "covers", None)
+        if covers is not None and not covers(obj_type):
+            return False
+        return bool(inner(obj_type, name))
+
+
+def handle_region(obj, client, apply, exists_lookup=None):
     name = obj["name"]
 
     if not hasattr(client, "get_region"):
         return "PLANNED", "Region handler not implemented yet"
 
-    exists = client.get_region(name)
+    exists = _exists("region", name, client.get_region, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -38,13 +97,13 @@ def handle_region(obj, client, apply):
     return "CREATED", "Region created"
 
 
-def handle_location(obj, client, apply):
+def handle_location(obj, client, apply, exists_lookup=None):
     name = obj["name"]
 
     if not hasattr(client, "get_location"):
         return "PLANNED", "Location handler not implemented yet"
 
-    exists = client.get_location(name)
+    exists = _exists("location", name, client.get_location, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -55,14 +114,14 @@ def handle_location(obj, client, apply):
     return "CREATED", "Location created"
 
 
-def handle_physicallocation(obj, client, apply):
+def handle_physicallocation(obj, client, apply, exists_lookup=None):
     name = obj["name"]
     desc = obj.get("inputs", {}).get("description")
 
     if not hasattr(client, "get_physicallocation"):
         return "PLANNED", "Physical location handler not implemented yet"
 
-    exists = client.get_physicallocation(name)
+    exists = _exists("physical_location", name, client.get_physicallocation, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -73,14 +132,14 @@ def handle_physicallocation(obj, client, apply):
     return "CREATED", "Physical location created"
 
 
-def handle_srst(obj, client, apply):
+def handle_srst(obj, client, apply, exists_lookup=None):
     name = obj["name"]
     ip = obj.get("inputs", {}).get("ip")
 
     if not hasattr(client, "get_srst"):
         return "PLANNED", "SRST handler not implemented yet"
 
-    exists = client.get_srst(name)
+    exists = _exists("srst", name, client.get_srst, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -91,11 +150,11 @@ def handle_srst(obj, client, apply):
     return "CREATED", "SRST reference created"
 
 
-def handle_partition(obj: dict, client, apply: bool):
+def handle_partition(obj: dict, client, apply: bool, exists_lookup=None):
     name = obj["name"]
     desc = obj.get("description")
 
-    exists = client.get_partition(name)
+    exists = _exists("partition", name, client.get_partition, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -106,12 +165,12 @@ def handle_partition(obj: dict, client, apply: bool):
     return "CREATED", "Partition created"
 
 
-def handle_css(obj: dict, client, apply: bool):
+def handle_css(obj: dict, client, apply: bool, exists_lookup=None):
     name = obj["name"]
     desc = obj.get("description")
     members = obj.get("inputs", {}).get("members_partitions") or []
 
-    exists = client.get_css(name)
+    exists = _exists("css", name, client.get_css, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -122,7 +181,7 @@ def handle_css(obj: dict, client, apply: bool):
     return "CREATED", "CSS created"
 
 
-def handle_mrg(obj, client, apply):
+def handle_mrg(obj, client, apply, exists_lookup=None):
     name = obj["name"]
     desc = obj.get("description")
     members = obj.get("inputs", {}).get("members") or []
@@ -130,7 +189,7 @@ def handle_mrg(obj, client, apply):
     if not hasattr(client, "get_mediaresourcegroup"):
         return "PLANNED", "MRG handler not implemented yet"
 
-    exists = client.get_mediaresourcegroup(name)
+    exists = _exists("mrg", name, client.get_mediaresourcegroup, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -141,14 +200,14 @@ def handle_mrg(obj, client, apply):
     return "CREATED", "MRG created"
 
 
-def handle_mrgl(obj, client, apply):
+def handle_mrgl(obj, client, apply, exists_lookup=None):
     name = obj["name"]
     members = obj.get("inputs", {}).get("members") or []
 
     if not hasattr(client, "get_mediaresourcelist"):
         return "PLANNED", "MRGL handler not implemented yet"
 
-    exists = client.get_mediaresourcelist(name)
+    exists = _exists("mrgl", name, client.get_mediaresourcelist, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -159,14 +218,14 @@ def handle_mrgl(obj, client, apply):
     return "CREATED", "MRGL created"
 
 
-def handle_devicepool(obj, client, apply):
+def handle_devicepool(obj, client, apply, exists_lookup=None):
     name = obj["name"]
     inp = obj.get("inputs", {})
 
     if not hasattr(client, "get_devicepool"):
         return "PLANNED", "Device Pool handler not implemented yet"
 
-    exists = client.get_devicepool(name)
+    exists = _exists("device_pool", name, client.get_devicepool, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -193,7 +252,7 @@ def handle_devicepool(obj, client, apply):
     # )
 
 
-def handle_dmi(obj, client, apply):
+def handle_dmi(obj, client, apply, exists_lookup=None):
     name = obj["name"]
     subnet = obj.get("inputs", {}).get("subnet")
     mask = obj.get("inputs", {}).get("mask")
@@ -202,7 +261,7 @@ def handle_dmi(obj, client, apply):
     if not hasattr(client, "get_devicemobility"):
         return "PLANNED", "Device Mobility handler not implemented yet"
 
-    exists = client.get_devicemobility(name)
+    exists = _exists("device_mobility", name, client.get_devicemobility, exists_lookup)
     if exists:
         return "EXISTS", None
 
@@ -278,106 +337,333 @@ def count_total_steps(plan: dict) -> int:
                 count += 1
     return count
 
-def write_execution(execution: dict):
-    Path(EXECUTIONS_DIR).mkdir(parents=True, exist_ok=True)
-    path = Path(EXECUTIONS_DIR) / f"{execution['plan_id']}.json"
-    with open(path, "w") as f:
-        json.dump(execution, f, indent=2)
+def _execute_object(obj: dict, site_code: str, client, apply: bool, exists_lookup=None, optimistic: bool = False) -> dict:
+    result = {
+        "site_code": site_code,
+        "type": obj["type"],
+        "name": obj["name"],
+        "action": obj["action"],
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+    handler = HANDLERS.get(obj["type"])
+
+    if handler is None:
+        result["status"] = "PLANNED"
+        result["message"] = "No handler registered"
+        return result
+
+    # only real creates can be optimistic; a dry run still needs the answer up front
+    lookup = OptimisticLookup(exists_lookup) if optimistic and apply else exists_lookup
+
+    try:
+        try:
+            status, message = handler(obj, client, apply, exists_lookup=lookup)
+        except AxlDuplicateError:
+            status, message = "EXISTS", "Already exists (duplicate on add)"
+            if hasattr(exists_lookup, "add"):
+                exists_lookup.add(obj["type"], obj["name"])
+        result["status"] = status
+        if message:
+            result["message"] = message
+
+        if status == "CREATED":
+            # keep the preloaded inventory truthful for later sites
+            if hasattr(exists_lookup, "add"):
+                exists_lookup.add(obj["type"], obj["name"])
+
+            rb = ROLLBACK_MAP.get(obj["type"])
+            if rb:
+                result["rollback"] = {
+                    "action": "delete",
+                    "method": rb["method"],
+                    "args": rb["args"](obj),
+                }
+
+    except Exception as e:
+        result["status"] = "FAILED"
+        result["message"] = str(e)
+
+    return result
+
+
+_ENV_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_ENV_SLOTS_LOCK = threading.Lock()
+
+def _env_slots(env_name: Optional[str]) -> threading.BoundedSemaphore:
+    """Per-env cap on objects in flight, shared by every execution against that env."""
+    with _ENV_SLOTS_LOCK:
+        key = env_name or ""
+        if key not in _ENV_SLOTS:
+            _ENV_SLOTS[key] = threading.BoundedSemaphore(EXECUTION_MAX_WORKERS_PER_ENV)
+        return _ENV_SLOTS[key]
+
+
+def _node_key(obj: dict) -> str:
+    return obj.get("key") or f"{obj['type']}:{obj['name']}"
 
-def execute_plan(plan: dict, client, apply: bool = False) -> dict:
+
+def build_execution_graph(plan: dict) -> Tuple[List[dict], List[set], List[dict]]:
+    """
+    Turn a plan into schedulable nodes.
+
+    Returns (nodes, deps, skipped): nodes are the executable create objects in plan
+    order, deps[i] the indexes node i must wait for, skipped the objects that are not
+    executed at all. depends_on entries are "type:name" keys; plans stored before the
+    name-level graph carry bare types, which resolve to same-site objects of that type.
+    Keys outside the plan (globals, skipped objects) are treated as already satisfied.
+    """
+    nodes: List[dict] = []
+    skipped: List[dict] = []
+
+    for site in plan.get("sites", []):
+        for obj in site.get("objects", []):
+            if obj["action"] != "create" or obj["type"] not in EXECUTABLE_TYPES:
+                skipped.append({"site_code": site["site_code"], "obj": obj})
+                continue
+            nodes.append({"site_code": site["site_code"], "obj": obj, "key": _node_key(obj)})
+
+    primary: Dict[str, int] = {}
+    by_site_type: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+    for i, n in enumerate(nodes):
+        primary.setdefault(n["key"], i)
+        by_site_type[(n["site_code"], n["obj"]["type"])].append(i)
+
+    deps: List[set] = []
+    for i, n in enumerate(nodes):
+        d = set()
+        for dep in n["obj"].get("depends_on") or []:
+            if ":" in dep:
+                j = primary.get(dep)
+                if j is not None:
+                    d.add(j)
+            else:
+                d.update(by_site_type.get((n["site_code"], dep), []))
+        # The same object can appear in several sites; later copies wait for the first
+        first = primary[n["key"]]
+        if first != i:
+            d.add(first)
+        d.discard(i)
+        deps.append(d)
+
+    return nodes, deps, skipped
+
+
+def execute_plan(
+    plan: dict,
+    client,
+    apply: bool = False,
+    exists_lookup=None,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    control=None,
+    optimistic: bool = False,
+) -> dict:
+    """
+    Execute a plan as a dependency graph: an object is started as soon as every
+    object it references has finished, so independent objects run concurrently
+    across and within sites. workers bounds this run (default EXECUTION_WORKERS,
+    1 = one object at a time in plan order, 0 = as many as the client's adaptive
+    AXL limiter currently allows); EXECUTION_MAX_WORKERS_PER_ENV caps objects in
+    flight across all executions against the same env.
+
+    With resume=True the previous journal for this plan is the checkpoint: objects
+    already CREATED/EXISTS are not touched again and the run continues with the
+    first unfinished nodes.
+
+    control (app.jobs.JobControl) lets a background job pause or cancel the run:
+    in-flight objects finish, nothing new starts.
+
+    optimistic=True issues add* without a preceding getXxx for types the
+    exists_lookup does not cover (one AXL call per new object instead of two);
+    a duplicate-name fault is recorded as EXISTS, exactly as if get had found it.
+    """
     plan_id = plan["plan_id"]
+    env_name = plan.get("env_name")
 
     total_objects = count_total_steps(plan)
+    if workers is None:
+        workers = EXECUTION_WORKERS
+    limiter = getattr(client, "limiter", None) if workers == 0 else None
+    workers = EXECUTION_MAX_WORKERS_PER_ENV if limiter else max(1, min(workers, EXECUTION_MAX_WORKERS_PER_ENV))
+
+    def max_running() -> int:
+        if limiter is None:
+            return workers
+        # one spare object so the limiter sees saturation and is allowed to grow
+        return max(1, min(workers, limiter.limit + 1))
 
     execution = {
         "plan_id": plan_id,
-        "env_name": plan.get("env_name"),
+        "env_name": env_name,
         "started_at": datetime.utcnow().isoformat(),
         "finished_at": None,
         "status": "IN_PROGRESS",
         "total_steps": total_objects,
         "completed_steps": 0,
         "current_step": None,
+        "workers": "adaptive" if limiter else workers,
+        "optimistic": optimistic,
         "results": []
     }
 
-    write_execution(execution)
-
-    results = []
-
-    for site in plan.get("sites", []):
-        site_code = site["site_code"]
-
-        for obj in site.get("objects", []):
-
-            # Skip non-create or non-executable objects (don’t count toward progress)
-            if obj["action"] != "create" or obj["type"] not in EXECUTABLE_TYPES:
-                result = {
-                    "site_code": site_code,
-                    "type": obj["type"],
-                    "name": obj["name"],
-                    "action": obj["action"],
-                    "status": "SKIPPED",
-                    "message": "Not executable",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                execution["results"].append(result)
-                continue
-
-            # 🔹 Update CURRENT STEP
-            execution["current_step"] = {
-                "site_code": site_code,
-                "type": obj["type"],
-                "name": obj["name"]
-            }
-            write_execution(execution)
-
-            result = {
-                "site_code": site_code,
-                "type": obj["type"],
-                "name": obj["name"],
-                "action": obj["action"],
-                "timestamp": datetime.utcnow().isoformat()
-            }
+    nodes, deps, skipped = build_execution_graph(plan)
+
+    journal = Journal(plan_id, KIND_EXECUTION)
+    previous = read_state(plan_id, KIND_EXECUTION) if resume else None
+
+    # checkpoint: key -> number of finished occurrences from the previous run
+    finished_before: Dict[str, int] = defaultdict(int)
+    if previous:
+        kept = [r for r in previous.get("results", []) if r.get("status") in RESUME_KEEP_STATUSES]
+        for r in kept:
+            if r["status"] in ("CREATED", "EXISTS"):
+                finished_before[f"{r['type']}:{r['name']}"] += 1
+                if r["status"] == "CREATED" and hasattr(exists_lookup, "add"):
+                    exists_lookup.add(r["type"], r["name"])
+
+        execution["started_at"] = previous.get("started_at") or execution["started_at"]
+        execution["resumed_at"] = datetime.utcnow().isoformat()
+        execution["results"] = kept
+        execution["completed_steps"] = sum(1 for r in kept if r["status"] != "SKIPPED")
+        journal.resume(execution, execution["completed_steps"], seq=previous.get("seq", 0))
+        skipped = []  # already journaled by the previous run
+    else:
+        journal.start(execution)
+
+    # Skip non-create or non-executable objects (don’t count toward progress)
+    for s in skipped:
+        obj = s["obj"]
+        result = {
+            "site_code": s["site_code"],
+            "type": obj["type"],
+            "name": obj["name"],
+            "action": obj["action"],
+            "status": "SKIPPED",
+            "message": "Not executable",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        execution["results"].append(result)
+        journal.result(result, counted=False)
 
-            handler = HANDLERS.get(obj["type"])
+    # batch lookups (SQL oracle) resolve every executable object up front
+    prefetch = getattr(exists_lookup, "prefetch", None)
+    if prefetch:
+        prefetch((n["obj"]["type"], n["obj"]["name"]) for n in nodes)
 
-            if handler is None:
-                result["status"] = "PLANNED"
-                result["message"] = "No handler registered"
-                execution["results"].append(result)
-                continue
+    results = []
+    state_lock = threading.Lock()
+    env_slots = _env_slots(env_name)
+
+    def run_node(i: int) -> dict:
+        n = nodes[i]
+        obj = n["obj"]
+
+        # 🔹 Update CURRENT STEP
+        current_step = {
+            "site_code": n["site_code"],
+            "type": obj["type"],
+            "name": obj["name"]
+        }
+        with state_lock:
+            execution["current_step"] = current_step
+        journal.step(current_step)
 
-            try:
-                status, message = handler(obj, client, apply)
-                result["status"] = status
-                if message:
-                    result["message"] = message
-
-                if status == "CREATED":
-                    rb = ROLLBACK_MAP.get(obj["type"])
-                    if rb:
-                        result["rollback"] = {
-                            "action": "delete",
-                            "method": rb["method"],
-                            "args": rb["args"](obj),
-                        }
-
-            except Exception as e:
-                result["status"] = "FAILED"
-                result["message"] = str(e)
+        with env_slots:
+            return _execute_object(obj, n["site_code"], client, apply, exists_lookup, optimistic)
 
+    def record(result: dict) -> None:
+        # 🔹 UPDATE PROGRESS
+        with state_lock:
             execution["results"].append(result)
             results.append(result)
-
-            # 🔹 UPDATE PROGRESS
             execution["completed_steps"] += 1
-            write_execution(execution)
-
-            # Optional: stop immediately on failure
-            # if result["status"] == "FAILED":
-            #     execution["status"] = "FAILED"
-            #     break
+        journal.result(result)
+
+    dependents: List[List[int]] = [[] for _ in nodes]
+    waiting = [len(d) for d in deps]
+    for i, d in enumerate(deps):
+        for j in d:
+            dependents[j].append(i)
+
+    status: Dict[int, str] = {}
+
+    # nodes finished by the previous run count as done without another AXL call
+    for i, n in enumerate(nodes):
+        if finished_before.get(n["key"], 0) > 0:
+            finished_before[n["key"]] -= 1
+            status[i] = "EXISTS"
+            for k in dependents[i]:
+                waiting[k] -= 1
+
+    ready = [i for i, w in enumerate(waiting) if w == 0 and i not in status]
+    heapq.heapify(ready)
+
+    def finish(i: int, result: dict) -> None:
+        record(result)
+        status[i] = result["status"]
+        for k in dependents[i]:
+            waiting[k] -= 1
+            if waiting[k] == 0 and k not in status:
+                heapq.heappush(ready, k)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"exec-{plan_id[:8]}") as pool:
+        running: Dict[Any, int] = {}
+
+        while ready or running:
+            if control is not None and control.cancelled:
+                ready.clear()
+
+            while ready and len(running) < max_running() and not (control is not None and control.paused):
+                i = heapq.heappop(ready)
+                n = nodes[i]
+
+                # don't attempt objects whose references failed (a copy of the same
+                # object in another site is not a reference, so it still gets its try)
+                failed_deps = [
+                    nodes[j]["key"] for j in sorted(deps[i])
+                    if status.get(j) == "FAILED" and nodes[j]["key"] != n["key"]
+                ]
+                if failed_deps:
+                    finish(i, {
+                        "site_code": n["site_code"],
+                        "type": n["obj"]["type"],
+                        "name": n["obj"]["name"],
+                        "action": n["obj"]["action"],
+                        "status": "FAILED",
+                        "message": f"Dependency failed: {', '.join(failed_deps)}",
+                        "timestamp": datetime.utcnow().isoformat()
+                    })
+                    continue
+
+                running[pool.submit(run_node, i)] = i
+
+            if not running:
+                if ready and control is not None and control.paused:
+                    control.wait_resumed(0.5)
+                    continue
+                break
+
+            # with a control, wake up periodically to notice pause/cancel
+            done, _ = wait(running, timeout=0.5 if control is not None else None, return_when=FIRST_COMPLETED)
+            for fut in done:
+                finish(running.pop(fut), fut.result())
+
+    cancelled = control is not None and control.cancelled
+
+    # anything left is part of a dependency cycle (or was never started after a cancel,
+    # in which case it stays out of the journal so a resume picks it up)
+    for i, n in enumerate(nodes):
+        if i not in status and not cancelled:
+            finish(i, {
+                "site_code": n["site_code"],
+                "type": n["obj"]["type"],
+                "name": n["obj"]["name"],
+                "action": n["obj"]["action"],
+                "status": "FAILED",
+                "message": "Dependency cycle",
+                "timestamp": datetime.utcnow().isoformat()
+            })
 
     # ===== FINALIZE EXECUTION =====
 
@@ -387,41 +673,54 @@ def execute_plan(plan: dict, client, apply: bool = False) -> dict:
     created = any(r["status"] == "CREATED" for r in execution["results"])
     failed = any(r["status"] == "FAILED" for r in execution["results"])
 
-    if failed and created:
+    if cancelled:
+        execution["status"] = "CANCELLED"
+    elif failed and created:
         execution["status"] = "PARTIAL_SUCCESS"
     elif failed:
         execution["status"] = "FAILED"
     else:
         execution["status"] = "SUCCESS"
 
-    write_execution(execution)
+    journal.finish(execution["status"], execution["finished_at"])
 
     return {
         "status": execution["status"],
         "results": results
     }
     
-def _write_json_atomic(path: Path, payload: dict) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(payload, indent=2))
-    tmp.replace(path)
+def _backout_tiers(steps: List[dict]) -> List[List[dict]]:
+    """
+    Group rollback steps into tiers that can each run concurrently, in
+    BACKOUT_ORDER. Types outside BACKOUT_ORDER go first, one step per tier,
+    newest first (steps arrive newest first).
+    """
+    by_type: Dict[str, List[dict]] = defaultdict(list)
+    unknown: List[List[dict]] = []
+    for s in steps:
+        if s.get("type") in BACKOUT_ORDER:
+            by_type[s["type"]].append(s)
+        else:
+            unknown.append([s])
+    return unknown + [by_type[t] for t in BACKOUT_ORDER if by_type.get(t)]
+
+
+def rollback_plan(plan_id: str, client, apply: bool = False, control=None) -> dict:
+    """
+    Undo everything an execution CREATED. Removals run one type at a time in
+    BACKOUT_ORDER; within a type they run concurrently, as many at once as the
+    client's adaptive AXL limiter allows.
+    """
+    execution = read_state(plan_id, KIND_EXECUTION)
+
+    if execution is None:
+        return {"status": "ERROR", "message": f"Execution not found: {plan_id}"}
 
-
-def rollback_plan(plan_id: str, client, apply: bool = False) -> dict:
-    exec_dir = Path(os.getenv("APP_DATA_EXECUTIONS_DIR", "/data/executions"))
-    exec_path = exec_dir / f"{plan_id}.json"
-
-    if not exec_path.exists():
-        return {"status": "ERROR", "message": f"Execution file not found: {exec_path}"}
-
-    execution = json.loads(exec_path.read_text())
     steps = execution.get("results", [])
 
     rollback_steps = [s for s in steps if s.get("status") == "CREATED" and s.get("rollback")]
     rollback_steps.reverse()
 
-    rb_path = exec_dir / f"{plan_id}.rollback.json"
     total_steps = len(rollback_steps)
 
     out = {
@@ -437,20 +736,14 @@ def rollback_plan(plan_id: str, client, apply: bool = False) -> dict:
     }
 
     # write initial status immediately so polling sees it
-    rb_path.write_text(json.dumps(out, indent=2))
+    journal = Journal(plan_id, KIND_ROLLBACK)
+    journal.start(out)
 
-    for idx, s in enumerate(rollback_steps, start=1):
+    def undo(s: dict) -> dict:
         rb = s["rollback"]
         method = rb.get("method")
         args = rb.get("args", {}) or {}
 
-        out["current_step"] = {
-            "type": s.get("type"),
-            "name": s.get("name"),
-            "site_code": s.get("site_code"),
-            "order": idx
-        }
-
         item = {
             "site_code": s.get("site_code"),
             "type": s.get("type"),
@@ -476,16 +769,55 @@ def rollback_plan(plan_id: str, client, apply: bool = False) -> dict:
             item["status"] = "FAILED"
             item["message"] = str(e)
 
+        return item
+
+    def record(item: dict) -> None:
         out["results"].append(item)
-        out["completed_steps"] = idx
+        out["completed_steps"] += 1
 
         # persist progress after each step
-        rb_path.write_text(json.dumps(out, indent=2))
+        journal.result(item)
+
+    limiter = getattr(client, "limiter", None)
+    workers = limiter.max_limit if apply and limiter is not None else 1
+
+    cancelled = False
+    order = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"rollback-{plan_id[:8]}") as pool:
+        for tier in _backout_tiers(rollback_steps):
+            running = set()
+            for s in tier:
+                # background jobs: wait here while paused, stop cleanly on cancel
+                if control is not None and not control.checkpoint():
+                    cancelled = True
+                    break
+
+                if len(running) >= workers:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        record(fut.result())
+
+                order += 1
+                out["current_step"] = {
+                    "type": s.get("type"),
+                    "name": s.get("name"),
+                    "site_code": s.get("site_code"),
+                    "order": order
+                }
+                journal.step(out["current_step"])
+                running.add(pool.submit(undo, s))
+
+            # finish this tier before removing the objects it references
+            for fut in wait(running).done:
+                record(fut.result())
+
+            if cancelled:
+                break
 
     out["finished_at"] = datetime.utcnow().isoformat()
     failed = any(r["status"] == "FAILED" for r in out["results"])
-    out["status"] = "FAILED" if failed else "SUCCESS"
+    out["status"] = "CANCELLED" if cancelled else ("FAILED" if failed else "SUCCESS")
     out["current_step"] = None
 
-    rb_path.write_text(json.dumps(out, indent=2))
-    return out
\ No newline at end of file
+    journal.finish(out["status"], out["finished_at"])
+    return out
@@ -0,0 +1,429 @@
+from __future__ import annotations
+import argparse
+import base64
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+import xml.etree.ElementTree as ET
+
+from app.integrations.ucm_axl import AXL_OBJECTS, AXL_SQL_TABLES
+
+# Local stand-in for the CUCM AXL endpoint, for exercising UcmAxlClient,
+# execute_plan and rollback_plan without a cluster:
+#
+#   python -m app.integrations.axl_simulator --port 8443 --latency lognormal:20:0.5 \
+#       --throttle-rate 0.02 --capacity 8
+#
+# then point an environment at http://127.0.0.1:8443. Speaks the operations this
+# repo sends: get/add/remove/list for every AXL_OBJECTS type, executeSQLQuery
+# ("select name from <table> where name in (...)") and getCCMVersion.
+
+SOAP_NS = "http://schemas.xmlsoap.org/soap/envelope/"
+AXL_NS = "http://www.cisco.com/AXL/API/14.0"
+SIM_CCM_VERSION = "14.0.1.13900-155"
+
+# AXL object name (e.g. "DevicePool") -> (returned element tag, planner type)
+_BY_AXL_NAME = {axl: (tag, obj_type) for obj_type, (axl, tag) in AXL_OBJECTS.items()}
+_BY_TABLE = {table: obj_type for obj_type, table in AXL_SQL_TABLES.items()}
+
+_SQL_IN = re.compile(
+    r"^\s*select\s+name\s+from\s+(\w+)\s+where\s+(name|lower\(name\))\s+in\s*\((.*)\)\s*$", re.I | re.S
+)
+_SQL_LITERAL = re.compile(r"'((?:[^']|'')*)'")
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Latency distribution in milliseconds -> sampler returning seconds.
+      fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA | exp:MEAN
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(a) for a in args.split(":") if a]
+    kind = kind.lower()
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(max(values[0], 1e-6))
+        return lambda: random.lognormvariate(mu, values[1]) / 1000
+    if kind == "exp" and len(values) == 1:
+        return lambda: random.expovariate(1 / max(values[0], 1e-6)) / 1000
+    raise ValueError(f"Unsupported latency spec: {spec!r}")
+
+
+@dataclass
+class SimulatorConfig:
+    host: str = "127.0.0.1"
+    port: int = 0  # 0 = pick a free port
+    read_latency: str = "fixed:0"
+    write_latency: str = "fixed:0"
+    throttle_rate: float = 0.0  # share of requests answered 503
+    fault_rate: float = 0.0  # share answered with a non-retryable AXL fault
+    reset_rate: float = 0.0  # share whose connection is dropped without an answer
+    # requests in flight beyond capacity slow every request down proportionally,
+    # and beyond 2x capacity are throttled (0 = unlimited)
+    capacity: int = 0
+    username: Optional[str] = None  # checked only when set
+    password: Optional[str] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class SimulatorStats:
+    requests: int = 0
+    by_op: Dict[str, int] = field(default_factory=dict)
+    throttled: int = 0
+    faults: int = 0
+    resets: int = 0
+    peak_in_flight: int = 0
+
+
+class AxlStore:
+    """In-memory CUCM objects: planner type -> name -> uuid."""
+
+    def __init__(self):
+        self._objects: Dict[str, Dict[str, str]] = {t: {} for t in AXL_OBJECTS}
+        self._lock = threading.Lock()
+
+    def seed(self, obj_type: str, names: Iterable[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._objects[obj_type].setdefault(name, str(uuid.uuid4()).upper())
+
+    def get(self, obj_type: str, name: str) -> Optional[str]:
+        return self._objects[obj_type].get(name)
+
+    def add(self, obj_type: str, name: str) -> Optional[str]:
+        """New uuid, or None when the name is taken."""
+        with self._lock:
+            if name in self._objects[obj_type]:
+                return None
+            pkid = str(uuid.uuid4()).upper()
+            self._objects[obj_type][name] = pkid
+            return pkid
+
+    def remove(self, obj_type: str, name: str) -> bool:
+        with self._lock:
+            return self._objects[obj_type].pop(name, None) is not None
+
+    def search(self, obj_type: str, pattern: str) -> List[Tuple[str, str]]:
+        # AXL searchCriteria use SQL LIKE wildcards
+        regex = re.compile(
+            "^" + "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern) + "$",
+            re.S,
+        )
+        with self._lock:
+            return sorted((n, u) for n, u in self._objects[obj_type].items() if regex.match(n))
+
+    def names(self, obj_type: str) -> List[str]:
+        with self._lock:
+            return sorted(self._objects[obj_type])
+
+    def counts(self) -> Dict[str, int]:
+        return {t: len(v) for t, v in self._objects.items()}
+
+
+def _envelope(inner: str) -> bytes:
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>'
+        f'<soapenv:Envelope xmlns:soapenv="{SOAP_NS}" xmlns:ns="{AXL_NS}"><soapenv:Body>{inner}'
+        f"</soapenv:Body></soapenv:Envelope>"
+    ).encode("utf-8")
+
+
+def _fault(message: str, code: int = 5007) -> bytes:
+    return _envelope(
+        "<soapenv:Fault><faultcode>soapenv:Server</faultcode>"
+        f"<faultstring>{escape(message)}</faultstring>"
+        f'<detail><axlError><axlcode>{code}</axlcode><axlmessage>{escape(message)}</axlmessage>'
+        "<request>simulated</request></axlError></detail></soapenv:Fault>"
+    )
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients dropping keep-alive connections (or simulated resets) are routine
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class AxlSimulator:
+    """
+    Threaded HTTP server speaking a subset of AXL over an AxlStore.
+
+        sim = AxlSimulator(SimulatorConfig(read_latency="fixed:5")).start()
+        client = UcmAxlClient(sim.url, "u", "p")
+        ...
+        sim.stop()
+    """
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, store: Optional[AxlStore] = None):
+        self.config = config or SimulatorConfig()
+        self.store = store or AxlStore()
+        self.stats = SimulatorStats()
+        self._rng = random.Random(self.config.seed)
+        self._read_latency = parse_latency(self.config.read_latency)
+        self._write_latency = parse_latency(self.config.write_latency)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "AxlSimulator":
+        simulator = self
+
+        class Handler(_AxlHandler):
+            sim = simulator
+
+        self._server = _Server((self.config.host, self.config.port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="axl-sim", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "AxlSimulator":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---- request handling ----
+
+    def handle(self, body: bytes) -> Tuple[int, bytes, Dict[str, str]]:
+        """Returns (status, body, extra headers); status 0 means drop the connection."""
+        try:
+            root = ET.fromstring(body)
+            soap_body = next(el for el in root if _local(el.tag) == "Body")
+            request = next(iter(soap_body))
+        except (ET.ParseError, StopIteration):
+            return 500, _fault("Malformed SOAP request"), {}
+
+        op = _local(request.tag)
+        is_write = op.startswith(("add", "remove", "update"))
+
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.by_op[op] = self.stats.by_op.get(op, 0) + 1
+            self._in_flight += 1
+            in_flight = self._in_flight
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, in_flight)
+            roll = self._rng.random()
+
+        try:
+            cfg = self.config
+            if cfg.capacity and in_flight > 2 * cfg.capacity:
+                return self._throttle()
+
+            latency = (self._write_latency if is_write else self._read_latency)()
+            if cfg.capacity and in_flight > cfg.capacity:
+                latency *= in_flight / cfg.capacity
+            time.sleep(latency)
+
+            if roll < cfg.reset_rate:
+                with self._lock:
+                    self.stats.resets += 1
+                return 0, b"", {}
+            roll -= cfg.reset_rate
+            if roll < cfg.throttle_rate:
+                return self._throttle()
+            roll -= cfg.throttle_rate
+            if roll < cfg.fault_rate:
+                with self._lock:
+                    self.stats.faults += 1
+                return 500, _fault("Simulated AXL fault"), {}
+
+            return self._dispatch(op, request)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _throttle(self) -> Tuple[int, bytes, Dict[str, str]]:
+        with self._lock:
+            self.stats.throttled += 1
+        return 503, _fault("AXL throttle: too busy, retry later"), {"Retry-After": "1"}
+
+    def _dispatch(self, op: str, request) -> Tuple[int, bytes, Dict[str, str]]:
+        if op == "getCCMVersion":
+            return 200, _envelope(
+                f"<ns:getCCMVersionResponse><return><componentVersion><version>{SIM_CCM_VERSION}"
+                "</version></componentVersion></return></ns:getCCMVersionResponse>"
+            ), {}
+        if op == "executeSQLQuery":
+            return self._sql(request.findtext("sql") or "")
+
+        for prefix in ("get", "add", "remove", "list"):
+            if op.startswith(prefix) and op[len(prefix):] in _BY_AXL_NAME:
+                tag, obj_type = _BY_AXL_NAME[op[len(prefix):]]
+                return getattr(self, f"_{prefix}")(op, tag, obj_type, request)
+
+        return 500, _fault(f"Operation not supported by the simulator: {op}"), {}
+
+    def _get(self, op, tag, obj_type, request):
+        name = request.findtext("name") or ""
+        pkid = self.store.get(obj_type, name)
+        if pkid is None:
+            return 500, _fault(f"Item not valid: The specified {name} was not found", 5007), {}
+        return 200, _envelope(
+            f"<ns:{op}Response><return><{tag} uuid=\"{{{pkid}}}\"><name>{escape(name)}</name>"
+            f"</{tag}></return></ns:{op}Response>"
+        ), {}
+
+    def _add(self, op, tag, obj_type, request):
+        obj = request.find(tag)
+        name = (obj.findtext("name") if obj is not None else None) or ""
+        if not name:
+            return 500, _fault("name is required"), {}
+        pkid = self.store.add(obj_type, name)
+        if pkid is None:
+            return 500, _fault(
+                "Could not insert new row - duplicate value in a UNIQUE INDEX column (Unique Index:).", -239
+            ), {}
+        return 200, _envelope(f"<ns:{op}Response><return>{{{pkid}}}</return></ns:{op}Response>"), {}
+
+    def _remove(self, op, tag, obj_type, request):
+        name = request.findtext("name") or ""
+        if not self.store.remove(obj_type, name):
+            return 500, _fault(f"Item not valid: The specified {name} was not found", 5007), {}
+        return 200, _envelope(f"<ns:{op}Response><return>{{{uuid.uuid4()}}}</return></ns:{op}Response>"), {}
+
+    def _list(self, op, tag, obj_type, request):
+        pattern = request.findtext("searchCriteria/name") or "%"
+        skip = int(request.findtext("skip") or 0)
+        first = request.findtext("first")
+        rows = self.store.search(obj_type, pattern)[skip:]
+        if first:
+            rows = rows[:int(first)]
+        items = "".join(
+            f"<{tag} uuid=\"{{{pkid}}}\"><name>{escape(name)}</name></{tag}>" for name, pkid in rows
+        )
+        return 200, _envelope(f"<ns:{op}Response><return>{items}</return></ns:{op}Response>"), {}
+
+    def _sql(self, sql: str):
+        m = _SQL_IN.match(sql)
+        if not m or m.group(1).lower() not in _BY_TABLE:
+            return 500, _fault(f"Simulator only supports select name ... where name in (...): {sql[:100]}", -201), {}
+        obj_type = _BY_TABLE[m.group(1).lower()]
+        wanted = {v.replace("''", "'") for v in _SQL_LITERAL.findall(m.group(3))}
+        fold = str.lower if m.group(2).lower() != "name" else (lambda n: n)
+        rows = "".join(
+            f"<row><name>{escape(n)}</name></row>" for n in self.store.names(obj_type) if fold(n) in wanted
+        )
+        return 200, _envelope(f"<ns:executeSQLQueryResponse><return>{rows}</return></ns:executeSQLQueryResponse>"), {}
+
+
+class _AxlHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like CUCM
+    # one buffered write per response; separate header/body packets hit delayed ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    sim: AxlSimulator
+
+    def do_POST(self):
+        cfg = self.sim.config
+        if cfg.username is not None and not self._authorized(cfg.username, cfg.password or ""):
+            self._send(401, b"Unauthorized", {"WWW-Authenticate": 'Basic realm="AXL"'})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        status, body, headers = self.sim.handle(self.rfile.read(length))
+        if status == 0:
+            # simulated connection reset
+            self.close_connection = True
+            self.connection.close()
+            return
+        self._send(status, body, headers)
+
+    def _authorized(self, username: str, password: str) -> bool:
+        expected = base64.b64encode(f"{username}:{password}".encode()).decode()
+        return self.headers.get("Authorization") == f"Basic {expected}"
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local AXL simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--latency", default="fixed:0", help="read latency, e.g. lognormal:20:0.5 (ms)")
+    parser.add_argument("--write-latency", default=None, help="write latency (default: --latency)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument("--reset-rate", type=float, default=0.0)
+    parser.add_argument("--capacity", type=int, default=0)
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--seed-file", help='JSON {"partition": ["Global_PT", ...], ...} loaded at start')
+    parser.add_argument("--random-seed", type=int)
+    args = parser.parse_args(argv)
+
+    config = SimulatorConfig(
+        host=args.host,
+        port=args.port,
+        read_latency=args.latency,
+        write_latency=args.write_latency or args.latency,
+        throttle_rate=args.throttle_rate,
+        fault_rate=args.fault_rate,
+        reset_rate=args.reset_rate,
+        capacity=args.capacity,
+        username=args.username,
+        password=args.password,
+        seed=args.random_seed,
+    )
+    sim = AxlSimulator(config)
+    if args.seed_file:
+        with open(args.seed_file, encoding="utf-8") as fh:
+            for obj_type, names in json.load(fh).items():
+                sim.store.seed(obj_type, names)
+
+    sim.start()
+    print(f"AXL simulator listening on {sim.url} ({sim.store.counts()})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+        print(json.dumps(sim.stats.__dict__, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,240 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from xml.sax.saxutils import escape
 import xml.etree.ElementTree as ET
 import urllib3
+
+from app.integrations.ucm_inventory import AxlInventory, SqlExistenceOracle
+from app.integrations.ucm_soap import compile_template, element, envelope, members as _members
+from app.integrations.ucm_throttle import (
+    OP_READ, OP_WRITE, AdaptiveLimiter, backoff_delay, bucket_for, is_retryable_error,
+    is_throttled, limiter_for,
+)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Connection pool tuning (per client / per environment)
+AXL_POOL_MAXSIZE = int(os.getenv("AXL_POOL_MAXSIZE", "10"))
+AXL_MAX_IN_FLIGHT_PER_ENV = int(os.getenv("AXL_MAX_IN_FLIGHT_PER_ENV", "8"))
+AXL_POOL_IDLE_TIMEOUT = float(os.getenv("AXL_POOL_IDLE_TIMEOUT", "300"))
+
+# AXL schema version spoken until getCCMVersion says otherwise (see negotiate_version)
+AXL_DEFAULT_VERSION = os.getenv("AXL_VERSION", "14.0")
+# getCCMVersion itself is sent with the oldest schema version we support, which
+# every cluster we talk to accepts whatever release it runs
+AXL_MIN_VERSION = os.getenv("AXL_MIN_VERSION", "11.0")
+
+# Retry of throttled / timed-out / reset AXL calls
+AXL_RETRY_MAX_ATTEMPTS = int(os.getenv("AXL_RETRY_MAX_ATTEMPTS", "5"))
+AXL_RETRY_BASE_DELAY = float(os.getenv("AXL_RETRY_BASE_DELAY", "0.5"))
+AXL_RETRY_MAX_DELAY = float(os.getenv("AXL_RETRY_MAX_DELAY", "8"))
+AXL_CALL_DEADLINE = float(os.getenv("AXL_CALL_DEADLINE", "60"))
+
+# Requests per second against one cluster, shared by the whole process (0 = unlimited).
+# CUCM's "Maximum AXL Writes Allowed per Minute" / 60 is a good write rate.
+AXL_READ_RATE = float(os.getenv("AXL_READ_RATE", "0"))
+AXL_WRITE_RATE = float(os.getenv("AXL_WRITE_RATE", "0"))
+
+# planner object type -> (AXL object name used in list/get/add/remove ops, returned element tag)
+AXL_OBJECTS = {
+    "region": ("Region", "region"),
+    "location": ("Location", "location"),
+    "physical_location": ("PhysicalLocation", "physicalLocation"),
+    "srst": ("Srst", "srst"),
+    "partition": ("RoutePartition", "routePartition"),
+    "css": ("Css", "css"),
+    "mrg": ("MediaResourceGroup", "mediaResourceGroup"),
+    "mrgl": ("MediaResourceList", "mediaResourceList"),
+    "device_pool": ("DevicePool", "devicePool"),
+    "device_mobility": ("DeviceMobility", "deviceMobility"),
+}
+
+# planner object type -> CUCM table (see static/cucm-data-dictionary-15)
+AXL_SQL_TABLES = {
+    "region": "region",
+    "location": "location",
+    "physical_location": "physicallocation",
+    "srst": "srst",
+    "partition": "routepartition",
+    "css": "callingsearchspace",
+    "mrg": "mediaresourcegroup",
+    "mrgl": "mediaresourcelist",
+    "device_pool": "devicepool",
+    "device_mobility": "devicemobilityinfo",
+}
+
+# Request bodies (inside <ns:opName>) compiled once per AXL version, see ucm_soap
+AXL_NAME_BODY = "<name>{name}</name>"
+# existence checks only ask for the name back
+AXL_GET_BODY = "<name>{name}</name><returnedTags><name/></returnedTags>"
+AXL_LIST_BODY = (
+    "<searchCriteria><name>%</name></searchCriteria>"
+    "<returnedTags><name/></returnedTags>"
+    "<skip>{skip}</skip><first>{first}</first>"
+)
+AXL_ADD_BODIES = {
+    "region": "<region><name>{name}</name></region>",
+    "location": (
+        "<location><name>{name}</name>"
+        "<withinAudioBandwidth>0</withinAudioBandwidth>"
+        "<withinVideoBandwidth>0</withinVideoBandwidth>"
+        "<withinImmersiveKbits>0</withinImmersiveKbits>"
+        "<betweenLocations><betweenLocation>"
+        "<locationName>Hub_None</locationName><weight>50</weight>"
+        "<audioBandwidth>0</audioBandwidth><videoBandwidth>0</videoBandwidth>"
+        "<immersiveBandwidth>0</immersiveBandwidth>"
+        "</betweenLocation></betweenLocations></location>"
+    ),
+    "physical_location": "<physicalLocation><name>{name}</name>{description}</physicalLocation>",
+    "srst": (
+        "<srst><name>{name}</name><port>2000</port>"
+        "<ipAddress>{ip}</ipAddress><SipNetwork>{ip}</SipNetwork>"
+        "<SipPort>5060</SipPort><isSecure>false</isSecure></srst>"
+    ),
+    "partition": "<routePartition><name>{name}</name>{description}</routePartition>",
+    "css": "<css><name>{name}</name>{description}{members}</css>",
+    "mrg": (
+        "<mediaResourceGroup><name>{name}</name>{description}"
+        "<multicast>false</multicast>{members}</mediaResourceGroup>"
+    ),
+    "mrgl": "<mediaResourceList><name>{name}</name>{members}</mediaResourceList>",
+    "device_pool": (
+        "<devicePool><name>{name}</name>"
+        "<dateTimeSettingName>{date_time_group}</dateTimeSettingName>"
+        "<callManagerGroupName>{ucm_group}</callManagerGroupName>"
+        "<mediaResourceListName>{mrgl}</mediaResourceListName>"
+        "<regionName>{region}</regionName>"
+        "<networkLocale>United States</networkLocale>"
+        "{srst}<aarNeighborhoodName/>"
+        "<locationName>{location}</locationName>"
+        "<physicalLocationName>{physical_location}</physicalLocationName>"
+        "<deviceMobilityGroupName>{device_mobility_group}</deviceMobilityGroupName>"
+        "</devicePool>"
+    ),
+    "device_mobility": (
+        "<deviceMobility><name>{name}</name>"
+        "<subNetDetails><ipv4SubNetDetails>"
+        "<ipv4Subnet>{subnet}</ipv4Subnet><ipv4SubNetMaskSz>{mask}</ipv4SubNetMaskSz>"
+        "</ipv4SubNetDetails></subNetDetails>{members}</deviceMobility>"
+    ),
+}
+
+# Rows per listXxx page (skip/first); keeps responses well under AXL's size cap
+AXL_LIST_PAGE_SIZE = int(os.getenv("AXL_LIST_PAGE_SIZE", "1000"))
+AXL_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Existence checks stop reading once the answer is known; at most this much of the
+# remaining body is drained so the keep-alive connection can be reused
+AXL_PROBE_CHUNK_BYTES = 4 * 1024
+AXL_DRAIN_MAX_BYTES = int(os.getenv("AXL_DRAIN_MAX_BYTES", str(64 * 1024)))
+
+# Names per "WHERE name IN (...)" query; keeps statements well under AXL's SQL limits
+AXL_SQL_CHUNK_SIZE = int(os.getenv("AXL_SQL_CHUNK_SIZE", "200"))
+
+# Informix unique-index (-239) / unique-constraint (-268) violations returned as add*
+# faults: the fault's <axlcode>, or the Informix message itself when no code is sent.
+# Matched as whole elements/messages so a name like "US-PA-239-LOC" in the echoed
+# request never reads as a duplicate.
+AXL_DUPLICATE_FAULT = re.compile(
+    r"<axlcode>\s*-(?:239|268)\s*</axlcode>"
+    r"|Could not insert new row - duplicate value in a UNIQUE INDEX column"
+    r"|Unique constraint \([^)]*\) violated"
+)
+
+
+class AxlDuplicateError(RuntimeError):
+    """add* was rejected because an object with that name already exists."""
+
+
+def _add_error(op: str, r) -> RuntimeError:
+    text = r.text or ""
+    if r.status_code == 500 and AXL_DUPLICATE_FAULT.search(text):
+        return AxlDuplicateError(f"{op}: object already exists")
+    return RuntimeError(f"{op} failed: {text[:400]}")
+
+
+_CCM_VERSION = re.compile(r"<version>\s*(\d+)\.(\d+)")
+
+def parse_ccm_version(xml: str) -> str | None:
+    """AXL schema version ("major.minor") from a getCCMVersion response, e.g. 14.0.1.13900-155 -> 14.0."""
+    m = _CCM_VERSION.search(xml or "")
+    return f"{m.group(1)}.{m.group(2)}" if m else None
+
+
+def _stream_names(r, tag: str):
+    """
+    Yield the <name> of each returned <tag> element as the response arrives
+    (None for an element without a name). Parsed elements are cleared straight
+    away, so memory stays flat however large the page is.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    for chunk in r.iter_content(chunk_size=AXL_STREAM_CHUNK_BYTES):
+        parser.feed(chunk)
+        # IMPORTANT: returned elements and name are NOT namespaced
+        for _, el in parser.read_events():
+            if el.tag == tag:
+                name = el.findtext("name")
+                yield name.strip() if name else None
+                el.clear()
+    parser.close()
+    for _, el in parser.read_events():
+        if el.tag == tag:
+            name = el.findtext("name")
+            yield name.strip() if name else None
+
+
+def _probe(r, markers) -> bool:
+    """
+    Stream the response body until one of markers shows up (True) or the body
+    ends (False). The rest of the body is drained, up to AXL_DRAIN_MAX_BYTES,
+    so the connection goes back to the pool; larger leftovers close it instead.
+    """
+    needles = [m.encode("utf-8") for m in markers]
+    keep = max(len(n) for n in needles) - 1
+    chunks = r.iter_content(chunk_size=AXL_PROBE_CHUNK_BYTES)
+
+    found = False
+    try:
+        tail = b""
+        for chunk in chunks:
+            window = tail + chunk
+            if any(n in window for n in needles):
+                found = True
+                break
+            tail = window[-keep:] if keep else b""
+
+        drained = 0
+        for chunk in chunks:
+            drained += len(chunk)
+            if drained > AXL_DRAIN_MAX_BYTES:
+                break
+    finally:
+        r.close()
+    return found
+
+
+def _getter(obj_type: str):
+    def get(self, name: str) -> bool:
+        return self._get(obj_type, name)
+    get.__doc__ = f"True if the {obj_type} exists (get{AXL_OBJECTS[obj_type][0]})."
+    return get
+
+
+def _remover(obj_type: str):
+    def remove(self, name: str) -> None:
+        self._remove(obj_type, name)
+    remove.__doc__ = f"remove{AXL_OBJECTS[obj_type][0]} by name."
+    return remove
+
+
 class UcmAxlClient:
-    def __init__(self, base_url, username, password, verify_tls=False, timeout=10):
+    def __init__(self, base_url, username, password, verify_tls=False, timeout=10,
+                 pool_maxsize=None, max_in_flight=None, read_rate=None, write_rate=None,
+                 axl_version=None):
         self.base_url = base_url.rstrip("/")
         self.username = username
         self.password = password
@@ -14,36 +242,123 @@ class UcmAxlClient:
         self.timeout = timeout
 
         self.axl_url = f"{self.base_url}/"
-        self.axl_version = "14.0" # Adjust as needed for your CUCM version
+        self.axl_version = axl_version or AXL_DEFAULT_VERSION
+        self.version_negotiated = False
         self.headers = {
             "Content-Type": "text/plain; charset=utf-8",
             "SOAPAction": f"CUCM:DB ver={self.axl_version}"
         }
 
+        # One keep-alive session per client: TCP+TLS is negotiated once per pooled
+        # connection instead of once per AXL call, and the basic-auth header is built once.
+        self.pool_maxsize = pool_maxsize or AXL_POOL_MAXSIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.auth = HTTPBasicAuth(self.username, self.password)
+        self.session.verify = False
+        self.session.headers.update(self.headers)
+
+        # Requests in flight against this cluster: adapts between 1 and max_in_flight
+        self.limiter: AdaptiveLimiter = limiter_for(self.base_url, max_in_flight or AXL_MAX_IN_FLIGHT_PER_ENV)
+
+        # Rate limits are per cluster, not per client instance
+        self._buckets = {
+            OP_READ: bucket_for(self.base_url, OP_READ, AXL_READ_RATE if read_rate is None else read_rate),
+            OP_WRITE: bucket_for(self.base_url, OP_WRITE, AXL_WRITE_RATE if write_rate is None else write_rate),
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+    def set_version(self, axl_version: str) -> None:
+        self.axl_version = axl_version
+        self.headers["SOAPAction"] = f"CUCM:DB ver={axl_version}"
+        self.session.headers["SOAPAction"] = self.headers["SOAPAction"]
 
-    def _post(self, body: str, soap_action: str | None = None):
-        headers = self.headers.copy()
-        if soap_action:
-            headers["SOAPAction"] = soap_action
+    def negotiate_version(self) -> str:
+        """
+        Ask the cluster which release it runs (getCCMVersion, sent as AXL_MIN_VERSION)
+        and speak that AXL schema version from now on. Raises if the cluster cannot
+        be reached.
+        """
+        version = parse_ccm_version(self.get_version(AXL_MIN_VERSION))
+        if version:
+            self.set_version(version)
+        self.version_negotiated = True
+        return self.axl_version
+
+    def _post(self, body: str, soap_action: str | None = None, op: str = OP_READ, stream: bool = False):
+        """
+        POST one AXL request. Throttled answers (503 / throttle fault), connection
+        failures and - for reads - timeouts are retried with jittered exponential
+        backoff until AXL_RETRY_MAX_ATTEMPTS or the AXL_CALL_DEADLINE runs out.
+        Returns the last response; the last transport error is re-raised.
+        With stream=True the body is left unread: iterate it, then close it.
+        """
+        headers = None
+        if soap_action and soap_action != self.headers["SOAPAction"]:
+            headers = {"SOAPAction": soap_action}
 
         # print("\n====== AXL RAW REQUEST ======")
         # print("URL:", self.axl_url)
-        # print("SOAPAction:", headers.get("SOAPAction"))
-        # print("Content-Type:", headers.get("Content-Type"))
+        # print("SOAPAction:", soap_action or self.headers.get("SOAPAction"))
         # print("AUTH:", f"{self.username}:{'*' * len(self.password)}")
         # print("BODY:\n", body.strip())
         # print("====== END REQUEST ======\n")
 
+        data = body if isinstance(body, bytes) else body.encode("utf-8")
+        deadline = time.monotonic() + AXL_CALL_DEADLINE
+        bucket = self._buckets[op]
+
+        attempt = 0
+        while True:
+            if not bucket.acquire(deadline):
+                raise RuntimeError(f"AXL {op} rate limit: no slot before the call deadline")
+
+            if not self.limiter.acquire(deadline):
+                raise RuntimeError("AXL concurrency limit: no slot before the call deadline")
+
+            r, error = None, None
+            started = time.monotonic()
+            try:
+                r = self.session.post(
+                    self.axl_url,
+                    data=data,
+                    headers=headers,
+                    timeout=max(1.0, min(self.timeout, deadline - time.monotonic())),
+                    stream=stream,
+                )
+            except requests.RequestException as e:
+                error = e
+            finally:
+                self.limiter.release(
+                    time.monotonic() - started,
+                    congested=error is not None or (r is not None and is_throttled(r)),
+                )
+
+            if error is not None and not is_retryable_error(error, op):
+                raise error
+
+            if error is None and not is_throttled(r):
+                break
+
+            attempt += 1
+            delay = backoff_delay(
+                attempt - 1,
+                AXL_RETRY_BASE_DELAY,
+                AXL_RETRY_MAX_DELAY,
+                r.headers.get("Retry-After") if r is not None else None,
+            )
+            if attempt >= AXL_RETRY_MAX_ATTEMPTS or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                break
+            if r is not None:
+                r.close()  # hand the connection back to the pool before retrying
+            time.sleep(delay)
 
-        r = requests.post(
-            self.axl_url,
-            data=body,
-            headers=headers,
-            auth=HTTPBasicAuth(self.username, self.password),
-            verify=False,
-            timeout=self.timeout,
-        )
-        
         # # 🔍 RESPONSE LOGGING (THIS IS THE KEY PART)
         # print("====== AXL RAW RESPONSE ======")
         # print("HTTP:", r.status_code)
@@ -54,14 +369,10 @@ class UcmAxlClient:
         return r
 
     def _soap(self, inner: str) -> str:
-        return f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                          xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-          <soapenv:Body>
-            {inner}
-          </soapenv:Body>
-        </soapenv:Envelope>
-        """
+        return envelope(self.axl_version, inner)
+
+    def _render(self, op: str, body: str, **values) -> bytes:
+        return compile_template(self.axl_version, op, body).render(**values)
 
 
     def remove_op(self, op: str, **kwargs) -> None:
@@ -75,25 +386,20 @@ class UcmAxlClient:
 
         r = self._post(
             body,
-            soap_action=f"CUCM:DB ver={self.axl_version}"
+            soap_action=f"CUCM:DB ver={self.axl_version}",
+            op=OP_WRITE,
         )
 
         if r.status_code != 200:
             raise RuntimeError(f"{op} failed: {r.text[:400]}")
 
 
-    def get_version(self):
-        body = f"""
-            <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                            xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-                <soapenv:Header/>
-                <soapenv:Body>
-                    <ns:getCCMVersion/>
-                </soapenv:Body>
-            </soapenv:Envelope>
-            """
-
-        r = self._post(body)
+    def get_version(self, axl_version: str | None = None):
+        axl_version = axl_version or self.axl_version
+        r = self._post(
+            envelope(axl_version, "<ns:getCCMVersion/>"),
+            soap_action=f"CUCM:DB ver={axl_version}",
+        )
 
         if r.status_code != 200:
             raise Exception(f"AXL HTTP {r.status_code}: {r.text[:300]}")
@@ -101,632 +407,253 @@ class UcmAxlClient:
         return r.text
     
     
-    def get_region(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getRegion>
-                    <name>{name}</name>
-                </ns:getRegion>
-            </soapenv:Body>
-        </soapenv:Envelope>
+    def iter_names(self, obj_type: str, page_size: int | None = None):
         """
+        Yield every existing name for a planner object type.
 
-        r = self._post(body)
-
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<region>" in r.text:
-            return True
-
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
-
-        raise RuntimeError(f"get_region failed unexpectedly")
-    
-    
-    def add_region(self, name: str, description: str | None = None) -> None:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addRegion>
-            <region>
-                <name>{name}</name>
-            </region>
-            </ns:addRegion>
-        </soapenv:Body>
-        </soapenv:Envelope>
+        Pages through listXxx with skip/first and parses each response
+        incrementally, so neither AXL's response-size cap nor the size of the
+        XML tree grows with the number of objects on the cluster.
         """
-
-        r = self._post(body)
-
-        if r.status_code != 200:
-            raise RuntimeError(f"add_region failed: {r.text[:400]}")
-
-
-    def get_location(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getLocation>
-                    <name>{name}</name>
-                </ns:getLocation>
-            </soapenv:Body>
-        </soapenv:Envelope>
+        if obj_type not in AXL_OBJECTS:
+            raise ValueError(f"Unsupported object type for list: {obj_type}")
+        axl_name, tag = AXL_OBJECTS[obj_type]
+        page_size = page_size or AXL_LIST_PAGE_SIZE
+
+        skip = 0
+        while True:
+            body = self._render(f"list{axl_name}", AXL_LIST_BODY, skip=skip, first=page_size)
+
+            r = self._post(body, stream=True)
+            try:
+                if r.status_code != 200:
+                    # CUCM returns 500 when no objects exist
+                    if r.status_code == 500 and "Item not valid" in r.text:
+                        return
+                    raise RuntimeError(f"list{axl_name} failed: HTTP {r.status_code}")
+
+                rows = 0
+                for name in _stream_names(r, tag):
+                    rows += 1
+                    if name:
+                        yield name
+            finally:
+                r.close()
+
+            if rows < page_size:
+                return
+            skip += page_size
+
+
+    def list_names(self, obj_type: str) -> set[str]:
+        """Return every existing name for a planner object type."""
+        return set(self.iter_names(obj_type))
+
+
+    def fan_out(self, fn, items) -> list:
         """
-
-        r = self._post(body)
-
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<location>" in r.text:
-            return True
-
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
-
-        raise RuntimeError(f"get_location failed unexpectedly")
-    
-    
-    def add_location(self, name: str, description: str | None = None) -> None:
-        desc_xml = f"<description>{description}</description>" if description else ""
-
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addLocation>
-            <location>
-                <name>{name}</name>
-                <withinAudioBandwidth>0</withinAudioBandwidth>
-                <withinVideoBandwidth>0</withinVideoBandwidth>
-                <withinImmersiveKbits>0</withinImmersiveKbits>
-                <betweenLocations>
-                    <betweenLocation>
-                        <locationName>Hub_None</locationName>
-                        <weight>50</weight>
-                        <audioBandwidth>0</audioBandwidth>
-                        <videoBandwidth>0</videoBandwidth>
-                        <immersiveBandwidth>0</immersiveBandwidth>
-                    </betweenLocation>
-                </betweenLocations>
-            </location>
-            </ns:addLocation>
-        </soapenv:Body>
-        </soapenv:Envelope>
+        Run fn over items concurrently; the adaptive limiter decides how many of
+        the resulting AXL calls are actually in flight. Results keep item order.
         """
-
-        r = self._post(body)
-
-        if r.status_code != 200:
-            raise RuntimeError(f"add_location failed: {r.text[:400]}")
-
-    
-    def get_physicallocation(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getPhysicalLocation>
-                    <name>{name}</name>
-                </ns:getPhysicalLocation>
-            </soapenv:Body>
-        </soapenv:Envelope>
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        workers = min(len(items), self.limiter.max_limit)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="axl") as pool:
+            return list(pool.map(fn, items))
+
+    def load_inventory(self, types=None) -> AxlInventory:
         """
-
-        r = self._post(body)
-
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<physicalLocation>" in r.text:
-            return True
-
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
-
-        raise RuntimeError(f"get_physicalLocation failed unexpectedly")
-    
-    
-    def add_physicallocation(self, name: str, description: str | None = None) -> None:
-        desc_xml = f"<description>{description}</description>" if description else ""
-
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addPhysicalLocation>
-            <physicalLocation>
-                <name>{name}</name>
-                {desc_xml}
-            </physicalLocation>
-            </ns:addPhysicalLocation>
-        </soapenv:Body>
-        </soapenv:Envelope>
+        Preload existing names for each object type (paged list calls per type).
+        A type whose list call fails is left out and answered by per-object getXxx.
         """
+        inventory = AxlInventory(fallback=self._get)
 
-        r = self._post(body)
+        def load(obj_type):
+            try:
+                inventory.load(obj_type, self.iter_names(obj_type))
+            except Exception as e:
+                inventory.failed[obj_type] = str(e)
 
-        if r.status_code != 200:
-            raise RuntimeError(f"add_physicalLocation failed: {r.text[:400]}")
+        self.fan_out(load, types or AXL_OBJECTS.keys())
+        return inventory
     
     
-    def get_srst(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getSrst>
-                    <name>{name}</name>
-                </ns:getSrst>
-            </soapenv:Body>
-        </soapenv:Envelope>
-        """
-
-        r = self._post(body)
-
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<srst>" in r.text:
-            return True
-
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
-
-        raise RuntimeError(f"get_srst failed unexpectedly")
-    
-    
-    def add_srst(self, name: str, ipAddress: str | None = None) -> None:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addSrst>
-            <srst>
-                <name>{name}</name>
-                <port>2000</port>
-                <ipAddress>{ipAddress}</ipAddress>
-                <SipNetwork>{ipAddress}</SipNetwork>
-                <SipPort>5060</SipPort>
-                <isSecure>false</isSecure>
-            </srst>
-            </ns:addSrst>
-        </soapenv:Body>
-        </soapenv:Envelope>
-        """
-
-        r = self._post(body)
-
-        if r.status_code != 200:
-            raise RuntimeError(f"add_srst failed: {r.text[:400]}")
-        
-    
-    def list_partitions(self) -> set[str]:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:listRoutePartition>
-                    <searchCriteria>
-                        <name>%</name>
-                    </searchCriteria>
-                    <returnedTags>
-                        <name />
-                    </returnedTags>
-                </ns:listRoutePartition>
-            </soapenv:Body>
-        </soapenv:Envelope>
-        """
+    def execute_sql_query(self, sql: str) -> list[dict]:
+        body = self._render("executeSQLQuery", "<sql>{sql}</sql>", sql=sql)
 
         r = self._post(body)
 
         if r.status_code != 200:
-            # CUCM returns 500 when no objects exist
-            if r.status_code == 500 and "Item not valid" in r.text:
-                return set()
-            raise RuntimeError(f"list_partitions failed: HTTP {r.status_code}")
+            raise RuntimeError(f"executeSQLQuery failed: {r.text[:400]}")
 
         root = ET.fromstring(r.text)
 
-        partitions = set()
-
-        # IMPORTANT: routePartition and name are NOT namespaced
-        for p in root.findall(".//routePartition"):
-            name = p.find("name")
-            if name is not None and name.text:
-                partitions.add(name.text.strip())
-
-        print(f"AXL list_partitions: found {len(partitions)} partitions")
-        return partitions
-    
-    def get_partition(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getRoutePartition>
-                    <name>{name}</name>
-                </ns:getRoutePartition>
-            </soapenv:Body>
-        </soapenv:Envelope>
-        """
-
-        r = self._post(body)
-
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<routePartition>" in r.text:
-            return True
+        # rows come back as <row><column>value</column>...</row>, not namespaced
+        return [
+            {col.tag: (col.text or "") for col in row}
+            for row in root.iter("row")
+        ]
 
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
 
-        raise RuntimeError(f"get_partition failed unexpectedly")
-    
-    
-    def add_partition(self, name: str, description: str | None = None) -> None:
-        desc_xml = f"<description>{description}</description>" if description else ""
-
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addRoutePartition>
-            <routePartition>
-                <name>{name}</name>
-                {desc_xml}
-            </routePartition>
-            </ns:addRoutePartition>
-        </soapenv:Body>
-        </soapenv:Envelope>
+    def existing_names_sql(self, obj_type: str, names, chunk_size: int | None = None) -> set[str]:
         """
-
-        r = self._post(body)
-
-        if r.status_code != 200:
-            raise RuntimeError(f"add_partition failed: {r.text[:400]}")
-
-
-    def get_css(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getCss>
-                    <name>{name}</name>
-                </ns:getCss>
-            </soapenv:Body>
-        </soapenv:Envelope>
+        Existing names among names, using chunked executeSQLQuery lookups. Matching
+        ignores case, as CUCM does; names come back as stored on the cluster.
         """
+        table = AXL_SQL_TABLES.get(obj_type)
+        if not table:
+            raise ValueError(f"Unsupported object type for SQL lookup: {obj_type}")
 
-        r = self._post(body)
+        names = sorted({n.lower() for n in names if n})
+        chunk_size = chunk_size or AXL_SQL_CHUNK_SIZE
 
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<callingSearchSpace>" in r.text:
-            return True
+        def query(chunk):
+            in_list = ",".join("'" + n.replace("'", "''") + "'" for n in chunk)
+            return self.execute_sql_query(f"select name from {table} where lower(name) in ({in_list})")
 
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
+        chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+        found = set()
+        for rows in self.fan_out(query, chunks):
+            found.update(row.get("name", "") for row in rows)
 
-        raise RuntimeError(f"get_css failed unexpectedly")
-    
-    
-    def add_css(self, name: str, members: list[str], description: str | None = None) -> None:
-        desc_xml = f"<description>{description}</description>" if description else ""
-        members_xml = ""
-        if members:
-            member_entries = "".join(
-                f"<member>"
-                f"<routePartitionName>{m}</routePartitionName>"
-                f"<index>{i}</index>"
-                f"</member>"
-                for i, m in enumerate(members, start=1)
-            )
+        found.discard("")
+        return found
 
-            members_xml = f"<members>{member_entries}</members>"
-
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addCss>
-                <css>
-                    <name>{name}</name>
-                    {desc_xml}
-                    {members_xml}
-                </css>
-            </ns:addCss>
-        </soapenv:Body>
-        </soapenv:Envelope>
-        """
 
-        r = self._post(body)
+    def sql_existence_oracle(self, chunk_size: int | None = None) -> SqlExistenceOracle:
+        return SqlExistenceOracle(self, types=AXL_SQL_TABLES.keys(), chunk_size=chunk_size)
 
-        if r.status_code != 200:
-            raise RuntimeError(f"add_css failed: {r.text[:400]}")
-        
-        
-    def get_mediaresourcegroup(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getMediaResourceGroup>
-                    <name>{name}</name>
-                </ns:getMediaResourceGroup>
-            </soapenv:Body>
-        </soapenv:Envelope>
-        """
+    # ---- get / add / remove, generated from the compiled templates ----
 
-        r = self._post(body)
+    def _get(self, obj_type: str, name: str) -> bool:
+        axl_name, tag = AXL_OBJECTS[obj_type]
+        r = self._post(self._render(f"get{axl_name}", AXL_GET_BODY, name=name), stream=True)
 
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<mediaResourceGroup>" in r.text:
+        # Must be 200 AND contain object (<tag> or <tag uuid="...">)
+        if r.status_code == 200 and _probe(r, (f"<{tag}>", f"<{tag} ")):
             return True
 
         # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
+        if r.status_code == 500 and _probe(r, ("Item not valid",)):
             return False
 
-        raise RuntimeError(f"get_mediaResourceGroup failed unexpectedly")
-    
-    
-    def add_mediaresourcegroup(self, name: str, description: str , members: list[str] | None = None) -> None:
-        desc_xml = f"<description>{description}</description>" if description else ""
-        members_xml = ""
-        if members:
-            member_entries = "".join(
-                f"<member>"
-                f"<deviceName>{m}</deviceName>"
-                f"</member>"
-                for i, m in enumerate(members, start=1)
-            )
-
-            members_xml = f"<members>{member_entries}</members>"
-
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addMediaResourceGroup>
-            <mediaResourceGroup>
-                <name>{name}</name>
-                {desc_xml}
-                <multicast>false</multicast>
-                {members_xml}
-            </mediaResourceGroup>
-            </ns:addMediaResourceGroup>
-        </soapenv:Body>
-        </soapenv:Envelope>
-        """
+        r.close()
+        raise RuntimeError(f"get{axl_name} failed unexpectedly: HTTP {r.status_code}")
 
-        r = self._post(body)
+    def _add(self, obj_type: str, **values) -> None:
+        axl_name, _ = AXL_OBJECTS[obj_type]
+        r = self._post(self._render(f"add{axl_name}", AXL_ADD_BODIES[obj_type], **values), op=OP_WRITE)
 
         if r.status_code != 200:
-            raise RuntimeError(f"add_mediaResourceGroup failed: {r.text[:400]}")
-
-
-    def get_mediaresourcelist(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getMediaResourceList>
-                    <name>{name}</name>
-                </ns:getMediaResourceList>
-            </soapenv:Body>
-        </soapenv:Envelope>
-        """
+            raise _add_error(f"add{axl_name}", r)
 
-        r = self._post(body)
+    def _remove(self, obj_type: str, name: str) -> None:
+        axl_name, _ = AXL_OBJECTS[obj_type]
+        r = self._post(self._render(f"remove{axl_name}", AXL_NAME_BODY, name=name), op=OP_WRITE)
 
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<mediaResourceList>" in r.text:
-            return True
+        if r.status_code != 200:
+            raise RuntimeError(f"remove{axl_name} failed: {r.text[:400]}")
 
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
+    def list_partitions(self) -> set[str]:
+        return self.list_names("partition")
+
+    get_region = _getter("region")
+    get_location = _getter("location")
+    get_physicallocation = _getter("physical_location")
+    get_srst = _getter("srst")
+    get_partition = _getter("partition")
+    get_css = _getter("css")
+    get_mediaresourcegroup = _getter("mrg")
+    get_mediaresourcelist = _getter("mrgl")
+    get_devicepool = _getter("device_pool")
+    get_devicemobility = _getter("device_mobility")
 
-        raise RuntimeError(f"get_mediaResourceList failed unexpectedly")
-    
-    
-    def add_mediaresourcelist(self, name: str, members: list[str] | None = None) -> None:
-        members_xml = ""
-        if members:
-            member_entries = "".join(
-                f"<member>"
-                f"<mediaResourceGroupName>{m}</mediaResourceGroupName>"
-                f"<order>{i}</order>"
-                f"</member>"
-                for i, m in enumerate(members, start=1)
-            )
+    def add_region(self, name: str, description: str | None = None) -> None:
+        self._add("region", name=name)
 
-            members_xml = f"<members>{member_entries}</members>"
-
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addMediaResourceList>
-            <mediaResourceList>
-                <name>{name}</name>
-                    {members_xml}
-            </mediaResourceList>
-            </ns:addMediaResourceList>
-        </soapenv:Body>
-        </soapenv:Envelope>
-        """
+    def add_location(self, name: str, description: str | None = None) -> None:
+        self._add("location", name=name)
 
-        r = self._post(body)
+    def add_physicallocation(self, name: str, description: str | None = None) -> None:
+        self._add("physical_location", name=name, description=element("description", description))
 
-        if r.status_code != 200:
-            raise RuntimeError(f"add_mediaResourceList failed: {r.text[:400]}")
-        
-    
-    def get_devicepool(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getDevicePool>
-                    <name>{name}</name>
-                </ns:getDevicePool>
-            </soapenv:Body>
-        </soapenv:Envelope>
-        """
+    def add_srst(self, name: str, ipAddress: str | None = None) -> None:
+        self._add("srst", name=name, ip=ipAddress)
 
-        r = self._post(body)
+    def add_partition(self, name: str, description: str | None = None) -> None:
+        self._add("partition", name=name, description=element("description", description))
 
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<devicePool>" in r.text:
-            return True
+    def add_css(self, name: str, members: list[str], description: str | None = None) -> None:
+        self._add(
+            "css",
+            name=name,
+            description=element("description", description),
+            members=_members(
+                (element("routePartitionName", m), element("index", i))
+                for i, m in enumerate(members or [], start=1)
+            ),
+        )
 
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
+    def add_mediaresourcegroup(self, name: str, description: str, members: list[str] | None = None) -> None:
+        self._add(
+            "mrg",
+            name=name,
+            description=element("description", description),
+            members=_members((element("deviceName", m),) for m in members or []),
+        )
+
+    def add_mediaresourcelist(self, name: str, members: list[str] | None = None) -> None:
+        self._add(
+            "mrgl",
+            name=name,
+            members=_members(
+                (element("mediaResourceGroupName", m), element("order", i))
+                for i, m in enumerate(members or [], start=1)
+            ),
+        )
 
-        raise RuntimeError(f"get_devicePool failed unexpectedly")
-    
-        
     def add_devicepool(
-        self, 
-        name: str, 
+        self,
+        name: str,
         datetimeSettingName: str,
         callManagerGroupName: str,
-        MediaResourceListName: str, 
-        regionName: str, 
+        MediaResourceListName: str,
+        regionName: str,
         srstName: str,
-        locationName: str, 
+        locationName: str,
         physicalLocationName: str,
         deviceMobilityGroupName: str | None = None) -> None:
 
-        srst_xml = ""
-        if srstName:
-            srst_xml = f"<srstName>{escape(srstName)}</srstName>"
-        
-
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addDevicePool>
-            <devicePool>
-                <name>{name}</name>
-                <dateTimeSettingName>{datetimeSettingName}</dateTimeSettingName>
-                <callManagerGroupName>{callManagerGroupName}</callManagerGroupName>
-                <mediaResourceListName>{MediaResourceListName}</mediaResourceListName>
-                <regionName>{regionName}</regionName>
-                <networkLocale>United States</networkLocale>
-                {srst_xml}
-                <aarNeighborhoodName/>
-                <locationName>{locationName}</locationName>
-                <physicalLocationName>{physicalLocationName}</physicalLocationName>
-                <deviceMobilityGroupName>{deviceMobilityGroupName or ''}</deviceMobilityGroupName>          
-            </devicePool>
-            </ns:addDevicePool>
-        </soapenv:Body>
-        </soapenv:Envelope>
-        """
-
-        r = self._post(body)
-
-        if r.status_code != 200:
-            raise RuntimeError(f"add_devicepool failed: {r.text[:400]}")
-        
-        
-    def get_devicemobility(self, name: str) -> bool:
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" 
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-            <soapenv:Body>
-                <ns:getDeviceMobility>
-                    <name>{name}</name>
-                </ns:getDeviceMobility>
-            </soapenv:Body>
-        </soapenv:Envelope>
-        """
-
-        r = self._post(body)
-
-        # Must be 200 AND contain object
-        if r.status_code == 200 and "<deviceMobilityInfo>" in r.text:
-            return True
-
-        # CUCM standard "not found"
-        if r.status_code == 500 and "Item not valid" in r.text:
-            return False
+        self._add(
+            "device_pool",
+            name=name,
+            date_time_group=datetimeSettingName,
+            ucm_group=callManagerGroupName,
+            mrgl=MediaResourceListName,
+            region=regionName,
+            srst=element("srstName", srstName),
+            location=locationName,
+            physical_location=physicalLocationName,
+            device_mobility_group=deviceMobilityGroupName,
+        )
 
-        raise RuntimeError(f"get_deviceMobilityInfo failed unexpectedly")
-    
-        
     def add_devicemobility(self, name: str, subnet: str, mask: str, members: list[str] | None = None) -> None:
-        members_xml = ""
-        if members:
-            member_entries = "".join(
-                f"<member>"
-                f"<devicePoolName>{m}</devicePoolName>"
-                f"</member>"
-                for i, m in enumerate(members, start=1)
-            )
-
-            members_xml = f"<members>{member_entries}</members>"
-            
-        body = f"""
-        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:ns="http://www.cisco.com/AXL/API/{self.axl_version}">
-        <soapenv:Body>
-            <ns:addDeviceMobility>
-            <deviceMobility>
-                <name>{name}</name>
-                <subNetDetails>
-                    <ipv4SubNetDetails>
-                        <ipv4Subnet>{subnet}</ipv4Subnet>
-                        <ipv4SubNetMaskSz>{mask}</ipv4SubNetMaskSz>
-                    </ipv4SubNetDetails>    
-                </subNetDetails>
-                {members_xml}
-            </deviceMobility>
-            </ns:addDeviceMobility>
-        </soapenv:Body>
-        </soapenv:Envelope>
-        """
-
-        r = self._post(body)
-
-        if r.status_code != 200:
-            raise RuntimeError(f"add_devicemobility failed: {r.text[:400]}")
-        
-        
-    def removeRegion(self, name: str) -> None:
-        self.remove_op("removeRegion", name=name)
-
-    def removeLocation(self, name: str) -> None:
-        self.remove_op("removeLocation", name=name)
-
-    def removePhysicalLocation(self, name: str) -> None:
-        self.remove_op("removePhysicalLocation", name=name)
-
-    def removeSrst(self, name: str) -> None:
-        self.remove_op("removeSrst", name=name)
-
-    def removeRoutePartition(self, name: str) -> None:
-        self.remove_op("removeRoutePartition", name=name)
-
-    def removeCss(self, name: str) -> None:
-        self.remove_op("removeCss", name=name)
-
-    def removeMediaResourceGroup(self, name: str) -> None:
-        self.remove_op("removeMediaResourceGroup", name=name)
-
-    def removeMediaResourceList(self, name: str) -> None:
-        self.remove_op("removeMediaResourceList", name=name)
-
-    def removeDevicePool(self, name: str) -> None:
-        self.remove_op("removeDevicePool", name=name)
+        self._add(
+            "device_mobility",
+            name=name,
+            subnet=subnet,
+            mask=mask,
+            members=_members((element("devicePoolName", m),) for m in members or []),
+        )
 
-    def removeDeviceMobility(self, name: str) -> None:
-        self.remove_op("removeDeviceMobility", name=name)
\ No newline at end of file
+    removeRegion = _remover("region")
+    removeLocation = _remover("location")
+    removePhysicalLocation = _remover("physical_location")
+    removeSrst = _remover("srst")
+    removeRoutePartition = _remover("partition")
+    removeCss = _remover("css")
+    removeMediaResourceGroup = _remover("mrg")
+    removeMediaResourceList = _remover("mrgl")
+    removeDevicePool = _remover("device_pool")
+    removeDeviceMobility = _remover("device_mobility")
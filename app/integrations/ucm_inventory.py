@@ -0,0 +1,112 @@
+from __future__ import annotations
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set
+
+
+class AxlInventory:
+    """
+    In-memory snapshot of existing CUCM object names, one set per planner type.
+
+    Instances are callable as exists_lookup(obj_type, name) -> bool, so they plug
+    straight into build_plan() and execute_plan(). Names compare case-insensitively,
+    as CUCM does. Types that were never loaded (or whose list call failed, see
+    `failed`) are not "covered": callers should use a live getXxx for them, and
+    calling the inventory itself answers through `fallback` when one is given.
+    """
+
+    def __init__(
+        self,
+        names: Optional[Dict[str, Iterable[str]]] = None,
+        fallback: Optional[Callable[[str, str], bool]] = None,
+    ):
+        self._names: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.fallback = fallback
+        self.failed: Dict[str, str] = {}  # obj_type -> why its list call failed
+        for obj_type, values in (names or {}).items():
+            self.load(obj_type, values)
+
+    def load(self, obj_type: str, names: Iterable[str]) -> None:
+        # drain the (possibly lazy, paged) iterable before locking so parallel loads overlap
+        names = {name.casefold() for name in names if name}
+        with self._lock:
+            self._names[obj_type] = names
+
+    def covers(self, obj_type: str) -> bool:
+        return obj_type in self._names
+
+    def __call__(self, obj_type: str, name: str) -> bool:
+        names = self._names.get(obj_type)
+        if names is None:
+            return bool(self.fallback(obj_type, name)) if self.fallback else False
+        return name.casefold() in names
+
+    def add(self, obj_type: str, name: str) -> None:
+        with self._lock:
+            if obj_type in self._names:
+                self._names[obj_type].add(name.casefold())
+
+    def discard(self, obj_type: str, name: str) -> None:
+        with self._lock:
+            if obj_type in self._names:
+                self._names[obj_type].discard(name.casefold())
+
+    def counts(self) -> Dict[str, int]:
+        return {t: len(v) for t, v in self._names.items()}
+
+
+class SqlExistenceOracle:
+    """
+    Batch existence checks backed by executeSQLQuery ("WHERE name IN (...)").
+
+    prefetch() resolves a whole plan's worth of names in O(chunks) AXL calls;
+    names that were not prefetched are resolved on demand, one small query each.
+    Same exists_lookup(obj_type, name) -> bool contract as AxlInventory, names
+    compared case-insensitively the same way.
+    """
+
+    def __init__(self, client, types: Iterable[str], chunk_size: Optional[int] = None):
+        self.client = client
+        self.chunk_size = chunk_size
+        self._types = set(types)
+        self._checked: Dict[str, Set[str]] = {}
+        self._existing: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def covers(self, obj_type: str) -> bool:
+        return obj_type in self._types
+
+    def prefetch(self, pairs: Iterable[tuple]) -> None:
+        pending: Dict[str, Set[str]] = {}
+        with self._lock:
+            for obj_type, name in pairs:
+                if obj_type not in self._types or not name:
+                    continue
+                key = name.casefold()
+                if key in self._checked.get(obj_type, ()):
+                    continue
+                pending.setdefault(obj_type, {})[key] = name
+
+        for obj_type, names in pending.items():
+            found = self.client.existing_names_sql(obj_type, names.values(), chunk_size=self.chunk_size)
+            with self._lock:
+                self._checked.setdefault(obj_type, set()).update(names)
+                self._existing.setdefault(obj_type, set()).update(n.casefold() for n in found)
+
+    def __call__(self, obj_type: str, name: str) -> bool:
+        key = name.casefold()
+        if key not in self._checked.get(obj_type, ()):
+            self.prefetch([(obj_type, name)])
+        return key in self._existing.get(obj_type, ())
+
+    def add(self, obj_type: str, name: str) -> None:
+        key = name.casefold()
+        with self._lock:
+            self._checked.setdefault(obj_type, set()).add(key)
+            self._existing.setdefault(obj_type, set()).add(key)
+
+    def discard(self, obj_type: str, name: str) -> None:
+        key = name.casefold()
+        with self._lock:
+            self._checked.setdefault(obj_type, set()).add(key)
+            self._existing.get(obj_type, set()).discard(key)
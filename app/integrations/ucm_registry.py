@@ -0,0 +1,161 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.integrations.ucm_axl import AXL_POOL_IDLE_TIMEOUT, UcmAxlClient
+
+# After a failed getCCMVersion, lookups skip negotiation for this long (seconds)
+AXL_NEGOTIATE_RETRY_AFTER = float(os.getenv("AXL_NEGOTIATE_RETRY_AFTER", "60"))
+
+
+def env_fingerprint(env: Dict[str, Any]) -> Tuple:
+    """Everything in an env payload that changes how its client is built."""
+    return (
+        env["cucm_url"],
+        env["cucm_username"],
+        env["cucm_password"],
+        bool(env.get("cucm_verify_tls", False)),
+        env.get("axl_read_rate"),
+        env.get("axl_write_rate"),
+    )
+
+
+class AxlClientRegistry:
+    """
+    One warm UcmAxlClient per environment, shared by every request and job in the
+    process: its keep-alive pool and its negotiated AXL version outlive a request.
+
+    A client is rebuilt when the env's credentials change, dropped by invalidate()
+    (env upserted) and closed once it has sat unused for idle_timeout seconds.
+    Background jobs take their client through lease(): a leased client is never
+    idle, and one replaced while leased is only closed when the last lease ends.
+    A failed version negotiation is not retried before retry_after seconds, so an
+    unreachable cluster costs one retry budget per window rather than per lookup.
+    """
+
+    def __init__(self, idle_timeout: float = AXL_POOL_IDLE_TIMEOUT, retry_after: float = AXL_NEGOTIATE_RETRY_AFTER):
+        self.idle_timeout = idle_timeout
+        self.retry_after = retry_after
+        self._clients: Dict[str, Tuple[UcmAxlClient, Tuple, float]] = {}
+        # env name -> time.monotonic() before which negotiation is not attempted again
+        self._negotiate_after: Dict[str, float] = {}
+        # id(client) -> open leases; retired clients wait here until their leases end
+        self._leases: Dict[int, int] = {}
+        self._retired: Dict[int, UcmAxlClient] = {}
+        self._lock = threading.Lock()
+
+    def get(self, env_name: str, env: Dict[str, Any]) -> UcmAxlClient:
+        fingerprint = env_fingerprint(env)
+        self.evict_idle()
+
+        with self._lock:
+            cached = self._clients.get(env_name)
+            if cached and cached[1] == fingerprint:
+                client = cached[0]
+                self._clients[env_name] = (client, fingerprint, time.monotonic())
+            else:
+                client = None
+
+        if client is None:
+            client = UcmAxlClient(
+                base_url=env["cucm_url"],
+                username=env["cucm_username"],
+                password=env["cucm_password"],
+                verify_tls=env.get("cucm_verify_tls", False),
+                read_rate=env.get("axl_read_rate"),
+                write_rate=env.get("axl_write_rate"),
+            )
+            with self._lock:
+                cached = self._clients.get(env_name)
+                retired = []
+                if cached and cached[1] == fingerprint:
+                    # another request built one meanwhile; keep theirs
+                    retired.append(client)
+                    client = cached[0]
+                else:
+                    if cached:
+                        # credentials changed
+                        retired = self._retire_locked([cached[0]])
+                    self._clients[env_name] = (client, fingerprint, time.monotonic())
+                    self._negotiate_after.pop(env_name, None)
+            for old in retired:
+                old.close()
+
+        if not client.version_negotiated and time.monotonic() >= self._negotiate_after.get(env_name, 0.0):
+            try:
+                client.negotiate_version()
+            except Exception:
+                # unreachable right now: keep the default version, try again after a while
+                with self._lock:
+                    self._negotiate_after[env_name] = time.monotonic() + self.retry_after
+
+        return client
+
+    @contextmanager
+    def lease(self, env_name: str, env: Dict[str, Any]) -> Iterator[UcmAxlClient]:
+        """get() for a job: the client stays open for as long as the block runs."""
+        client = self.get(env_name, env)
+        with self._lock:
+            self._leases[id(client)] = self._leases.get(id(client), 0) + 1
+        try:
+            yield client
+        finally:
+            with self._lock:
+                left = self._leases.pop(id(client)) - 1
+                if left:
+                    self._leases[id(client)] = left
+                cached = self._clients.get(env_name)
+                if cached and cached[0] is client:
+                    # idle time counts from the end of the job, not from its start
+                    self._clients[env_name] = (client, cached[1], time.monotonic())
+                retired = self._retired.pop(id(client), None) if not left else None
+            if retired is not None:
+                retired.close()
+
+    def _retire_locked(self, clients: List[UcmAxlClient]) -> List[UcmAxlClient]:
+        """Dropped clients that can be closed now; leased ones are closed by lease()."""
+        closable = []
+        for client in clients:
+            if self._leases.get(id(client)):
+                self._retired[id(client)] = client
+            else:
+                closable.append(client)
+        return closable
+
+    def invalidate(self, env_name: str) -> bool:
+        with self._lock:
+            cached = self._clients.pop(env_name, None)
+            self._negotiate_after.pop(env_name, None)
+            closable = self._retire_locked([cached[0]] if cached else [])
+        for client in closable:
+            client.close()
+        return cached is not None
+
+    def evict_idle(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                name for name, (client, _, last_used) in self._clients.items()
+                if now - last_used >= self.idle_timeout and not self._leases.get(id(client))
+            ]
+            evicted = [self._clients.pop(name)[0] for name in idle]
+            for name in idle:
+                self._negotiate_after.pop(name, None)
+        for client in evicted:
+            client.close()
+        return len(evicted)
+
+    def close_all(self) -> None:
+        with self._lock:
+            clients = [c for c, _, _ in self._clients.values()] + list(self._retired.values())
+            self._clients.clear()
+            self._retired.clear()
+            self._negotiate_after.clear()
+        for client in clients:
+            client.close()
+
+
+axl_clients = AxlClientRegistry()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+from functools import lru_cache
+from string import Formatter
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape
+
+# Compact AXL request templates. Each (version, operation) is compiled once into
+# literal/field pairs; rendering is a join plus XML escaping of every field value.
+
+SOAP_ENVELOPE_HEAD = (
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:ns="http://www.cisco.com/AXL/API/{version}"><soapenv:Body>'
+)
+SOAP_ENVELOPE_TAIL = "</soapenv:Body></soapenv:Envelope>"
+
+
+class Xml(str):
+    """An already-escaped XML fragment; templates insert it as-is."""
+
+
+def element(tag: str, value) -> Xml:
+    """<tag>value</tag> with value escaped; empty when value is None or ''."""
+    if value is None or value == "":
+        return Xml("")
+    return Xml(f"<{tag}>{escape(str(value))}</{tag}>")
+
+
+def members(entries: Iterable[Iterable[Xml]]) -> Xml:
+    """<members><member>...</member>...</members>; empty when there are no entries."""
+    inner = "".join(f"<member>{''.join(children)}</member>" for children in entries)
+    return Xml(f"<members>{inner}</members>") if inner else Xml("")
+
+
+def envelope(axl_version: str, inner: str) -> str:
+    return SOAP_ENVELOPE_HEAD.replace("{version}", axl_version) + inner + SOAP_ENVELOPE_TAIL
+
+
+class SoapTemplate:
+    """
+    One AXL operation, e.g. addRegion, compiled for one AXL version.
+    Field values are escaped on render unless they are Xml fragments; None
+    renders as nothing.
+    """
+
+    __slots__ = ("op", "fields", "_parts")
+
+    def __init__(self, axl_version: str, op: str, body: str):
+        self.op = op
+        text = envelope(axl_version, f"<ns:{op}>{body}</ns:{op}>")
+        self._parts = tuple((literal, field) for literal, field, _, _ in Formatter().parse(text))
+        self.fields = frozenset(field for _, field in self._parts if field)
+
+    def render(self, **values) -> bytes:
+        missing = self.fields.difference(values)
+        if missing:
+            raise ValueError(f"{self.op}: missing fields {', '.join(sorted(missing))}")
+
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is None:
+                continue
+            value: Optional[object] = values[field]
+            if value is None:
+                continue
+            out.append(value if isinstance(value, Xml) else escape(str(value)))
+        return "".join(out).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def compile_template(axl_version: str, op: str, body: str) -> SoapTemplate:
+    return SoapTemplate(axl_version, op, body)
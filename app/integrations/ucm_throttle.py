@@ -0,0 +1,207 @@
+from __future__ import annotations
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+
+# Adaptive (AIMD) concurrency per cluster
+AXL_CONCURRENCY_MIN = int(os.getenv("AXL_CONCURRENCY_MIN", "1"))
+AXL_CONCURRENCY_INITIAL = int(os.getenv("AXL_CONCURRENCY_INITIAL", "2"))
+AXL_CONCURRENCY_WINDOW = int(os.getenv("AXL_CONCURRENCY_WINDOW", "20"))
+AXL_LATENCY_TOLERANCE = float(os.getenv("AXL_LATENCY_TOLERANCE", "1.5"))
+
+# AXL answers an overloaded publisher with HTTP 503 or a throttle fault
+AXL_THROTTLE_MARKERS = ("throttl", "too busy", "maximum axl")
+
+OP_READ = "read"
+OP_WRITE = "write"
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, at most `burst` banked.
+    acquire() blocks until a token is available (or the deadline passes).
+    A rate of 0 or less means unlimited.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate or 0)
+        self.burst = float(burst or max(1.0, self.rate))
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# (cluster url, op) -> bucket; shared by every client talking to the same cluster
+_BUCKETS: Dict[Tuple[str, str], TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def bucket_for(cluster: str, op: str, rate: float) -> TokenBucket:
+    """Process-wide bucket per cluster and op; a changed rate replaces the bucket."""
+    key = (cluster, op)
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(key)
+        if bucket is None or bucket.rate != float(rate or 0):
+            bucket = TokenBucket(rate)
+            _BUCKETS[key] = bucket
+        return bucket
+
+
+def is_throttled(r) -> bool:
+    if r.status_code in (429, 503):
+        return True
+    if r.status_code == 500:
+        text = (r.text or "")[:2000].lower()
+        return any(m in text for m in AXL_THROTTLE_MARKERS)
+    return False
+
+
+def _failed_to_connect(exc: Exception) -> bool:
+    """True if the request never got a connection (refused, DNS, connect timeout)."""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    reason = exc.args[0] if exc.args else None
+    reason = getattr(reason, "reason", reason)  # requests wraps urllib3's MaxRetryError
+    return isinstance(reason, ConnectTimeoutError)  # includes NewConnectionError
+
+
+def is_retryable_error(exc: Exception, op: str) -> bool:
+    """
+    Reads are repeated after any connection failure or timeout. Writes are only
+    repeated when no connection was made: a reset or "Connection aborted" once the
+    request was sent (e.g. a stale keep-alive) and a read timeout are ambiguous,
+    since the add*/remove* may already have been applied.
+    """
+    if op == OP_READ:
+        return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+    return _failed_to_connect(exc)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff; a Retry-After header (seconds) is a floor."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, min(cap, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on AXL requests in flight to one cluster.
+
+    Latencies are collected in windows of AXL_CONCURRENCY_WINDOW calls (or `limit`
+    calls, whichever is more). At the end of a window:
+      - a throttle answer or transport error halves the limit;
+      - a p95 above AXL_LATENCY_TOLERANCE x the baseline p95 cuts it by a quarter;
+      - otherwise, if the window actually used the whole limit, it grows by one.
+    The baseline follows the best healthy p95 seen and drifts up slowly, so a
+    cluster that is simply slower than the first window does not shrink forever.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = AXL_CONCURRENCY_MIN,
+        initial: int = AXL_CONCURRENCY_INITIAL,
+        window: int = AXL_CONCURRENCY_WINDOW,
+        tolerance: float = AXL_LATENCY_TOLERANCE,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = max(self.min_limit, min(initial, self.max_limit))
+        self.window = max(1, window)
+        self.tolerance = tolerance
+        self.baseline: Optional[float] = None
+        self.in_flight = 0
+        self._peak = 0
+        self._samples: List[float] = []
+        self._congested = False
+        self._cond = threading.Condition()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        with self._cond:
+            while self.in_flight >= self.limit:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            self._peak = max(self._peak, self.in_flight)
+            return True
+
+    def release(self, latency: float, congested: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._samples.append(latency)
+            self._congested = self._congested or congested
+            if len(self._samples) >= max(self.window, self.limit):
+                self._adjust()
+            self._cond.notify_all()
+
+    def _adjust(self) -> None:
+        samples = sorted(self._samples)
+        p95 = samples[int(0.95 * (len(samples) - 1))]
+
+        if self._congested:
+            self.limit = max(self.min_limit, self.limit // 2)
+        elif self.baseline is not None and p95 > self.baseline * self.tolerance:
+            self.limit = max(self.min_limit, (self.limit * 3) // 4)
+        else:
+            if self._peak >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1)
+            self.baseline = p95 if self.baseline is None else min(p95, 0.9 * self.baseline + 0.1 * p95)
+
+        self._samples = []
+        self._peak = self.in_flight
+        self._congested = False
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "max_limit": self.max_limit,
+                "baseline_p95": self.baseline,
+            }
+
+
+# cluster url -> limiter; shared by every client talking to the same cluster
+_LIMITERS: Dict[str, AdaptiveLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter_for(cluster: str, max_limit: int) -> AdaptiveLimiter:
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(cluster)
+        if limiter is None:
+            limiter = AdaptiveLimiter(max_limit)
+            _LIMITERS[cluster] = limiter
+        else:
+            with limiter._cond:
+                limiter.max_limit = max(1, max_limit)
+                limiter.limit = min(limiter.limit, limiter.max_limit)
+        return limiter
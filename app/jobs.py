@@ -0,0 +1,295 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from app.db import db_connect
+from app.events import bus, channel_name
+
+# Background execution/rollback jobs
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "4"))
+JOBS_MAX_PER_ENV = int(os.getenv("JOBS_MAX_PER_ENV", "1"))
+
+ACTIVE_STATUSES = ("QUEUED", "RUNNING", "PAUSED", "CANCELLING")
+
+# job kind -> progress channel kind (see app.journal)
+JOB_CHANNELS = {"execute": "execution", "resume": "execution", "rollback": "rollback"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobConflict(RuntimeError):
+    """submit() refused: another job for the same plan is still active."""
+
+    def __init__(self, job: dict):
+        super().__init__(f"Job {job['id']} is still {job['status']} for this plan")
+        self.job = job
+
+
+class JobControl:
+    """
+    Cooperative cancel/pause flags handed to execute_plan / rollback_plan.
+    Work already sent to CUCM finishes; nothing new is started while paused or
+    after cancel.
+    """
+
+    def __init__(self):
+        self._cancel = threading.Event()
+        self._resume = threading.Event()
+        self._resume.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        self._resume.set()
+
+    def pause(self) -> None:
+        self._resume.clear()
+
+    def resume(self) -> None:
+        self._resume.set()
+
+    def wait_resumed(self, timeout: Optional[float] = None) -> bool:
+        return self._resume.wait(timeout)
+
+    def checkpoint(self) -> bool:
+        """Block while paused; False once the job has been cancelled."""
+        self._resume.wait()
+        return not self.cancelled
+
+
+class JobRunner:
+    """
+    Bounded pool for long-running work. Job state lives in the jobs table of
+    app.db; at most JOBS_MAX_PER_ENV jobs run against one env at a time and the
+    rest wait in FIFO order.
+    """
+
+    def __init__(self, max_workers: int = JOBS_MAX_WORKERS, max_per_env: int = JOBS_MAX_PER_ENV):
+        self.max_workers = max_workers
+        self.max_per_env = max_per_env
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._pending: deque = deque()
+        self._running_per_env: Dict[str, int] = {}
+        self._running = 0
+        self._controls: Dict[str, JobControl] = {}
+
+    # ---- submission / dispatch ----
+
+    def submit(
+        self,
+        kind: str,
+        plan_id: str,
+        env_name: str,
+        fn: Callable[[JobControl], dict],
+        params: Optional[dict] = None,
+    ) -> dict:
+        """Queue fn for the plan; raises JobConflict if the plan already has an active job."""
+        job_id = str(uuid.uuid4())
+        control = JobControl()
+
+        # check-and-insert under the lock so two requests cannot both start the plan
+        with self._lock:
+            active = self.active_for_plan(plan_id)
+            if active:
+                raise JobConflict(active)
+
+            conn = db_connect()
+            try:
+                conn.execute(
+                    "INSERT INTO jobs(id, kind, plan_id, env_name, status, params_json, created_at) "
+                    "VALUES(?,?,?,?,?,?,?)",
+                    (job_id, kind, plan_id, env_name, "QUEUED", json.dumps(params or {}), _now()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+            self._controls[job_id] = control
+            self._pending.append((job_id, env_name, fn, control))
+            self._dispatch_locked()
+
+        return self.get(job_id)
+
+    def _dispatch_locked(self) -> None:
+        waiting = deque()
+        while self._pending and self._running < self.max_workers:
+            job_id, env_name, fn, control = self._pending.popleft()
+            if self._running_per_env.get(env_name, 0) >= self.max_per_env:
+                waiting.append((job_id, env_name, fn, control))
+                continue
+            self._running += 1
+            self._running_per_env[env_name] = self._running_per_env.get(env_name, 0) + 1
+            self._pool.submit(self._run, job_id, env_name, fn, control)
+        waiting.extend(self._pending)
+        self._pending = waiting
+
+    def _run(self, job_id: str, env_name: str, fn: Callable[[JobControl], dict], control: JobControl) -> None:
+        final: Dict[str, Any] = {}
+        try:
+            if control.cancelled:
+                final = {"status": "CANCELLED", "finished_at": _now()}
+                return
+
+            self._update(job_id, status="RUNNING", started_at=_now())
+            try:
+                result = fn(control) or {}
+                final = {
+                    "status": "CANCELLED" if control.cancelled else "SUCCEEDED",
+                    "finished_at": _now(),
+                    "result_json": json.dumps(_result_summary(result)),
+                }
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                final = {"status": "FAILED", "finished_at": _now(), "error": str(detail)}
+        finally:
+            # the final status and dropping the control happen together, so a
+            # pause/resume/cancel either sees the job still running or not at all
+            with self._lock:
+                if final:
+                    self._update(job_id, **final)
+                self._running -= 1
+                self._running_per_env[env_name] -= 1
+                self._controls.pop(job_id, None)
+                self._dispatch_locked()
+
+    # ---- control ----
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            control = self._controls.get(job_id)
+            queued = [p for p in self._pending if p[0] == job_id]
+            if queued:
+                self._pending.remove(queued[0])
+                self._controls.pop(job_id, None)
+            if control is not None:
+                control.cancel()
+                self._update(job_id, status="CANCELLED" if queued else "CANCELLING",
+                             finished_at=_now() if queued else None)
+        return self.get(job_id)
+
+    def pause(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self.get(job_id)
+            control = self._controls.get(job_id)
+            if job and job["status"] == "RUNNING" and control is not None:
+                control.pause()
+                self._update(job_id, status="PAUSED")
+        return self.get(job_id)
+
+    def resume(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self.get(job_id)
+            control = self._controls.get(job_id)
+            if job and job["status"] == "PAUSED" and control is not None:
+                control.resume()
+                self._update(job_id, status="RUNNING")
+        return self.get(job_id)
+
+    # ---- queries ----
+
+    def get(self, job_id: str) -> Optional[dict]:
+        conn = db_connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id=?", (job_id,))
+            row = cur.fetchone()
+            return _row_to_job(row) if row else None
+        finally:
+            conn.close()
+
+    def list(self, plan_id: Optional[str] = None, limit: int = 100) -> List[dict]:
+        conn = db_connect()
+        try:
+            cur = conn.cursor()
+            sql = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs"
+            args: tuple = ()
+            if plan_id:
+                sql += " WHERE plan_id=?"
+                args = (plan_id,)
+            sql += " ORDER BY created_at DESC LIMIT ?"
+            cur.execute(sql, args + (limit,))
+            return [_row_to_job(r) for r in cur.fetchall()]
+        finally:
+            conn.close()
+
+    def active_for_plan(self, plan_id: str) -> Optional[dict]:
+        for job in self.list(plan_id=plan_id):
+            if job["status"] in ACTIVE_STATUSES:
+                return job
+        return None
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields = {k: v for k, v in fields.items() if v is not None}
+        conn = db_connect()
+        try:
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{k}=?' for k in fields)} WHERE id=?",
+                (*fields.values(), job_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        if "status" in fields:
+            job = self.get(job_id)
+            if job:
+                kind = JOB_CHANNELS.get(job["kind"], job["kind"])
+                done = job["status"] not in ACTIVE_STATUSES
+                bus.publish(
+                    channel_name(kind, job["plan_id"]),
+                    {"event": "job_done" if done else "job", "job": job},
+                )
+
+
+JOB_COLUMNS = (
+    "id", "kind", "plan_id", "env_name", "status", "params_json",
+    "result_json", "error", "created_at", "started_at", "finished_at",
+)
+
+
+def _row_to_job(row) -> dict:
+    job = dict(zip(JOB_COLUMNS, row))
+    job["params"] = json.loads(job.pop("params_json") or "{}")
+    job["result"] = json.loads(job.pop("result_json") or "null")
+    return job
+
+
+def _result_summary(result: dict) -> dict:
+    # execution/rollback details live in the journal; keep the job row small
+    counts: Dict[str, int] = {}
+    for r in result.get("results", []):
+        counts[r.get("status")] = counts.get(r.get("status"), 0) + 1
+    return {"status": result.get("status"), "counts": counts}
+
+
+def mark_interrupted_jobs() -> None:
+    """Jobs that were active when the process stopped cannot continue by themselves."""
+    conn = db_connect()
+    try:
+        conn.execute(
+            f"UPDATE jobs SET status='INTERRUPTED', finished_at=? "
+            f"WHERE status IN ({', '.join('?' for _ in ACTIVE_STATUSES)})",
+            (_now(), *ACTIVE_STATUSES),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+job_runner = JobRunner()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.events import bus, channel_name
+
+# Executions and rollbacks are recorded as:
+#   <plan_id>.json / <plan_id>.rollback.json       small header/summary (no results)
+#   <plan_id>.jsonl / <plan_id>.rollback.jsonl     append-only journal, one record per line
+# Each step appends one line, so an N-step run writes O(N) bytes instead of
+# re-serialising the whole state before and after every step.
+
+KIND_EXECUTION = "execution"
+KIND_ROLLBACK = "rollback"
+
+# results that survive a resume: finished work that must not be repeated
+RESUME_KEEP_STATUSES = {"CREATED", "EXISTS", "SKIPPED"}
+
+# run statuses written by a "finish" record
+FINISHED_STATUSES = {"SUCCESS", "PARTIAL_SUCCESS", "FAILED", "CANCELLED"}
+
+
+def executions_dir() -> Path:
+    return Path(os.getenv("APP_DATA_EXECUTIONS_DIR", "/data/executions"))
+
+
+def summary_path(plan_id: str, kind: str = KIND_EXECUTION, exec_dir: Optional[Path] = None) -> Path:
+    suffix = ".rollback.json" if kind == KIND_ROLLBACK else ".json"
+    return (exec_dir or executions_dir()) / f"{plan_id}{suffix}"
+
+
+def journal_path(plan_id: str, kind: str = KIND_EXECUTION, exec_dir: Optional[Path] = None) -> Path:
+    suffix = ".rollback.jsonl" if kind == KIND_ROLLBACK else ".jsonl"
+    return (exec_dir or executions_dir()) / f"{plan_id}{suffix}"
+
+
+def write_json_atomic(path: Path, payload: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=2))
+    tmp.replace(path)
+
+
+class Journal:
+    """
+    Writer for one execution or rollback run.
+
+    Every record carries "seq", its position in the run (restarting at 1 on start),
+    so a subscriber can tell which published records a replayed snapshot covers.
+
+    Records:
+      {"event": "start", "header": {...}}
+      {"event": "resume", "header": {...}}    (unfinished results before it are dropped)
+      {"event": "step", "current_step": {...}}
+      {"event": "result", "result": {...}, "counted": bool}
+      {"event": "finish", "status": ..., "finished_at": ...}
+    """
+
+    def __init__(self, plan_id: str, kind: str = KIND_EXECUTION, exec_dir: Optional[Path] = None):
+        self.plan_id = plan_id
+        self.kind = kind
+        self.exec_dir = exec_dir or executions_dir()
+        self.path = journal_path(plan_id, kind, self.exec_dir)
+        self.summary_path = summary_path(plan_id, kind, self.exec_dir)
+        self.header: Dict[str, Any] = {}
+        self.completed_steps = 0
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def start(self, header: Dict[str, Any]) -> None:
+        """Begin a fresh journal (truncating any previous run for this plan)."""
+        self.exec_dir.mkdir(parents=True, exist_ok=True)
+        self.header = {k: v for k, v in header.items() if k != "results"}
+        self._fh = open(self.path, "w", encoding="utf-8")
+        self._append({"event": "start", "header": self.header})
+        self._write_summary()
+
+    def resume(self, header: Dict[str, Any], completed_steps: int, seq: int = 0) -> None:
+        """
+        Continue an existing journal after a crash/restart instead of truncating it.
+
+        A run recorded only in the legacy single JSON file has no journal yet: a fresh
+        one is started and the kept header["results"] are written into it first, since
+        the summary rewritten below no longer carries results. seq is the replayed
+        state's "seq", so numbering continues where the journal left off.
+        """
+        self.exec_dir.mkdir(parents=True, exist_ok=True)
+        self.header = {k: v for k, v in header.items() if k != "results"}
+        self.completed_steps = completed_steps
+
+        if not self.path.exists():
+            self._fh = open(self.path, "w", encoding="utf-8")
+            self._append({"event": "start", "header": self.header})
+            for result in header.get("results") or ():
+                counted = result.get("status") != "SKIPPED"
+                self._append({"event": "result", "result": result, "counted": counted})
+            self._write_summary()
+            return
+
+        self.seq = seq
+        # a crash can leave a torn last line without its newline; close it off
+        needs_newline = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, "rb") as fh:
+                fh.seek(-1, os.SEEK_END)
+                needs_newline = fh.read(1) != b"\n"
+
+        self._fh = open(self.path, "a", encoding="utf-8")
+        if needs_newline:
+            self._fh.write("\n")
+        self._append({"event": "resume", "header": self.header})
+        self._write_summary()
+
+    def step(self, current_step: Dict[str, Any]) -> None:
+        self._append({"event": "step", "current_step": current_step})
+
+    def result(self, result: Dict[str, Any], counted: bool = True) -> None:
+        with self._lock:
+            if counted:
+                self.completed_steps += 1
+            self._append_locked({"event": "result", "result": result, "counted": counted})
+
+    def finish(self, status: str, finished_at: Optional[str] = None) -> None:
+        finished_at = finished_at or datetime.utcnow().isoformat()
+        self._append({"event": "finish", "status": status, "finished_at": finished_at})
+        self.header["status"] = status
+        self.header["finished_at"] = finished_at
+        self._write_summary()
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self._append_locked(record)
+
+    def _append_locked(self, record: dict) -> None:
+        self.seq += 1
+        record["seq"] = self.seq
+        self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        # live subscribers (SSE) get the same record plus running progress
+        bus.publish(
+            channel_name(self.kind, self.plan_id),
+            {**record, "plan_id": self.plan_id, "completed_steps": self.completed_steps},
+        )
+
+    def _write_summary(self) -> None:
+        summary = dict(self.header)
+        summary["completed_steps"] = self.completed_steps
+        summary["journal"] = self.path.name
+        write_json_atomic(self.summary_path, summary)
+
+
+def replay(path: Path) -> Optional[Dict[str, Any]]:
+    """Rebuild the full state dict (header + results + progress) from a journal."""
+    if not path.exists():
+        return None
+
+    state: Dict[str, Any] = {}
+    results = []  # (result, counted)
+    seq = 0
+
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                # a crash can leave a torn line; skip it, later records are still valid
+                continue
+
+            event = rec.get("event")
+            seq = rec.get("seq", seq + 1)
+            if event == "start":
+                state = dict(rec.get("header") or {})
+                results = []
+                state["current_step"] = None
+            elif event == "resume":
+                state.update(rec.get("header") or {})
+                state["current_step"] = None
+                results = [(r, c) for r, c in results if r.get("status") in RESUME_KEEP_STATUSES]
+            elif event == "step":
+                state["current_step"] = rec.get("current_step")
+            elif event == "result":
+                results.append((rec["result"], rec.get("counted", True)))
+            elif event == "finish":
+                state["status"] = rec.get("status")
+                state["finished_at"] = rec.get("finished_at")
+                state["current_step"] = None
+
+    state["completed_steps"] = sum(1 for _, counted in results if counted)
+    state["seq"] = seq
+    state["results"] = [r for r, _ in results]
+    return state
+
+
+def read_state(plan_id: str, kind: str = KIND_EXECUTION, exec_dir: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    Current state of an execution/rollback: replayed from the journal when there
+    is one, otherwise the legacy single JSON file (which already holds results).
+    """
+    state = replay(journal_path(plan_id, kind, exec_dir))
+    if state is not None:
+        return state
+
+    legacy = summary_path(plan_id, kind, exec_dir)
+    if legacy.exists():
+        return json.loads(legacy.read_text())
+    return None
+
+
+def read_summary(plan_id: str, kind: str = KIND_EXECUTION, exec_dir: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    path = summary_path(plan_id, kind, exec_dir)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
@@ -1,27 +1,32 @@
 from __future__ import annotations
-import csv
-import io
+import functools
 import json
 import os
+import shutil
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
-import yaml
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from app.db import init_db, db_connect
-from app.csv_schema import SiteRow
-from app.naming import NamingProfile
-from app.planner import build_plan
-from app.secrets import encrypt_json, decrypt_json
+from app.csv_schema import CsvValidationError, SiteRow, iter_site_batches
+from app.naming import NamingProfile, compile_dialplan, load_yaml
+from app.planner import build_plan, dialplan_context
+from app.site_store import load_sites, site_column, store_sites
+from app.secrets import TooManySessions, derive_key, encrypt_with_key, decrypt_with_key, unlock_sessions
 from app.executor import execute_plan, rollback_plan
+from app.events import channel_name, sse_stream
+from app.jobs import JobConflict, job_runner, mark_interrupted_jobs
+from app.journal import FINISHED_STATUSES, KIND_EXECUTION, KIND_ROLLBACK, read_state, read_summary
 from app.integrations.ucm_axl import UcmAxlClient
+from app.integrations.ucm_registry import axl_clients
 
 app = FastAPI(title="CUCM Site Provisioner", version="0.1.0")
 
@@ -30,9 +35,14 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 @app.on_event("startup")
 def on_startup():
     init_db()
+    mark_interrupted_jobs()
     Path(os.getenv("APP_DATA_DIR", "/data")).mkdir(parents=True, exist_ok=True)
     Path(os.getenv("APP_DATA_EXECUTIONS_DIR","/app/data/executions")).mkdir(parents=True, exist_ok=True)
 
+@app.on_event("shutdown")
+def on_shutdown():
+    axl_clients.close_all()
+
 @app.get("/", response_class=HTMLResponse)
 def index():
     return Path("app/static/index.html").read_text(encoding="utf-8")
@@ -44,24 +54,62 @@ class EnvUpsert(BaseModel):
     cucm_username: str
     cucm_password: str
     cucm_verify_tls: bool = False
+    # AXL requests/second allowed against this cluster (None = AXL_READ_RATE / AXL_WRITE_RATE)
+    axl_read_rate: Optional[float] = None
+    axl_write_rate: Optional[float] = None
     # unity later
 
 class EnvListItem(BaseModel):
     name: str
     
 class VerifyGlobalsRequest(BaseModel):
+    passphrase: Optional[str] = None
+    session: Optional[str] = None
+
+class UnlockRequest(BaseModel):
     passphrase: str
+    # the passphrase is checked against this env before a session is issued
+    env_name: str
+
+class LockRequest(BaseModel):
+    session: str
+
+@functools.lru_cache(maxsize=1)
+def _server_key(passphrase: str) -> bytes:
+    return derive_key(passphrase)
+
+def resolve_key(passphrase: Optional[str] = None, session: Optional[str] = None, allow_server: bool = False) -> bytes:
+    """
+    Encryption key for a request: an unlocked session first, then an explicit
+    passphrase, then (where allow_server) APP_PASSPHRASE, derived once per process.
+    """
+    if session:
+        key = unlock_sessions.key_for(session)
+        if key is None:
+            raise HTTPException(status_code=401, detail="Session expired or locked; unlock again")
+        return key
+    if passphrase:
+        return derive_key(passphrase)
+    if allow_server and os.getenv("APP_PASSPHRASE"):
+        return _server_key(os.environ["APP_PASSPHRASE"])
+    raise HTTPException(status_code=400, detail="passphrase or session is required")
+
+EXISTENCE_MODES = ("get", "inventory", "sql")
+
+def build_exists_lookup(client: UcmAxlClient, mode: str):
+    if mode not in EXISTENCE_MODES:
+        raise HTTPException(status_code=400, detail=f"existence must be one of {', '.join(EXISTENCE_MODES)}")
+    if mode == "inventory":
+        return client.load_inventory()
+    if mode == "sql":
+        return client.sql_existence_oracle()
+    return None
 
 def resolve_dialplan_path(env_name: str) -> str:
     base = Path(os.getenv("APP_DATA_DIR", "/data")) / "dialplans" / "customers"
     safe_env = env_name.lower().replace(" ", "-")
     path = base / safe_env / "dialplan.yml"
 
-    print("DEBUG: Dialplan base =", base)
-    print("DEBUG: Dialplan env dir =", base / safe_env)
-    print("DEBUG: Dialplan full path =", path)
-    print("DEBUG: Exists? =", path.exists())
-
     return str(path)
 
 @app.get("/api/envs", response_model=List[EnvListItem])
@@ -74,13 +122,37 @@ def list_envs():
     finally:
         conn.close()
 
-@app.post("/api/envs/{name}")
-def upsert_env(name: str, payload: EnvUpsert, passphrase: Optional[str] = None):
-    passphrase = passphrase or os.getenv("APP_PASSPHRASE")
-    if not passphrase:
-        raise HTTPException(status_code=400, detail="passphrase is required (query param passphrase or APP_PASSPHRASE)")
+@app.post("/api/unlock")
+def unlock(req: UnlockRequest):
+    """
+    Derive the key once and hand back an opaque session token; later calls pass
+    `session` instead of the passphrase until it is locked or expires. Only a
+    passphrase that decrypts env_name gets a session.
+    """
+    key = derive_key(req.passphrase)
+    try:
+        load_env_internal(req.env_name, key)
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=403, detail="Invalid passphrase")
+    try:
+        session = unlock_sessions.unlock(key)
+    except TooManySessions as e:
+        raise HTTPException(status_code=429, detail=f"{e}; lock one or wait for it to expire")
+    return {
+        "session": session.token,
+        "expires_at": datetime.fromtimestamp(session.expires_at, timezone.utc).isoformat(),
+        "ttl": unlock_sessions.ttl,
+    }
+
+@app.post("/api/lock")
+def lock(req: LockRequest):
+    return {"status": "OK", "locked": unlock_sessions.lock(req.session)}
 
-    blob = encrypt_json(passphrase, payload.model_dump())
+@app.post("/api/envs/{name}")
+def upsert_env(name: str, payload: EnvUpsert, passphrase: Optional[str] = None, session: Optional[str] = None):
+    blob = encrypt_with_key(resolve_key(passphrase, session, allow_server=True), payload.model_dump())
     conn = db_connect()
     try:
         cur = conn.cursor()
@@ -90,15 +162,15 @@ def upsert_env(name: str, payload: EnvUpsert, passphrase: Optional[str] = None):
             (payload.name, blob, datetime.now(timezone.utc).isoformat()),
         )
         conn.commit()
+        # the next request rebuilds the client (and renegotiates the version)
+        axl_clients.invalidate(payload.name)
         return {"status": "OK"}
     finally:
         conn.close()
         
 @app.get("/api/envs/{name}")
-def get_env(name: str, passphrase: str | None = None) -> Dict[str, Any]:
-    passphrase = passphrase or os.getenv("APP_PASSPHRASE")
-    if not passphrase:
-        raise HTTPException(status_code=400, detail="passphrase is required (query param passphrase or APP_PASSPHRASE)")
+def get_env(name: str, passphrase: str | None = None, session: str | None = None) -> Dict[str, Any]:
+    key = resolve_key(passphrase, session, allow_server=True)
     conn = db_connect()
     cur = conn.cursor()
     cur.execute("SELECT payload_encrypted FROM envs WHERE name=?", (name,))
@@ -112,7 +184,7 @@ def get_env(name: str, passphrase: str | None = None) -> Dict[str, Any]:
         if isinstance(blob, str):
             blob = blob.encode("utf-8")
 
-        env = decrypt_json(passphrase, blob)
+        env = decrypt_with_key(key, blob)
     except Exception:
         raise HTTPException(
             status_code=403,
@@ -123,7 +195,8 @@ def get_env(name: str, passphrase: str | None = None) -> Dict[str, Any]:
     return env
 
 @app.post("/api/envs/test")
-def test_env(name: str, passphrase: str):
+def test_env(name: str, passphrase: Optional[str] = None, session: Optional[str] = None):
+    key = resolve_key(passphrase, session)
     conn = db_connect()
     cur = conn.cursor()
     cur.execute("SELECT payload_encrypted FROM envs WHERE name=?", (name,))
@@ -137,22 +210,18 @@ def test_env(name: str, passphrase: str):
         if isinstance(blob, str):
             blob = blob.encode("utf-8")
 
-        env = decrypt_json(passphrase, blob)
+        env = decrypt_with_key(key, blob)
     except Exception:
         raise HTTPException(status_code=403, detail="Invalid passphrase")
 
     try:
-        client = UcmAxlClient(
-            base_url=env["cucm_url"],
-            username=env["cucm_username"],
-            password=env["cucm_password"],
-            verify_tls=env.get("cucm_verify_tls", False),
-        )
+        client = axl_clients.get(name, env)
         xml = client.get_version()
 
         return {
             "status": "ok",
             "message": "AXL authentication successful",
+            "axl_version": client.axl_version,
             "raw_response_snippet": xml[:300],
         }
     except Exception as e:
@@ -166,31 +235,50 @@ def get_dialplan(env_name: str):
 
     return {
         "env_name": env_name,
-        "dialplan": yaml.safe_load(Path(path).read_text())
+        "dialplan": load_yaml(path)
     }
     
 @app.post("/api/dialplans/{env_name}/render")
 def render_dialplan(env_name: str, payload: dict):
     path = resolve_dialplan_path(env_name)
-    dialplan = yaml.safe_load(Path(path).read_text())
+    try:
+        # same compiled templates the planner renders with; bad placeholders are a 400
+        templates = compile_dialplan(load_yaml(path))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     ctx = payload  # site, site_name, city, state, org
+    if payload.get("upload_id") and payload.get("site_code"):
+        # preview a stored site instead of hand-typed fields
+        conn = db_connect()
+        try:
+            sites = load_upload_sites(conn, payload["upload_id"], site_codes=[payload["site_code"]])
+        finally:
+            conn.close()
+        if not sites:
+            raise HTTPException(status_code=404, detail=f"site_code {payload['site_code']} not in upload")
+        org = (payload.get("org") or os.getenv("APP_ORG", "US")).strip().upper()
+        ctx = dialplan_context(org, sites[0])
+
+    used = {f for _, name, desc, *_ in templates.partitions + templates.css for f in name.fields + desc.fields}
+    missing = sorted(f for f in used if ctx.get(f) is None)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"missing fields: {', '.join(missing)}")
 
     partitions = []
-    for k, p in dialplan["partitions"].items():
-        if p.get("scope") == "site":
-            partitions.append({
-                "key": k,
-                "name": p["name"].format(**ctx),
-                "description": p.get("description","").format(**ctx)
-            })
+    for k, name, description in templates.partitions:
+        partitions.append({
+            "key": k,
+            "name": name.render(ctx),
+            "description": description.render(ctx)
+        })
 
     css = []
-    globals_p = dialplan["globals"]["partitions"]
+    globals_p = templates.global_partitions
 
-    for k, c in dialplan["css"].items():
+    for k, name, description, member_keys in templates.css:
         members = []
-        for m in c["members"]:
+        for m in member_keys:
             if m in globals_p:
                 members.append({"alias": m, "type": "global", "name": globals_p[m]})
             else:
@@ -198,8 +286,8 @@ def render_dialplan(env_name: str, payload: dict):
 
         css.append({
             "key": k,
-            "name": c["name"].format(**ctx),
-            "description": c.get("description","").format(**ctx),
+            "name": name.render(ctx),
+            "description": description.render(ctx),
             "members": members
         })
 
@@ -210,51 +298,40 @@ def render_dialplan(env_name: str, payload: dict):
     
 @app.post("/api/dialplans/{env_name}/verify-globals")
 def verify_globals(env_name: str, payload: VerifyGlobalsRequest):
-    passphrase = payload.passphrase
-
-    env = load_env_internal(env_name, passphrase)
+    env = load_env_internal(env_name, resolve_key(payload.passphrase, payload.session))
 
-    client = UcmAxlClient(
-        base_url=env["cucm_url"],
-        username=env["cucm_username"],
-        password=env["cucm_password"],
-        verify_tls=env.get("cucm_verify_tls", False),
-    )
+    client = axl_clients.get(env_name, env)
 
     path = resolve_dialplan_path(env_name)
     if not path:
         raise HTTPException(status_code=404, detail="Dialplan not found")
 
-    dialplan = yaml.safe_load(Path(path).read_text())
-
-    # Normalize existing CUCM partitions
-    existing = {p.strip() for p in client.list_partitions()}
+    dialplan = load_yaml(path)
 
     globals_section = dialplan.get("globals", {})
     global_partitions = globals_section.get("partitions", {}).values()
     print("YAML globals:", repr(list(global_partitions)))
-    print("AXL partitions:", repr(list(existing)))
-    found = []
-    missing = []
-
-    for name in global_partitions:
-        if not name:
-            continue
 
-        normalized = name.strip()
+    wanted = {name.strip() for name in global_partitions if name}
 
-        if normalized in existing:
-            found.append(normalized)
-        else:
-            missing.append(normalized)
+    # Stream CUCM partitions page by page; stop as soon as every global is seen
+    existing = set()
+    if wanted:
+        for name in client.iter_names("partition"):
+            if name in wanted:
+                existing.add(name)
+                if len(existing) == len(wanted):
+                    break
 
     return {
-        "found": sorted(found),
-        "missing": sorted(missing),
+        "found": sorted(existing),
+        "missing": sorted(wanted - existing),
     }
 
+UPLOAD_CHUNK_BYTES = int(os.getenv("APP_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
 @app.post("/api/upload")
-async def upload_csv(file: UploadFile = File(...)):
+def upload_csv(file: UploadFile = File(...)):
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Please upload a .csv file")
 
@@ -265,26 +342,96 @@ async def upload_csv(file: UploadFile = File(...)):
     upload_id = str(uuid.uuid4())
     stored_path = uploads_dir / f"{upload_id}.csv"
 
-    content = await file.read()
-    stored_path.write_bytes(content)
+    # copy the spooled upload to disk in chunks (this runs in the threadpool)
+    partial = stored_path.with_suffix(".part")
+    try:
+        with open(partial, "wb") as out:
+            shutil.copyfileobj(file.file, out, UPLOAD_CHUNK_BYTES)
+        partial.replace(stored_path)
+    finally:
+        partial.unlink(missing_ok=True)
 
+    # validate once here; planning loads the stored rows
     conn = db_connect()
     try:
+        try:
+            row_count = store_sites(conn, upload_id, stored_path)
+        except CsvValidationError as e:
+            stored_path.unlink(missing_ok=True)
+            raise csv_http_error(e)
+
         cur = conn.cursor()
         cur.execute(
-            "INSERT INTO uploads(id, filename, stored_path, created_at) VALUES(?,?,?,?)",
-            (upload_id, file.filename, str(stored_path), datetime.now(timezone.utc).isoformat()),
+            "INSERT INTO uploads(id, filename, stored_path, created_at, row_count) VALUES(?,?,?,?,?)",
+            (upload_id, file.filename, str(stored_path), datetime.now(timezone.utc).isoformat(), row_count),
         )
         conn.commit()
     finally:
         conn.close()
 
-    return {"upload_id": upload_id, "filename": file.filename}
+    return {"upload_id": upload_id, "filename": file.filename, "row_count": row_count}
+
+@app.get("/api/uploads/{upload_id}/sites")
+def list_upload_sites(
+    upload_id: str,
+    site_code: Optional[List[str]] = Query(None),
+    state: Optional[List[str]] = Query(None),
+    column: Optional[str] = None,
+):
+    """Stored rows of an upload, optionally filtered, or just one column of them."""
+    conn = db_connect()
+    try:
+        if not conn.execute("SELECT 1 FROM uploads WHERE id=?", (upload_id,)).fetchone():
+            raise HTTPException(status_code=404, detail="upload_id not found")
+        if column:
+            try:
+                values = site_column(conn, upload_id, column, site_codes=site_code, states=state)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return {"upload_id": upload_id, "column": column, "values": values}
+        try:
+            rows = load_sites(conn, upload_id, site_codes=site_code, states=state)
+        except CsvValidationError as e:
+            raise csv_http_error(e)
+        return {"upload_id": upload_id, "count": len(rows), "sites": [r.model_dump() for r in rows]}
+    finally:
+        conn.close()
+
+def load_upload_sites(conn, upload_id: str, site_codes: Optional[List[str]] = None) -> List[SiteRow]:
+    row = conn.execute("SELECT stored_path, row_count FROM uploads WHERE id=?", (upload_id,)).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="upload_id not found")
+    if row[1] is None:
+        # uploaded before rows were stored: parse once now
+        try:
+            row_count = store_sites(conn, upload_id, Path(row[0]))
+        except CsvValidationError as e:
+            raise csv_http_error(e)
+        conn.execute("UPDATE uploads SET row_count=? WHERE id=?", (row_count, upload_id))
+        conn.commit()
+    try:
+        return load_sites(conn, upload_id, site_codes=site_codes)
+    except CsvValidationError as e:
+        raise csv_http_error(e)
 
 class PlanRequest(BaseModel):
     upload_id: str
     env_name: str
     org: Optional[str] = None
+    # optional: unlock the env and mark objects that already exist in CUCM as "skip"
+    passphrase: Optional[str] = None
+    session: Optional[str] = None  # from /api/unlock, instead of passphrase
+    existence: str = "inventory"  # "inventory" (list calls) | "sql" (executeSQLQuery batches)
+    # reuse unchanged sites from the env's latest plan and report what changed
+    incremental: bool = True
+
+def latest_plan(cur, env_name: str) -> Optional[dict]:
+    cur.execute(
+        "SELECT plan_json FROM plans WHERE env_name=? ORDER BY created_at DESC LIMIT 1",
+        (env_name,),
+    )
+    row = cur.fetchone()
+    return json.loads(row[0]).get("plan") if row else None
 
 @app.post("/api/plan")
 def create_plan(req: PlanRequest):
@@ -294,23 +441,22 @@ def create_plan(req: PlanRequest):
     conn = db_connect()
     try:
         cur = conn.cursor()
-        cur.execute("SELECT stored_path FROM uploads WHERE id=?", (req.upload_id,))
-        row = cur.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="upload_id not found")
-        stored_path = Path(row[0])
 
-        # parse CSV -> SiteRow list
-        rows = parse_site_rows(stored_path)
+        # rows were validated at upload
+        rows = load_upload_sites(conn, req.upload_id)
 
         # load naming profile
         naming_path = os.getenv("APP_DEFAULT_NAMING", "/app/naming.yml")
         dialplan_path = resolve_dialplan_path(req.env_name)
 
-        naming = NamingProfile.load(
-            naming_path=naming_path,
-            dialplan_path=dialplan_path
-        )
+        try:
+            naming = NamingProfile.load(
+                naming_path=naming_path,
+                dialplan_path=dialplan_path
+            )
+        except ValueError as e:
+            # e.g. a template placeholder the planner does not supply
+            raise HTTPException(status_code=400, detail=str(e))
 
         if dialplan_path:
             print(f"DEBUG: Loaded dialplan {dialplan_path}")
@@ -319,8 +465,26 @@ def create_plan(req: PlanRequest):
 
         org = (req.org or os.getenv("APP_ORG", "US")).strip().upper()
 
-        # For Phase 1, we do not call CUCM; exists_lookup omitted.
-        plan_result = build_plan(rows=rows, naming=naming, org=org, env_name=req.env_name)
+        # Without a passphrase we do not call CUCM; exists_lookup omitted.
+        # With one, preload the cluster inventory once (one list call per type).
+        exists_lookup = None
+        if req.passphrase or req.session:
+            try:
+                env = load_env_internal(req.env_name, resolve_key(req.passphrase, req.session))
+            except HTTPException:
+                raise
+            except Exception:
+                raise HTTPException(status_code=403, detail="Invalid passphrase")
+            exists_lookup = build_exists_lookup(axl_clients.get(req.env_name, env), req.existence)
+
+        plan_result = build_plan(
+            rows=rows,
+            naming=naming,
+            org=org,
+            env_name=req.env_name,
+            exists_lookup=exists_lookup,
+            previous_plan=latest_plan(cur, req.env_name) if req.incremental else None,
+        )
 
         # Save plan
         plan_id = plan_result.plan_id
@@ -340,6 +504,7 @@ def create_plan(req: PlanRequest):
             "plan_id": plan_id,
             "errors": plan_result.errors,
             "warnings": plan_result.warnings,
+            "changes": plan_result.changes,
             "plan": plan_result.plan,
         }
     finally:
@@ -347,17 +512,37 @@ def create_plan(req: PlanRequest):
 
 class ExecuteRequest(BaseModel):
     plan_id: str
-    passphrase: str
-
-
-@app.post("/api/execute")
-def execute(req: ExecuteRequest):
+    passphrase: Optional[str] = None
+    session: Optional[str] = None  # from /api/unlock, instead of passphrase
+    # how existence is checked: "inventory" (one list call per type),
+    # "sql" (chunked executeSQLQuery batches) or "get" (one getXxx per object)
+    existence: str = "inventory"
+    # objects run concurrently as their dependencies finish
+    # (None = EXECUTION_WORKERS, 0 = adaptive AXL concurrency, capped per env)
+    workers: Optional[int] = None
+    # add* straight away and treat a duplicate fault as EXISTS; pairs with
+    # existence="get", which then makes no lookup calls at all
+    optimistic: bool = False
+
+
+def submit_plan_execution(
+    plan_id: str,
+    key: bytes,
+    existence: str = "inventory",
+    workers: Optional[int] = None,
+    resume: bool = False,
+    optimistic: bool = False,
+) -> dict:
+    """
+    Validate the request up front (plan, env, key), then run the plan as a
+    background job. Returns the job record; progress is read from the execution.
+    """
     conn = db_connect()
     try:
         cur = conn.cursor()
 
         # 1) Load plan + env_name
-        cur.execute("SELECT plan_json, env_name FROM plans WHERE id=?", (req.plan_id,))
+        cur.execute("SELECT plan_json, env_name FROM plans WHERE id=?", (plan_id,))
         row = cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="plan_id not found")
@@ -377,45 +562,111 @@ def execute(req: ExecuteRequest):
             raise HTTPException(status_code=404, detail=f"Environment not found for plan: {env_name}")
 
         try:
-            env = decrypt_json(req.passphrase, env_row[0])
+            env = decrypt_with_key(key, env_row[0])
         except Exception:
             raise HTTPException(status_code=403, detail="Invalid passphrase")
+    finally:
+        conn.close()
 
-        # 3) Build CUCM client
-        client = UcmAxlClient(
-            base_url=env["cucm_url"],
-            username=env["cucm_username"],
-            password=env["cucm_password"],
-            verify_tls=env.get("cucm_verify_tls", False),  # default OFF
+    if existence not in EXISTENCE_MODES:
+        raise HTTPException(status_code=400, detail=f"existence must be one of {', '.join(EXISTENCE_MODES)}")
+
+    # 3) Execute plan against CUCM in the background, on the env's shared client
+    # (leased for the whole job so idle eviction cannot close it mid-run)
+    def run(control):
+        with axl_clients.lease(env_name, env) as client:
+            exists_lookup = build_exists_lookup(client, existence)
+            return execute_plan(
+                plan,
+                client,
+                apply=True,
+                exists_lookup=exists_lookup,
+                workers=workers,
+                resume=resume,
+                control=control,
+                optimistic=optimistic,
+            )
+
+    try:
+        return job_runner.submit(
+            "resume" if resume else "execute",
+            plan_id,
+            env_name,
+            run,
+            params={"existence": existence, "workers": workers, "optimistic": optimistic},
         )
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "job": e.job})
 
-        # 4) Execute plan against CUCM
-        try:
-            result = execute_plan(plan, client, apply=True)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error executing plan: {e}")
 
-        return result
+@app.post("/api/execute")
+def execute(req: ExecuteRequest):
+    key = resolve_key(req.passphrase, req.session)
+    return submit_plan_execution(req.plan_id, key, req.existence, req.workers, optimistic=req.optimistic)
 
-    finally:
-        conn.close()
 
-def parse_site_rows(path: Path) -> List[SiteRow]:
-    content = path.read_text(encoding="utf-8-sig")
-    reader = csv.DictReader(io.StringIO(content))
-    if not reader.fieldnames:
-        raise HTTPException(status_code=400, detail="CSV appears to have no header row")
+class ResumeRequest(BaseModel):
+    passphrase: Optional[str] = None
+    session: Optional[str] = None
+    existence: str = "inventory"
+    workers: Optional[int] = None
+    optimistic: bool = False
+
 
+@app.post("/api/executions/{plan_id}/resume")
+def resume_execution(plan_id: str, req: ResumeRequest):
+    """Continue an interrupted execution from its journal; finished objects are not repeated."""
+    if read_summary(plan_id, KIND_EXECUTION) is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    return submit_plan_execution(
+        plan_id, resolve_key(req.passphrase, req.session), req.existence, req.workers, resume=True, optimistic=req.optimistic
+    )
+
+
+@app.get("/api/jobs")
+def list_jobs(plan_id: Optional[str] = None):
+    return {"status": "OK", "jobs": job_runner.list(plan_id=plan_id)}
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/api/jobs/{job_id}/{action}")
+def control_job(job_id: str, action: str):
+    actions = {
+        "cancel": job_runner.cancel,
+        "pause": job_runner.pause,
+        "resume": job_runner.resume,
+    }
+    if action not in actions:
+        raise HTTPException(status_code=404, detail=f"Unknown job action: {action}")
+
+    job = actions[action](job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def csv_http_error(e: CsvValidationError) -> HTTPException:
+    if not e.errors:
+        return HTTPException(status_code=400, detail=e.message)
+    detail = {"message": e.message, "errors": e.errors}
+    if e.truncated:
+        detail["truncated"] = True
+    return HTTPException(status_code=400, detail=detail)
+
+def parse_site_rows(path: Path) -> List[SiteRow]:
     out: List[SiteRow] = []
-    errors: List[str] = []
-    for idx, raw in enumerate(reader, start=2):
-        # normalize keys to lower snake-ish (assume headers already match)
-        try:
-            out.append(SiteRow(**{k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in raw.items()}))
-        except Exception as e:
-            errors.append(f"Row {idx}: {e}")
-    if errors:
-        raise HTTPException(status_code=400, detail={"message": "CSV validation failed", "errors": errors})
+    try:
+        for batch in iter_site_batches(path):
+            out.extend(batch)
+    except CsvValidationError as e:
+        raise csv_http_error(e)
     return out
 
 
@@ -445,22 +696,57 @@ def list_executions():
 
 @app.get("/api/executions/{plan_id}")
 def get_execution(plan_id: str):
-    exec_dir = Path(os.getenv("APP_DATA_EXECUTIONS_DIR", "/data/executions"))
-    path = exec_dir / f"{plan_id}.json"
+    execution = read_state(plan_id, KIND_EXECUTION)
 
-    if not path.exists():
+    if execution is None:
         raise HTTPException(status_code=404, detail="Execution not found")
 
-    return json.loads(path.read_text())
+    return execution
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def progress_snapshot(kind: str, plan_id: str) -> Optional[dict]:
+    state = read_state(plan_id, kind)
+    # a queued job has not rewritten the journal yet; the previous run's state is not final
+    active = job_runner.active_for_plan(plan_id)
+    if active:
+        state = {**(state or {"status": "NOT_STARTED"}), "job": active}
+    return state
+
+def progress_stream(request: Request, kind: str, plan_id: str) -> StreamingResponse:
+    # one journal read per subscriber, then pushed events instead of re-polling the disk
+    return StreamingResponse(
+        sse_stream(
+            channel_name(kind, plan_id),
+            snapshot=lambda: progress_snapshot(kind, plan_id),
+            is_disconnected=request.is_disconnected,
+            done_events=("finish", "job_done"),
+            # a finished run with no job queued for the plan will not change any more
+            is_done=lambda state: state.get("status") in FINISHED_STATUSES and not state.get("job"),
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@app.get("/api/executions/{plan_id}/stream")
+async def stream_execution(plan_id: str, request: Request):
+    return progress_stream(request, KIND_EXECUTION, plan_id)
+
+
+@app.get("/api/rollback/{plan_id}/stream")
+async def stream_rollback(plan_id: str, request: Request):
+    return progress_stream(request, KIND_ROLLBACK, plan_id)
 
 class RollbackRequest(BaseModel):
     env_name: str
     plan_id: str
     passphrase: str | None = None
+    session: str | None = None
     apply: bool = False
 
 
-def load_env_internal(name: str, passphrase: str) -> Dict[str, Any]:
+def load_env_internal(name: str, key: bytes) -> Dict[str, Any]:
     conn = db_connect()
     try:
         cur = conn.cursor()
@@ -470,25 +756,18 @@ def load_env_internal(name: str, passphrase: str) -> Dict[str, Any]:
         if not row:
             raise HTTPException(status_code=404, detail="Environment not found")
 
-        blob = row[0]
-        if isinstance(blob, str):
-            blob = blob.encode("utf-8")
-
-        return decrypt_json(passphrase, blob)
+        return decrypt_with_key(key, row[0])
 
     finally:
         conn.close()
 
 @app.get("/api/rollback/{plan_id}/preview")
 def api_rollback_preview(plan_id: str):
-    exec_dir = Path(os.getenv("APP_DATA_EXECUTIONS_DIR", "/data/executions"))
-    exec_path = exec_dir / f"{plan_id}.json"
+    execution = read_state(plan_id, KIND_EXECUTION)
 
-    if not exec_path.exists():
+    if execution is None:
         raise HTTPException(status_code=404, detail="Execution not found")
 
-    execution = json.loads(exec_path.read_text())
-
     steps = execution.get("results", [])
 
     created = [
@@ -518,10 +797,9 @@ def api_rollback_preview(plan_id: str):
 
 @app.get("/api/rollback/{plan_id}/status")
 def rollback_status(plan_id: str):
-    exec_dir = Path(os.getenv("APP_DATA_EXECUTIONS_DIR", "/data/executions"))
-    rb_path = exec_dir / f"{plan_id}.rollback.json"
+    rollback = read_state(plan_id, KIND_ROLLBACK)
 
-    if not rb_path.exists():
+    if rollback is None:
         return {
             "status": "NOT_STARTED",
             "plan_id": plan_id,
@@ -530,22 +808,20 @@ def rollback_status(plan_id: str):
             "current_step": None
         }
 
-    return json.loads(rb_path.read_text())
+    return rollback
 
 @app.post("/api/rollback")
 def api_rollback(req: RollbackRequest):
     try:
-        exec_dir = Path(os.getenv("APP_DATA_EXECUTIONS_DIR", "/data/executions"))
-        exec_path = exec_dir / f"{req.plan_id}.json"
+        # the small summary record is enough for the env check
+        execution = read_summary(req.plan_id, KIND_EXECUTION)
 
-        if not exec_path.exists():
+        if execution is None:
             return JSONResponse(
                 status_code=404,
                 content={"status": "ERROR", "message": "Execution not found"}
             )
 
-        execution = json.loads(exec_path.read_text())
-
         # 🔒 SAFETY CHECK: environment must match
         if execution.get("env_name") != req.env_name:
             return JSONResponse(
@@ -561,32 +837,40 @@ def api_rollback(req: RollbackRequest):
             )
 
         # Only now do we unlock credentials
-        if not req.passphrase:
+        try:
+            key = resolve_key(req.passphrase, req.session)
+        except HTTPException as e:
             return JSONResponse(
-                status_code=400,
+                status_code=e.status_code,
                 content={
                     "status": "ERROR",
-                    "message": "Passphrase is required for rollback"
+                    "message": e.detail
                 }
             )
 
-        env = load_env_internal(
-            name=req.env_name,
-            passphrase=req.passphrase  # now guaranteed str
-        )
+        env = load_env_internal(name=req.env_name, key=key)
 
-        client = UcmAxlClient(
-            base_url=env["cucm_url"],
-            username=env["cucm_username"],
-            password=env["cucm_password"],
-            verify_tls=env.get("cucm_verify_tls", False),
-        )
+        def run(control):
+            with axl_clients.lease(req.env_name, env) as client:
+                return rollback_plan(
+                    plan_id=req.plan_id,
+                    client=client,
+                    apply=req.apply,
+                    control=control,
+                )
 
-        return rollback_plan(
-            plan_id=req.plan_id,
-            client=client,
-            apply=req.apply
-        )
+        # runs in the background; progress via /api/rollback/{plan_id}/status
+        try:
+            return job_runner.submit("rollback", req.plan_id, req.env_name, run, params={"apply": req.apply})
+        except JobConflict as e:
+            return JSONResponse(
+                status_code=409,
+                content={
+                    "status": "ERROR",
+                    "message": str(e),
+                    "job": e.job,
+                }
+            )
 
     except Exception as e:
         # 🚑 ABSOLUTE LAST LINE OF DEFENSE
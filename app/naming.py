@@ -1,9 +1,149 @@
 from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
 from dataclasses import dataclass
+from functools import cached_property
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import yaml
 
+# Placeholders each kind of template may use (see planner._ctx / planner.dialplan_context)
+NAMING_FIELDS = ("org", "state", "site_code", "site_detail", "city")
+DIALPLAN_FIELDS = ("site", "site_code", "site_name", "city", "state", "org")
+
+# Parsed YAML by absolute path, reused until the file's mtime or size changes.
+# Results are shared between requests: treat them as read-only.
+_YAML_CACHE: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+_PROFILE_CACHE: Dict[Tuple, "NamingProfile"] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_yaml(path: str) -> Any:
+    """yaml.safe_load a file, parsing it again only when it changed on disk."""
+    key = os.path.abspath(path)
+    stamp = _stamp(key)
+    with _CACHE_LOCK:
+        cached = _YAML_CACHE.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    data = yaml.safe_load(Path(key).read_text(encoding="utf-8"))
+    with _CACHE_LOCK:
+        _YAML_CACHE[key] = (stamp, data)
+    return data
+
+
+class NameTemplate:
+    """
+    A str.format name template parsed once into a %-format string plus a field
+    getter. Placeholders are checked against the allowed fields up front, so a
+    typo fails when the profile loads instead of on the first site.
+    """
+
+    __slots__ = ("template", "fields", "_fmt", "_get")
+
+    def __init__(self, template: str, allowed: Iterable[str], where: str):
+        allowed = tuple(allowed)
+        self.template = template
+        literal: List[str] = []
+        fields: List[str] = []
+        plain = True
+        for text, field, spec, conversion in Formatter().parse(template):
+            literal.append(text.replace("%", "%%"))
+            if field is None:
+                continue
+            if field not in allowed:
+                raise ValueError(
+                    f"{where}: unknown placeholder {{{field}}} in {template!r} "
+                    f"(expected one of {', '.join(allowed)})"
+                )
+            if spec or conversion:
+                plain = False
+            fields.append(field)
+            literal.append("%s")
+        self.fields = tuple(fields)
+
+        if not plain:
+            # format specs / conversions: leave those to str.format
+            self._fmt = None
+            self._get = None
+        elif len(fields) == 1:
+            self._fmt = "".join(literal)
+            self._get = lambda ctx, _f=fields[0]: (ctx[_f],)
+        else:
+            self._fmt = "".join(literal)
+            self._get = itemgetter(*fields) if fields else (lambda ctx: ())
+
+    def render(self, ctx: dict) -> str:
+        if self._fmt is None:
+            return self.template.format_map(ctx)
+        return self._fmt % self._get(ctx)
+
+    def render_many(self, contexts: List[dict]) -> List[str]:
+        """Render one context per site, e.g. a whole CSV's region names."""
+        if self._fmt is None:
+            return [self.template.format_map(ctx) for ctx in contexts]
+        fmt, get = self._fmt, self._get
+        return [fmt % get(ctx) for ctx in contexts]
+
+
+@dataclass(frozen=True)
+class DialplanTemplates:
+    # (partition key, name, description) for site-scope partitions
+    partitions: List[Tuple[str, NameTemplate, NameTemplate]]
+    # (css key, name, description, member partition keys)
+    css: List[Tuple[str, NameTemplate, NameTemplate, List[str]]]
+    global_partitions: Dict[str, str]
+
+
+def compile_naming(data: dict) -> Dict[str, Tuple[NameTemplate, NameTemplate]]:
+    compiled = {}
+    for obj_type, spec in ((data or {}).get("objects") or {}).items():
+        where = f"naming objects.{obj_type}"
+        compiled[obj_type] = (
+            NameTemplate(spec["name"], NAMING_FIELDS, f"{where}.name"),
+            NameTemplate(spec.get("description", ""), NAMING_FIELDS, f"{where}.description"),
+        )
+    return compiled
+
+
+def compile_dialplan(dialplan: dict) -> DialplanTemplates:
+    partitions = []
+    for key, p in (dialplan.get("partitions") or {}).items():
+        if p.get("scope") != "site":
+            continue
+        where = f"dialplan partitions.{key}"
+        partitions.append((
+            key,
+            NameTemplate(p["name"], DIALPLAN_FIELDS, f"{where}.name"),
+            NameTemplate(p.get("description", ""), DIALPLAN_FIELDS, f"{where}.description"),
+        ))
+
+    css = []
+    for key, c in (dialplan.get("css") or {}).items():
+        where = f"dialplan css.{key}"
+        css.append((
+            key,
+            NameTemplate(c["name"], DIALPLAN_FIELDS, f"{where}.name"),
+            NameTemplate(c.get("description", ""), DIALPLAN_FIELDS, f"{where}.description"),
+            list(c.get("members", [])),
+        ))
+
+    return DialplanTemplates(
+        partitions=partitions,
+        css=css,
+        global_partitions=(dialplan.get("globals") or {}).get("partitions", {}),
+    )
+
 
 @dataclass(frozen=True)
 class NamingProfile:
@@ -12,21 +152,42 @@ class NamingProfile:
 
     @staticmethod
     def load(naming_path: str, dialplan_path: Optional[str] = None) -> "NamingProfile":
-        naming_raw = yaml.safe_load(Path(naming_path).read_text(encoding="utf-8"))
+        """
+        The same NamingProfile instance is returned while neither file changes,
+        so anything derived from it (compiled templates) is reused too.
+        """
+        naming_raw = load_yaml(naming_path)
+        dialplan = load_yaml(dialplan_path) if dialplan_path else None
 
-        dialplan = None
-        if dialplan_path:
-            dialplan = yaml.safe_load(Path(dialplan_path).read_text(encoding="utf-8"))
+        # parsed objects are only replaced when a file changed, so identity is the version
+        key = (os.path.abspath(naming_path), os.path.abspath(dialplan_path) if dialplan_path else None)
+        with _CACHE_LOCK:
+            profile = _PROFILE_CACHE.get(key)
+            if profile is None or profile.data is not naming_raw or profile.dialplan is not dialplan:
+                profile = NamingProfile(data=naming_raw, dialplan=dialplan)
+                # compile (and validate placeholders) now, not on the first site
+                profile.templates
+                profile.dialplan_templates
+                _PROFILE_CACHE[key] = profile
+        return profile
 
-        return NamingProfile(
-            data=naming_raw,
-            dialplan=dialplan
-        )
+    @cached_property
+    def templates(self) -> Dict[str, Tuple[NameTemplate, NameTemplate]]:
+        """obj_type -> (name, description) templates."""
+        return compile_naming(self.data)
+
+    @cached_property
+    def version(self) -> str:
+        """Content hash of naming + dialplan; changes whenever either file's content does."""
+        payload = json.dumps({"naming": self.data, "dialplan": self.dialplan}, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+    @cached_property
+    def dialplan_templates(self) -> Optional[DialplanTemplates]:
+        return compile_dialplan(self.dialplan) if self.dialplan else None
 
     def render_name(self, obj_type: str, ctx: dict) -> str:
-        tmpl = self.data["objects"][obj_type]["name"]
-        return tmpl.format(**ctx)
+        return self.templates[obj_type][0].render(ctx)
 
     def render_description(self, obj_type: str, ctx: dict) -> str:
-        tmpl = self.data["objects"][obj_type]["description"]
-        return tmpl.format(**ctx)
\ No newline at end of file
+        return self.templates[obj_type][1].render(ctx)
\ No newline at end of file
@@ -1,12 +1,18 @@
 from __future__ import annotations
+import hashlib
 from dataclasses import dataclass
+from operator import attrgetter
 from typing import Any, Dict, List, Optional
 import uuid
 import os
 from app import naming
-from app.naming import NamingProfile
+from app.naming import DialplanTemplates, NameTemplate, NamingProfile
 from app.csv_schema import SiteRow
 
+# Bump whenever the planner builds a site's objects differently for the same input,
+# so incremental planning stops reusing sub-plans built by the old logic.
+PLANNER_VERSION = "1"
+
 OBJECT_ORDER = [
     "region",
     "location",
@@ -33,19 +39,6 @@ FINAL_OBJECT_ORDER = [
     "device_mobility",
 ]
 
-BACKOUT_ORDER = [
-  "device_mobility",
-  "device_pool",
-  "mrgl",
-  "mrg",
-  "css",
-  "partition",
-  "srst",
-  "physical_location",
-  "location",
-  "region",
-]
-
 FRIENDLY = {
     "region": "Region",
     "location": "Location",
@@ -59,6 +52,38 @@ FRIENDLY = {
     "device_mobility": "Device Mobility"
 }
 
+def object_key(obj_type: str, name: str) -> str:
+    """Node id in the plan's dependency graph."""
+    return f"{obj_type}:{name}"
+
+
+def object_dependencies(obj: dict) -> List[str]:
+    """
+    Keys of the objects this one references in CUCM. Keys that are not part of the
+    plan (global partitions, shared MRGs, ...) are external and expected to exist.
+    """
+    t = obj["type"]
+    inp = obj.get("inputs") or {}
+
+    if t == "css":
+        return [object_key("partition", m) for m in inp.get("members_partitions") or []]
+    if t == "mrgl":
+        return [object_key("mrg", m) for m in inp.get("members") or []]
+    if t == "device_pool":
+        deps = [
+            object_key("region", inp["region"]),
+            object_key("location", inp["location"]),
+            object_key("physical_location", inp["physical_location"]),
+        ]
+        if inp.get("srst_reference"):
+            deps.append(object_key("srst", inp["srst_reference"]))
+        deps.append(object_key("mrgl", inp["mrgl"]))
+        return deps
+    if t == "device_mobility":
+        return [object_key("device_pool", m) for m in inp.get("members") or []]
+    return []
+
+
 def _ctx(org: str, row: SiteRow) -> dict:
     return {
         "org": org,
@@ -69,13 +94,8 @@ def _ctx(org: str, row: SiteRow) -> dict:
     }
 
 
-def build_dialplan_objects(
-    row: SiteRow,
-    org: str,
-    dialplan: dict,
-    exists_lookup: Optional[callable] = None,
-) -> List[dict]:
-    ctx = {
+def dialplan_context(org: str, row: SiteRow) -> dict:
+    return {
         "site": row.site_code,
         "site_code": row.site_code,
         "site_name": row.site_detail,
@@ -84,121 +104,121 @@ def build_dialplan_objects(
         "org": org,
     }
 
-    objects: List[dict] = []
-
-    globals_partitions = (dialplan.get("globals") or {}).get("partitions", {})
-
-    # -----------------------
-    # Partitions (site scope)
-    # -----------------------
-    partition_name_map: dict[str, str] = {}
-
-    for key, p in (dialplan.get("partitions") or {}).items():
-        if p.get("scope") != "site":
-            continue
-
-        name_tmpl = p["name"]
-        desc_tmpl = p.get("description", "")
-
-        part_name = name_tmpl.format(**ctx)
-        part_desc = desc_tmpl.format(**ctx)
-
-        partition_name_map[key] = part_name
-
-        action = "create"
-        if exists_lookup and exists_lookup("partition", part_name):
-            action = "skip"
-
-        objects.append({
-            "type": "partition",
-            "friendly": FRIENDLY["partition"],
-            "name": part_name,
-            "description": part_desc,
-            "action": action,
-            "depends_on": [],
-            "inputs": {},
-        })
-
-    # -----------------------
-    # CSS (site scope)
-    # -----------------------
-    for key, c in (dialplan.get("css") or {}).items():
-        name_tmpl = c["name"]
-        desc_tmpl = c.get("description", "")
-
-        css_name = name_tmpl.format(**ctx)
-        css_desc = desc_tmpl.format(**ctx)
-
-        members: List[str] = []
-
-        for m in c.get("members", []):
-            if m in partition_name_map:
-                members.append(partition_name_map[m])
-            elif m in globals_partitions:
-                members.append(globals_partitions[m])
-            else:
-                raise ValueError(
-                    f"CSS '{key}' references unknown partition '{m}' "
-                    f"for site {row.site_code}"
-                )
-
-        action = "create"
-        if exists_lookup and exists_lookup("css", css_name):
-            action = "skip"
-
-        objects.append({
-            "type": "css",
-            "friendly": FRIENDLY["css"],
-            "name": css_name,
-            "description": css_desc,
-            "action": action,
-            "depends_on": ["partition"],
-            "inputs": {
-                "members_partitions": members
-            },
-        })
 
-    return objects
+def _render_column(tmpl: NameTemplate, contexts: List[dict], wanted: Optional[List[bool]] = None) -> List[Optional[str]]:
+    """One template over every site's context; None where the site does not get that type."""
+    if wanted is None:
+        return tmpl.render_many(contexts)
+    column: List[Optional[str]] = [None] * len(contexts)
+    idx = [i for i, w in enumerate(wanted) if w]
+    for i, value in zip(idx, tmpl.render_many([contexts[i] for i in idx])):
+        column[i] = value
+    return column
 
-@dataclass
-class PlanResult:
-    plan_id: str
-    plan: dict
-    errors: List[str]
-    warnings: List[str]
 
-def build_plan(
+def build_dialplan_site_objects(
     rows: List[SiteRow],
-    naming: NamingProfile,
     org: str,
-    env_name: str,
-    exists_lookup: Optional[callable] = None,  # fn(obj_type, name) -> bool
-) -> PlanResult:
-    """
-    exists_lookup is optional now; later it will call CUCM AXL getXxx to decide create/skip/update.
-    """
-    plan_id = str(uuid.uuid4())
+    templates: DialplanTemplates,
+) -> List[List[dict]]:
+    """Site-scope partitions and CSSs for each row; every template renders once per column."""
+    contexts = [dialplan_context(org, row) for row in rows]
+    partition_columns = [
+        (key, name.render_many(contexts), desc.render_many(contexts))
+        for key, name, desc in templates.partitions
+    ]
+    css_columns = [
+        (key, name.render_many(contexts), desc.render_many(contexts), member_keys)
+        for key, name, desc, member_keys in templates.css
+    ]
+    globals_partitions = templates.global_partitions
+
+    out: List[List[dict]] = []
+    for i, row in enumerate(rows):
+        objects: List[dict] = []
+
+        # -----------------------
+        # Partitions (site scope)
+        # -----------------------
+        partition_name_map: dict[str, str] = {}
+        for key, names, descs in partition_columns:
+            partition_name_map[key] = names[i]
+            objects.append({
+                "type": "partition",
+                "friendly": FRIENDLY["partition"],
+                "name": names[i],
+                "description": descs[i],
+                "action": "create",
+                "depends_on": [],
+                "inputs": {},
+            })
+
+        # -----------------------
+        # CSS (site scope)
+        # -----------------------
+        for key, names, descs, member_keys in css_columns:
+            members: List[str] = []
+            for m in member_keys:
+                if m in partition_name_map:
+                    members.append(partition_name_map[m])
+                elif m in globals_partitions:
+                    members.append(globals_partitions[m])
+                else:
+                    raise ValueError(
+                        f"CSS '{key}' references unknown partition '{m}' "
+                        f"for site {row.site_code}"
+                    )
+
+            objects.append({
+                "type": "css",
+                "friendly": FRIENDLY["css"],
+                "name": names[i],
+                "description": descs[i],
+                "action": "create",
+                "depends_on": [object_key("partition", m) for m in members],
+                "inputs": {
+                    "members_partitions": members
+                },
+            })
+
+        out.append(objects)
+    return out
+
+
+def _build_sites(sites: List[SiteRow], naming: NamingProfile, org: str) -> List[dict]:
+    """Plan entries (site_code, site_detail, objects) for de-duplicated rows, in order."""
     dialplan = getattr(naming, "dialplan", None)
-    errors: List[str] = []
-    warnings: List[str] = []
-
-    sites_out: List[dict] = []
-
-    seen_site_codes = set()
-    for i, row in enumerate(rows, start=2):  # assume header line is 1
-        if row.site_code in seen_site_codes:
-            errors.append(f"Duplicate site_code '{row.site_code}' (CSV row {i})")
+    built: List[dict] = []
+
+    # SRST requirement check if enabled
+    srst_enabled = [bool(getattr(row, "srst_ip", None)) for row in sites]
+    # Device Mobility requirement check
+    dm_enabled = [
+        bool(getattr(row, "mobility_subnet", None)) and bool(getattr(row, "mobility_mask", None))
+        for row in sites
+    ]
+
+    # compute names: each template renders as one column, only for the sites that get the type
+    contexts = [_ctx(org, row) for row in sites]
+    wanted = {"srst": srst_enabled, "device_mobility": dm_enabled}
+    names: Dict[str, List[Optional[str]]] = {}
+    descs: Dict[str, List[Optional[str]]] = {}
+    for obj_type in FRIENDLY.keys():
+        if dialplan and obj_type in ("partition", "css"):
             continue
-        seen_site_codes.add(row.site_code)
-
-        ctx = _ctx(org, row)
+        name_tmpl, desc_tmpl = naming.templates[obj_type]
+        names[obj_type] = _render_column(name_tmpl, contexts, wanted.get(obj_type))
+        descs[obj_type] = _render_column(desc_tmpl, contexts, wanted.get(obj_type))
 
-        # compute names
-        names = {t: naming.render_name(t, ctx) for t in FRIENDLY.keys()}
-        descs = {t: naming.render_description(t, ctx) for t in FRIENDLY.keys()}
+    # 1) Dialplan-driven objects, also rendered per column
+    dialplan_by_site = (
+        build_dialplan_site_objects(sites, org, naming.dialplan_templates)
+        if naming.dialplan else None
+    )
 
+    for s, row in enumerate(sites):
         # MRGL member keyword handling
-        mrg_name = names["mrg"]
+        mrg_name = names["mrg"][s]
         mrgl_members = row.mrgl_members_list()
         mrgl_members_resolved: List[str] = []
         for m in mrgl_members:
@@ -207,55 +227,27 @@ def build_plan(
             else:
                 mrgl_members_resolved.append(m)
 
-        # SRST requirement check if enabled
-        srst_enabled = bool(getattr(row, "srst_ip", None))
-
-        # Device Mobility requirement check
-        dm_enabled = bool(getattr(row, "mobility_subnet", None)) and bool(getattr(row, "mobility_mask", None))
-
         # Build object list
-        dialplan_objects: list[dict] = []
+        dialplan_objects: list[dict] = dialplan_by_site[s] if dialplan_by_site is not None else []
         infra_objects: list[dict] = []
 
-        # 1) Dialplan-driven objects first
-        if naming.dialplan:
-            dialplan_objects.extend(
-                build_dialplan_objects(
-                    row=row,
-                    org=org,
-                    dialplan=naming.dialplan,
-                    exists_lookup=exists_lookup,
-                )
-            )
-
         # 2) Infra objects (skip partition/css here when dialplan present)
         for obj_type in OBJECT_ORDER:
-            if obj_type == "srst" and not srst_enabled:
+            if obj_type == "srst" and not srst_enabled[s]:
                 continue
-            if obj_type == "device_mobility" and not dm_enabled:
+            if obj_type == "device_mobility" and not dm_enabled[s]:
                 continue
             if dialplan and obj_type in ("partition", "css"):
                 continue
 
-            obj_name = names[obj_type]
-            action = "create"
-            exists = False
-            if exists_lookup:
-                try:
-                    exists = bool(exists_lookup(obj_type, obj_name))
-                except Exception as e:
-                    warnings.append(f"{row.site_code}: exists check failed for {obj_type} '{obj_name}': {e}")
-                    exists = False
-
-            if exists:
-                action = "skip"
+            obj_name = names[obj_type][s]
 
             obj = {
                 "type": obj_type,
                 "friendly": FRIENDLY[obj_type],
                 "name": obj_name,
-                "description": descs[obj_type],
-                "action": action,
+                "description": descs[obj_type][s],
+                "action": "create",
                 "depends_on": [],
                 "inputs": {},
             }
@@ -289,18 +281,18 @@ def build_plan(
                 obj["inputs"] = {
                     "ucm_group": row.ucm_group,
                     "date_time_group": row.date_time_group,
-                    "region": names["region"],
-                    "location": names["location"],
-                    "physical_location": names["physical_location"],
-                    "srst_reference": names["srst"] if srst_enabled else None,
-                    "mrgl": names["mrgl"],
+                    "region": names["region"][s],
+                    "location": names["location"][s],
+                    "physical_location": names["physical_location"][s],
+                    "srst_reference": names["srst"][s] if srst_enabled[s] else None,
+                    "mrgl": names["mrgl"][s],
                     "device_mobility_group": row.device_mobility_group,
                 }
             elif obj_type == "device_mobility":
                 obj["inputs"] = {
                     "subnet": row.mobility_subnet,
                     "mask": row.mobility_mask,
-                    "members": [names["device_pool"]],
+                    "members": [names["device_pool"][s]],
                 }
 
             infra_objects.append(obj)
@@ -314,48 +306,165 @@ def build_plan(
         for t in FINAL_OBJECT_ORDER:
             objects.extend(objects_by_type.get(t, []))
 
-        # Fill dependencies
-        by_type = {o["type"]: o for o in objects}
+        # Fill name-level dependencies (type:name keys)
         for o in objects:
-            t = o["type"]
-            deps: List[str] = []
-            if t == "location":
-                deps = ["region"]
-            elif t == "css":
-                deps = ["partition"]
-            elif t == "mrgl":
-                deps = []
-            elif t == "device_pool":
-                deps = ["region", "location", "physical_location", "mrgl"]
-                if srst_enabled:
-                    deps.insert(3, "srst")
-
-                # Only require these if they exist in this site's object set
-                site_types = {x["type"] for x in objects}
-                if "partition" in site_types:
-                    deps.append("partition")
-                if "css" in site_types:
-                    deps.append("css")
-            elif t == "device_mobility":
-                deps = ["device_pool"]
-            o["depends_on"] = deps
-
-        sites_out.append({
+            o["key"] = object_key(o["type"], o["name"])
+            o["depends_on"] = object_dependencies(o)
+
+        built.append({
             "site_code": row.site_code,
             "site_detail": row.site_detail,
             "objects": objects,
         })
 
+    return built
+
+@dataclass
+class PlanResult:
+    plan_id: str
+    plan: dict
+    errors: List[str]
+    warnings: List[str]
+    # sites added/changed/removed vs previous_plan (None when planned from scratch)
+    changes: Optional[dict] = None
+
+_SITE_FIELDS = attrgetter(*SiteRow.model_fields)
+
+def site_fingerprint(row: SiteRow, org: str, profile_version: str) -> str:
+    """Content hash of everything a site's sub-plan is built from, planner logic included."""
+    values = (PLANNER_VERSION, org, profile_version, *_SITE_FIELDS(row))
+    payload = "\x1f".join("\x00" if v is None else str(v) for v in values)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+def build_plan(
+    rows: List[SiteRow],
+    naming: NamingProfile,
+    org: str,
+    env_name: str,
+    exists_lookup: Optional[callable] = None,  # fn(obj_type, name) -> bool
+    previous_plan: Optional[dict] = None,
+) -> PlanResult:
+    """
+    exists_lookup is optional; when given it decides create/skip per object. It may be a
+    plain callable, a preloaded AxlInventory, or a SqlExistenceOracle (anything with a
+    prefetch() is handed every (type, name) first so it can batch its AXL calls).
+
+    previous_plan (an earlier plan for the same env) lets unchanged sites reuse
+    their objects; plan["changes"] then lists added/changed/removed site codes.
+    """
+    plan_id = str(uuid.uuid4())
+    errors: List[str] = []
+    warnings: List[str] = []
+
+    sites: List[SiteRow] = []
+    seen_site_codes = set()
+    for i, row in enumerate(rows, start=2):  # assume header line is 1
+        if row.site_code in seen_site_codes:
+            errors.append(f"Duplicate site_code '{row.site_code}' (CSV row {i})")
+            continue
+        seen_site_codes.add(row.site_code)
+        sites.append(row)
+
+
+    # Sites whose rows, org, naming/dialplan and planner version are unchanged since previous_plan
+    # keep their sub-plan; only changed and added sites are rendered again.
+    profile_version = naming.version
+    fingerprints = [site_fingerprint(row, org, profile_version) for row in sites]
+    previous_sites = {}
+    if previous_plan:
+        previous_sites = {
+            s["site_code"]: s for s in previous_plan.get("sites", []) if s.get("fingerprint")
+        }
+
+    reused: Dict[int, dict] = {}
+    for n, (row, fp) in enumerate(zip(sites, fingerprints)):
+        prev = previous_sites.get(row.site_code)
+        if prev is not None and prev["fingerprint"] == fp:
+            reused[n] = prev
+    fresh = iter(_build_sites([row for n, row in enumerate(sites) if n not in reused], naming, org))
+
+    sites_out: List[dict] = []
+    for n, fp in enumerate(fingerprints):
+        if n in reused:
+            # existence is decided again below, as for a fresh site
+            prev = reused[n]
+            site = {**prev, "objects": [{**o, "action": "create"} for o in prev["objects"]]}
+        else:
+            site = next(fresh)
+        site["fingerprint"] = fp
+        sites_out.append(site)
+
+    changes = None
+    if previous_plan is not None:
+        previous_codes = [s.get("site_code") for s in previous_plan.get("sites", [])]
+        known = set(previous_codes)
+        rebuilt = [row.site_code for n, row in enumerate(sites) if n not in reused]
+        changes = {
+            "previous_plan_id": previous_plan.get("plan_id"),
+            "added": [c for c in rebuilt if c not in known],
+            "changed": [c for c in rebuilt if c in known],
+            "removed": [c for c in previous_codes if c not in seen_site_codes],
+            "unchanged_count": len(reused),
+        }
+
+    # Existence checks run after every site is built so batch lookups
+    # (SQL oracle) can resolve the whole plan in a few calls.
+    if exists_lookup:
+        _resolve_actions(sites_out, exists_lookup, warnings)
+
     plan = {
         "plan_id": plan_id,
         "env_name": env_name,
         "org": org,
         "site_count": len(sites_out),
+        "naming_version": profile_version,
+        "planner_version": PLANNER_VERSION,
         "sites": sites_out,
         "summary": summarize_plan(sites_out),
+        "graph": summarize_graph(sites_out),
     }
 
-    return PlanResult(plan_id=plan_id, plan=plan, errors=errors, warnings=warnings)
+    if changes is not None:
+        plan["changes"] = changes
+
+    return PlanResult(plan_id=plan_id, plan=plan, errors=errors, warnings=warnings, changes=changes)
+
+def _resolve_actions(sites: List[dict], exists_lookup, warnings: List[str]) -> None:
+    for obj_type, error in (getattr(exists_lookup, "failed", None) or {}).items():
+        warnings.append(f"listing existing {obj_type} objects failed, checking them one by one: {error}")
+
+    prefetch = getattr(exists_lookup, "prefetch", None)
+    if prefetch:
+        try:
+            prefetch((o["type"], o["name"]) for s in sites for o in s["objects"])
+        except Exception as e:
+            warnings.append(f"batch exists check failed, falling back to per-object checks: {e}")
+
+    for site in sites:
+        for o in site["objects"]:
+            try:
+                exists = bool(exists_lookup(o["type"], o["name"]))
+            except Exception as e:
+                warnings.append(f"{site['site_code']}: exists check failed for {o['type']} '{o['name']}': {e}")
+                exists = False
+
+            o["action"] = "skip" if exists else "create"
+
+def summarize_graph(sites: List[dict]) -> dict:
+    keys = {o["key"] for s in sites for o in s["objects"] if "key" in o}
+    edges = 0
+    external = set()
+    for s in sites:
+        for o in s["objects"]:
+            for d in o.get("depends_on") or []:
+                edges += 1
+                if d not in keys:
+                    external.add(d)
+    return {
+        "node_count": len(keys),
+        "edge_count": edges,
+        "external": sorted(external),
+    }
 
 def summarize_plan(sites: List[dict]) -> dict:
     counts: Dict[str, Dict[str, int]] = {}
@@ -2,7 +2,11 @@ from __future__ import annotations
 import base64
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Optional
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -11,7 +15,12 @@ from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 # If you want per-installation salt, store it in /data once instead.
 APP_SALT = b"ucm-site-provisioner::salt::v1"
 
-def _derive_key(passphrase: str) -> bytes:
+# Unlocked keys live in memory behind an opaque token until locked or expired
+UNLOCK_TTL = float(os.getenv("APP_UNLOCK_TTL", "900"))  # seconds from unlock
+UNLOCK_MAX_SESSIONS = int(os.getenv("APP_UNLOCK_MAX_SESSIONS", "64"))
+
+def derive_key(passphrase: str) -> bytes:
+    # deliberately slow (~100ms+); callers that need it repeatedly should unlock a session
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
@@ -20,18 +29,85 @@ def _derive_key(passphrase: str) -> bytes:
     )
     return kdf.derive(passphrase.encode("utf-8"))
 
-def encrypt_json(passphrase: str, payload: dict) -> bytes:
-    key = _derive_key(passphrase)
+def encrypt_with_key(key: bytes, payload: dict) -> bytes:
     aes = AESGCM(key)
     nonce = os.urandom(12)
     pt = json.dumps(payload).encode("utf-8")
     ct = aes.encrypt(nonce, pt, associated_data=None)
     return nonce + ct
 
-def decrypt_json(passphrase: str, blob: bytes) -> dict:
-    key = _derive_key(passphrase)
+def decrypt_with_key(key: bytes, blob: bytes) -> dict:
+    if isinstance(blob, str):
+        blob = blob.encode("utf-8")
     aes = AESGCM(key)
     nonce = blob[:12]
     ct = blob[12:]
     pt = aes.decrypt(nonce, ct, associated_data=None)
-    return json.loads(pt.decode("utf-8"))
\ No newline at end of file
+    return json.loads(pt.decode("utf-8"))
+
+def encrypt_json(passphrase: str, payload: dict) -> bytes:
+    return encrypt_with_key(derive_key(passphrase), payload)
+
+def decrypt_json(passphrase: str, blob: bytes) -> dict:
+    return decrypt_with_key(derive_key(passphrase), blob)
+
+
+class TooManySessions(RuntimeError):
+    """Every unlock slot is held by a session that has not expired yet."""
+
+
+@dataclass
+class UnlockSession:
+    token: str
+    key: bytes
+    expires_at: float  # time.time()
+
+
+class UnlockSessions:
+    """
+    Derived keys keyed by an opaque random token. Entries expire UNLOCK_TTL after
+    unlock and can be locked explicitly. Live sessions are never evicted to make
+    room: with max_sessions open, unlock() raises TooManySessions instead.
+    """
+
+    def __init__(self, ttl: float = UNLOCK_TTL, max_sessions: int = UNLOCK_MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max(1, max_sessions)
+        self._sessions: "OrderedDict[str, UnlockSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def unlock(self, key: bytes) -> UnlockSession:
+        """Open a session for a key the caller derived (and checked) with derive_key()."""
+        token = base64.urlsafe_b64encode(os.urandom(32)).rstrip(b"=").decode("ascii")
+        now = time.time()
+        session = UnlockSession(token=token, key=key, expires_at=now + self.ttl)
+        with self._lock:
+            # insertion order is expiry order (fixed TTL), so expired entries sit in front
+            while self._sessions and next(iter(self._sessions.values())).expires_at <= now:
+                self._sessions.popitem(last=False)
+            if len(self._sessions) >= self.max_sessions:
+                raise TooManySessions(f"{len(self._sessions)} unlock sessions are already open")
+            self._sessions[token] = session
+        return session
+
+    def key_for(self, token: str) -> Optional[bytes]:
+        """The session's key, or None if the token is unknown, locked or expired."""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session.expires_at <= time.time():
+                del self._sessions[token]
+                return None
+            return session.key
+
+    def lock(self, token: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(token, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+unlock_sessions = UnlockSessions()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import sqlite3
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+from app.csv_schema import CsvValidationError, SiteRow, iter_numbered_site_batches, validate_site_rows
+
+# Validated upload rows, one sites row per CSV row (see db.init_db). Rows are
+# validated once at upload; loading them back is one bulk pydantic pass, which
+# is cheaper than SiteRow.model_construct per row.
+SITE_COLUMNS = tuple(SiteRow.model_fields)
+
+_INSERT = (
+    f"INSERT INTO sites(upload_id, seq, line, {', '.join(SITE_COLUMNS)}) "
+    f"VALUES(?, ?, ?, {', '.join('?' for _ in SITE_COLUMNS)})"
+)
+_values = attrgetter(*SITE_COLUMNS)
+
+
+def store_sites(conn: sqlite3.Connection, upload_id: str, path: Path) -> int:
+    """
+    Parse + validate the CSV batch by batch into the sites table. Raises
+    CsvValidationError (nothing is kept) if any row is invalid. Caller commits.
+    """
+    conn.execute("DELETE FROM sites WHERE upload_id=?", (upload_id,))
+    seq = 0
+    try:
+        for lines, batch in iter_numbered_site_batches(path):
+            conn.executemany(
+                _INSERT,
+                [(upload_id, seq + i, line, *_values(row)) for i, (line, row) in enumerate(zip(lines, batch))],
+            )
+            seq += len(batch)
+    except Exception:
+        conn.rollback()
+        raise
+    return seq
+
+
+def _where(upload_id: str, site_codes: Optional[Iterable[str]], states: Optional[Iterable[str]]):
+    clauses, params = ["upload_id=?"], [upload_id]
+    for column, values in (("site_code", site_codes), ("state", states)):
+        if values is None:
+            continue
+        # stored values are upper-cased by SiteRow's validators
+        values = [v.strip().upper() for v in values]
+        clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+    return " AND ".join(clauses), params
+
+
+def load_sites(
+    conn: sqlite3.Connection,
+    upload_id: str,
+    site_codes: Optional[Iterable[str]] = None,
+    states: Optional[Iterable[str]] = None,
+) -> List[SiteRow]:
+    """
+    Stored rows in CSV order, optionally only the given site codes / states.
+    Raises CsvValidationError listing the rows that no longer validate (e.g. the
+    schema changed since upload) rather than leaving them out.
+    """
+    where, params = _where(upload_id, site_codes, states)
+    cur = conn.execute(f"SELECT seq, line, {', '.join(SITE_COLUMNS)} FROM sites WHERE {where} ORDER BY seq", params)
+    stored = cur.fetchall()
+    rows, errors = validate_site_rows(
+        [dict(zip(SITE_COLUMNS, r[2:])) for r in stored],
+        # older uploads have no line: seq + 2 is right unless the CSV had blank lines
+        [r[1] if r[1] is not None else r[0] + 2 for r in stored],
+    )
+    if errors:
+        raise CsvValidationError(f"{len(errors)} stored row(s) no longer validate; upload the CSV again", errors)
+    return rows
+
+
+def site_column(
+    conn: sqlite3.Connection,
+    upload_id: str,
+    column: str,
+    site_codes: Optional[Iterable[str]] = None,
+    states: Optional[Iterable[str]] = None,
+) -> List[Any]:
+    """One column for the matching rows, in CSV order."""
+    if column not in SITE_COLUMNS:
+        raise ValueError(f"unknown site column '{column}'")
+    where, params = _where(upload_id, site_codes, states)
+    cur = conn.execute(f"SELECT {column} FROM sites WHERE {where} ORDER BY seq", params)
+    return [r[0] for r in cur]
+
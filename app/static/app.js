@@ -214,7 +214,13 @@ document.getElementById("planBtn").onclick = async () => {
     return `<li><b>${k}</b> create:${c.create||0} skip:${c.skip||0}</li>`;
   }).join("");
 
-  setText("planStatus", `<p class="ok">Plan built: ${planId}</p>` + (errs||warns ? `<ul>${errs}${warns}</ul>` : ""));
+  // re-plans reuse unchanged sites from the env's previous plan
+  const c = j.changes;
+  const changesHtml = c
+    ? `<p>Changed since last plan: ${c.added.length} added, ${c.changed.length} changed, ${c.removed.length} removed, ${c.unchanged_count} unchanged` +
+      ([...c.added, ...c.changed].length ? `<br/><small>${[...c.added, ...c.changed].join(", ")}</small>` : "") + `</p>`
+    : "";
+  setText("planStatus", `<p class="ok">Plan built: ${planId}</p>` + changesHtml + (errs||warns ? `<ul>${errs}${warns}</ul>` : ""));
   setText("planSummary", `<p><b>Sites:</b> ${j.plan.site_count}</p><ul>${summaryHtml}</ul>`);
   renderPlanPreview();
 };
@@ -227,21 +233,20 @@ document.getElementById("executeBtn").onclick = async () => {
     return setText("executeOut", `<p class="err">Enter passphrase before executing.</p>`);
   }
 
-  startProgressPoll(planId);
-
-  const r = await fetch("/api/execute", {
+  const r = await fetchUnlocked(passphrase, selectedEnv || "", session => fetch("/api/execute", {
     method: "POST",
     headers: {"Content-Type":"application/json"},
-    body: JSON.stringify({ plan_id: planId, passphrase })
-  });
+    body: JSON.stringify({ plan_id: planId, session })
+  }));
 
   const j = await r.json().catch(() => ({}));
-  if (!r.ok) {
-    document.getElementById("executeOut").textContent = JSON.stringify(j, null, 2);
-    return;
-  }
-
   document.getElementById("executeOut").textContent = JSON.stringify(j, null, 2);
+  if (!r.ok) return;
+
+  // execution runs as a background job; the page only reads progress
+  startProgressStream(`/api/executions/${encodeURIComponent(planId)}/stream`, j.id, (job) => {
+    document.getElementById("executeOut").textContent = JSON.stringify(job, null, 2);
+  });
 };
 
 function setPill(name, envType) {
@@ -299,6 +304,7 @@ document.getElementById("saveEnvBtn").onclick = async () => {
     return;
   }
 
+  // a new env has nothing to unlock against yet, so saving sends the passphrase itself
   const r = await fetch(`/api/envs/${encodeURIComponent(name)}?passphrase=${encodeURIComponent(passphrase)}`, {
     method: "POST",
     headers: {"Content-Type":"application/json"},
@@ -348,9 +354,9 @@ document.getElementById("envSelect").onchange = async (e) => {
     return;
   }
 
-  const r = await fetch(
-    `/api/envs/${encodeURIComponent(name)}?passphrase=${encodeURIComponent(passphrase)}`
-  );
+  const r = await fetchUnlocked(passphrase, name, session => fetch(
+    `/api/envs/${encodeURIComponent(name)}?session=${encodeURIComponent(session)}`
+  ));
 
   const j = await r.json().catch(() => ({}));
 
@@ -391,10 +397,10 @@ document.getElementById("testEnvBtn").onclick = async () => {
     return;
   }
 
-  const r = await fetch(
-    `/api/envs/test?name=${encodeURIComponent(name)}&passphrase=${encodeURIComponent(passphrase)}`,
+  const r = await fetchUnlocked(passphrase, name, session => fetch(
+    `/api/envs/test?name=${encodeURIComponent(name)}&session=${encodeURIComponent(session)}`,
     { method: "POST" }
-  );
+  ));
   
 
   if (!r.ok) {
@@ -425,38 +431,6 @@ async function maybeShowRollbackLink() {
   }
 }
 
-function startProgressPoll(planId) {
-  const box = document.getElementById("progressBox");
-  const fill = document.getElementById("progressFill");
-  const text = document.getElementById("progressText");
-
-  box.classList.remove("hidden");
-
-  const timer = setInterval(async () => {
-    const res = await fetch(`/api/executions/${planId}`);
-    const data = await res.json();
-
-    const total = data.total_steps || 1;
-    const done = data.completed_steps || 0;
-    const pct = Math.floor((done / total) * 100);
-
-    fill.style.width = pct + "%";
-
-    if (data.current_step) {
-      text.textContent =
-        `${done} / ${total} — ${data.current_step.type}: ${data.current_step.name}`;
-    } else {
-      text.textContent = `${done} / ${total}`;
-    }
-
-    if (data.status !== "IN_PROGRESS") {
-      clearInterval(timer);
-      fill.style.width = "100%";
-      text.textContent = "Completed";
-    }
-  }, 750);
-}
-
 
 // initial load
 refreshEnvDropdown().then(() => {
@@ -93,10 +93,10 @@ testEnvBtn.addEventListener("click", async () => {
   statusEl.textContent = "Testing connection…";
 
   try {
-    const res = await fetch(
-      `/api/envs/test?name=${encodeURIComponent(currentEnv)}&passphrase=${encodeURIComponent(passphrase)}`,
+    const res = await fetchUnlocked(passphrase, currentEnv, session => fetch(
+      `/api/envs/test?name=${encodeURIComponent(currentEnv)}&session=${encodeURIComponent(session)}`,
       { method: "POST" }
-    );
+    ));
 
     const data = await res.json();
 
@@ -249,14 +249,14 @@ verifyBtn.addEventListener("click", async () => {
   const passphrase = passphraseInput.value.trim();
   if (!passphrase) return;
 
-  const res = await fetch(
+  const res = await fetchUnlocked(passphrase, currentEnv, session => fetch(
     `/api/dialplans/${encodeURIComponent(currentEnv)}/verify-globals`,
     {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ passphrase })
+      body: JSON.stringify({ session })
     }
-  );
+  ));
 
   const data = await res.json();
 
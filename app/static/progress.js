@@ -0,0 +1,73 @@
+// Job progress shared by the execute and rollback pages: startProgressStream()
+// follows a job's journal over server-sent events and drives #progressBox.
+
+const JOB_DONE = ["SUCCEEDED", "FAILED", "CANCELLED", "INTERRUPTED"];
+
+// onFinish(job), if given, receives the finished job from /api/jobs/{id}
+function startProgressStream(url, jobId, onFinish) {
+  const box = document.getElementById("progressBox");
+  const fill = document.getElementById("progressFill");
+  const text = document.getElementById("progressText");
+
+  box.classList.remove("hidden");
+  text.textContent = "Queued…";
+
+  // server pushes journal records as they are written; no polling
+  const source = new EventSource(url);
+  let total = 1;
+  let done = 0;
+
+  const render = (step) => {
+    fill.style.width = Math.floor((done / total) * 100) + "%";
+    text.textContent = step
+      ? `${done} / ${total} — ${step.type}: ${step.name}`
+      : `${done} / ${total}`;
+  };
+
+  const finish = (status) => {
+    source.close();
+    fill.style.width = "100%";
+    text.textContent = status === "SUCCESS" || status === "SUCCEEDED" ? "Completed" : `Done (${status})`;
+    if (!onFinish) return;
+    fetch(`/api/jobs/${jobId}`)
+      .then((r) => r.json())
+      .then(onFinish)
+      .catch(() => {});
+  };
+
+  source.addEventListener("snapshot", async (e) => {
+    const data = JSON.parse(e.data);
+    total = data.total_steps || 1;
+    done = data.completed_steps || 0;
+    render(data.current_step);
+
+    // the job may already have ended before we subscribed
+    const res = await fetch(`/api/jobs/${jobId}`);
+    const job = res.ok ? await res.json() : {};
+    if (JOB_DONE.includes(job.status)) finish(job.status);
+  });
+
+  source.addEventListener("start", (e) => {
+    const data = JSON.parse(e.data);
+    total = (data.header && data.header.total_steps) || 1;
+    done = 0;
+    render(null);
+  });
+
+  source.addEventListener("resume", (e) => {
+    const data = JSON.parse(e.data);
+    total = (data.header && data.header.total_steps) || total;
+    done = data.completed_steps || 0;
+    render(null);
+  });
+
+  source.addEventListener("step", (e) => render(JSON.parse(e.data).current_step));
+
+  source.addEventListener("result", (e) => {
+    done = JSON.parse(e.data).completed_steps || 0;
+    render(null);
+  });
+
+  source.addEventListener("finish", (e) => finish(JSON.parse(e.data).status));
+  source.addEventListener("job_done", (e) => finish(JSON.parse(e.data).job.status));
+}
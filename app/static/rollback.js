@@ -145,43 +145,6 @@ function renderRollbackPreview() {
   }
 }
 
-function startProgressPoll(url) {
-  const box = document.getElementById("progressBox");
-  const fill = document.getElementById("progressFill");
-  const text = document.getElementById("progressText");
-
-  box.classList.remove("hidden");
-
-  const timer = setInterval(async () => {
-    const res = await fetch(url);
-
-    if (!res.ok) {
-      text.textContent = `Waiting for status... (${res.status})`;
-      return; // DON'T force complete
-    }
-
-    const data = await res.json();
-
-    const total = data.total_steps || 1;
-    const done = data.completed_steps || 0;
-    const pct = Math.floor((done / total) * 100);
-
-    fill.style.width = pct + "%";
-
-    if (data.current_step) {
-      text.textContent =
-        `${done} / ${total} — ${data.current_step.type}: ${data.current_step.name}`;
-    } else {
-      text.textContent = `${done} / ${total}`;
-    }
-
-    if (data.status && data.status !== "IN_PROGRESS") {
-      clearInterval(timer);
-      fill.style.width = "100%";
-      text.textContent = data.status === "SUCCESS" ? "Completed" : `Done (${data.status})`;
-    }
-  }, 750);
-}
 
 /* =========================
    Preview rollback (SAFE)
@@ -243,18 +206,16 @@ if (!passphrase) {
   return;
 }
 
-  startProgressPoll(`/api/rollback/${encodeURIComponent(planId)}/status`);
-
-  const res = await fetch("/api/rollback", {
+  const res = await fetchUnlocked(passphrase, envName, session => fetch("/api/rollback", {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({
       plan_id: planId,
       env_name: envName,
-      passphrase: passphrase,
+      session: session,
       apply: true
     })
-  });
+  }));
 
   const raw = await res.text();   // 👈 ALWAYS read as text first
   console.log("RAW ROLLBACK RESPONSE:", raw);
@@ -272,6 +233,12 @@ if (!passphrase) {
   const outEl = document.getElementById("executeOut");
   outEl.textContent = output;
   outEl.scrollTop = outEl.scrollHeight;
+
+  // rollback runs as a background job; the page only reads progress
+  if (res.ok) {
+    const job = JSON.parse(raw);
+    startProgressStream(`/api/rollback/${encodeURIComponent(planId)}/stream`, job.id);
+  }
 }
 
 document.addEventListener("DOMContentLoaded", () => {
@@ -316,10 +283,10 @@ document.addEventListener("DOMContentLoaded", () => {
     statusEl.textContent = "Testing…";
 
     try {
-      const res = await fetch(
-        `/api/envs/test?name=${encodeURIComponent(envName)}&passphrase=${encodeURIComponent(passphrase)}`,
+      const res = await fetchUnlocked(passphrase, envName, session => fetch(
+        `/api/envs/test?name=${encodeURIComponent(envName)}&session=${encodeURIComponent(session)}`,
         { method: "POST" }
-      );
+      ));
 
       const data = await res.json();
 
@@ -0,0 +1,44 @@
+// Unlock session shared by every page: unlockSession() and fetchUnlocked()
+// are loaded before the page script, which calls them.
+
+// The passphrase is sent once; the server keeps the derived key behind a session token
+let unlockState = null; // { passphrase, session, expiresAt }
+
+async function unlockSession(passphrase, envName) {
+  if (unlockState && unlockState.passphrase === passphrase && Date.now() < unlockState.expiresAt - 10000) {
+    return unlockState.session;
+  }
+  const r = await fetch("/api/unlock", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ passphrase, env_name: envName })
+  });
+  const j = await r.json().catch(() => ({}));
+  if (!r.ok) throw new Error(j.detail || "Unlock failed (wrong passphrase?)");
+  unlockState = { passphrase, session: j.session, expiresAt: Date.parse(j.expires_at) };
+  return j.session;
+}
+
+// request(session) -> fetch(...); unlock errors come back as a 403 response
+async function fetchUnlocked(passphrase, envName, request) {
+  try {
+    let r = await request(await unlockSession(passphrase, envName));
+    if (r.status === 401) {
+      // expired or locked server-side: unlock again once
+      unlockState = null;
+      r = await request(await unlockSession(passphrase, envName));
+    }
+    return r;
+  } catch (e) {
+    return new Response(JSON.stringify({ detail: e.message }), {
+      status: 403,
+      headers: { "Content-Type": "application/json" }
+    });
+  }
+}
+
+window.addEventListener("pagehide", () => {
+  if (!unlockState) return;
+  const body = new Blob([JSON.stringify({ session: unlockState.session })], { type: "application/json" });
+  navigator.sendBeacon("/api/lock", body);
+});
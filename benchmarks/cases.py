@@ -0,0 +1,223 @@
+from __future__ import annotations
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.data import make_rows, naming_profile, write_csv
+from benchmarks.harness import Stopwatch, latency_stats
+
+# Each case returns {"throughput", "unit", "latency", ...}; run.py adds id and peak RSS.
+
+PLANNER_SIZES = {"quick": [10, 100, 1_000], "full": [10, 100, 1_000, 10_000, 100_000]}
+CSV_SIZES = {"quick": [1_000], "full": [1_000, 10_000, 100_000]}
+VALIDATION_SIZES = {"quick": [10_000], "full": [10_000, 100_000]}
+EXECUTOR_SITES = {"quick": [5], "full": [10, 50]}
+EXECUTOR_WORKERS = {"quick": [1, 0], "full": [1, 8, 0]}  # 0 = adaptive
+
+# "realistic" AXL: reads ~15ms, writes ~40ms with a long tail, publisher saturates at 8
+SIM_READ_LATENCY = "lognormal:15:0.4"
+SIM_WRITE_LATENCY = "lognormal:40:0.5"
+SIM_CAPACITY = 8
+
+
+def _repeats(n: int) -> int:
+    return max(3, min(30, 20_000 // max(n, 1)))
+
+
+def bench_planner(sites: int, dialplan: bool) -> dict:
+    from app.planner import build_plan
+
+    rows = make_rows(sites)
+    naming = naming_profile(dialplan)
+
+    samples = []
+    objects = 0
+    for _ in range(_repeats(sites)):
+        with Stopwatch() as sw:
+            result = build_plan(rows, naming, org="BEN", env_name="bench")
+        samples.append(sw.seconds)
+        objects = sum(len(s["objects"]) for s in result.plan["sites"])
+
+    best = min(samples)
+    return {
+        "throughput": round(sites / best, 1),
+        "unit": "sites",
+        "objects": objects,
+        "latency": latency_stats(samples),
+    }
+
+
+def bench_csv(rows: int) -> dict:
+    from app.main import parse_site_rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_csv(Path(tmp) / "sites.csv", rows)
+        samples = []
+        for _ in range(_repeats(rows)):
+            with Stopwatch() as sw:
+                parsed = parse_site_rows(path)
+            samples.append(sw.seconds)
+        size = path.stat().st_size
+
+    assert len(parsed) == rows
+    return {
+        "throughput": round(rows / min(samples), 1),
+        "unit": "rows",
+        "csv_bytes": size,
+        "latency": latency_stats(samples),
+    }
+
+
+def bench_validation(rows: int, mode: str) -> dict:
+    """SiteRow validation alone: one SiteRow(**record) per row (loop) vs one bulk pass."""
+    from app.csv_schema import SiteRow, validate_site_rows
+    from benchmarks.data import site_record
+
+    records = [site_record(i) for i in range(rows)]
+    samples = []
+    for _ in range(_repeats(rows)):
+        with Stopwatch() as sw:
+            if mode == "loop":
+                out = [SiteRow(**r) for r in records]
+            else:
+                out, _ = validate_site_rows(records)
+        samples.append(sw.seconds)
+
+    assert len(out) == rows
+    return {
+        "throughput": round(rows / min(samples), 1),
+        "unit": "rows",
+        "latency": latency_stats(samples),
+    }
+
+
+def _simulated_run(sites: int):
+    """Simulator + client + plan for an executor/rollback case."""
+    from app.integrations.axl_simulator import AxlSimulator, SimulatorConfig
+    from app.integrations.ucm_axl import UcmAxlClient
+    from app.planner import build_plan
+
+    sim = AxlSimulator(SimulatorConfig(
+        read_latency=SIM_READ_LATENCY,
+        write_latency=SIM_WRITE_LATENCY,
+        capacity=SIM_CAPACITY,
+        seed=7,
+    )).start()
+    # globals the demo dialplan references are expected to exist already
+    sim.store.seed("partition", (naming_profile(True).dialplan.get("globals") or {}).get("partitions", {}).values())
+
+    client = UcmAxlClient(sim.url, "bench", "bench")
+    plan = build_plan(make_rows(sites), naming_profile(True), org="BEN", env_name=f"bench-{sites}").plan
+    return sim, client, plan
+
+
+def bench_execute(sites: int, workers: int) -> dict:
+    from app import executor
+
+    os.environ["APP_DATA_EXECUTIONS_DIR"] = tempfile.mkdtemp(prefix="bench-exec-")
+    sim, client, plan = _simulated_run(sites)
+
+    samples: List[float] = []
+    original = executor._execute_object
+
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - started)
+
+    executor._execute_object = timed
+    try:
+        with Stopwatch() as sw:
+            result = executor.execute_plan(plan, client, apply=True, workers=workers)
+    finally:
+        executor._execute_object = original
+        sim.stop()
+        client.close()
+
+    statuses: Dict[str, int] = {}
+    for r in result["results"]:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+
+    return {
+        "throughput": round(len(samples) / sw.seconds, 1),
+        "unit": "objects",
+        "seconds": round(sw.seconds, 3),
+        "statuses": statuses,
+        "axl_requests": sim.stats.requests,
+        "throttled": sim.stats.throttled,
+        "peak_in_flight": sim.stats.peak_in_flight,
+        "latency": latency_stats(samples),
+    }
+
+
+def bench_rollback(sites: int) -> dict:
+    from app import executor
+
+    os.environ["APP_DATA_EXECUTIONS_DIR"] = tempfile.mkdtemp(prefix="bench-rollback-")
+    sim, client, plan = _simulated_run(sites)
+
+    try:
+        executor.execute_plan(plan, client, apply=True, workers=0)
+
+        samples: List[float] = []
+        remove = client._remove
+
+        def timed(obj_type, name):
+            started = time.perf_counter()
+            try:
+                return remove(obj_type, name)
+            finally:
+                samples.append(time.perf_counter() - started)
+
+        client._remove = timed
+        with Stopwatch() as sw:
+            result = executor.rollback_plan(plan["plan_id"], client, apply=True)
+    finally:
+        sim.stop()
+        client.close()
+
+    return {
+        "throughput": round(len(samples) / sw.seconds, 1),
+        "unit": "objects",
+        "seconds": round(sw.seconds, 3),
+        "status": result["status"],
+        "latency": latency_stats(samples),
+    }
+
+
+def build_cases() -> Tuple[Dict[str, Tuple[Callable, dict]], Dict[str, List[str]]]:
+    """(case id -> (fn, kwargs), profile -> ordered case ids)."""
+    cases: Dict[str, Tuple[Callable, dict]] = {}
+    profiles: Dict[str, List[str]] = {}
+
+    for profile in ("quick", "full"):
+        ids = []
+        for n in PLANNER_SIZES[profile]:
+            for dialplan in (False, True):
+                cid = f"planner/sites={n}/dialplan={'yes' if dialplan else 'no'}"
+                cases[cid] = (bench_planner, {"sites": n, "dialplan": dialplan})
+                ids.append(cid)
+        for n in CSV_SIZES[profile]:
+            cid = f"csv/rows={n}"
+            cases[cid] = (bench_csv, {"rows": n})
+            ids.append(cid)
+        for n in VALIDATION_SIZES[profile]:
+            for mode in ("loop", "bulk"):
+                cid = f"validation/rows={n}/mode={mode}"
+                cases[cid] = (bench_validation, {"rows": n, "mode": mode})
+                ids.append(cid)
+        for n in EXECUTOR_SITES[profile]:
+            for w in EXECUTOR_WORKERS[profile]:
+                cid = f"execute/sites={n}/workers={'adaptive' if w == 0 else w}"
+                cases[cid] = (bench_execute, {"sites": n, "workers": w})
+                ids.append(cid)
+            cid = f"rollback/sites={n}"
+            cases[cid] = (bench_rollback, {"sites": n})
+            ids.append(cid)
+        profiles[profile] = ids
+
+    return cases, profiles
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import csv
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+
+from app.csv_schema import SiteRow
+from app.naming import NamingProfile
+
+REPO = Path(__file__).resolve().parent.parent
+NAMING_PATH = REPO / "naming.yml"
+DIALPLAN_PATH = REPO / "data" / "dialplans" / "customers" / "Demo" / "dialplan.yml"
+
+CSV_FIELDS = [
+    "site_code", "site_detail", "state", "city", "physical_location_description", "srst_ip",
+    "mrg_members", "mrgl_members", "ucm_group", "date_time_group", "softkey_template",
+    "device_mobility_group", "mobility_subnet", "mobility_mask",
+]
+
+STATES = ["PA", "IL", "NY", "CA", "TX", "OH", "WA", "FL"]
+
+
+def site_record(i: int) -> dict:
+    """One synthetic site, shaped like data/sites.csv; every site gets SRST and mobility."""
+    state = STATES[i % len(STATES)]
+    code = f"S{i:06d}"
+    return {
+        "site_code": code,
+        "site_detail": f"Site {i}, {state}",
+        "state": state,
+        "city": f"City{i}",
+        "physical_location_description": f"Site {i} Office",
+        "srst_ip": f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+        "mrg_members": "SW-MTP,SW-ANN",
+        "mrgl_members": "SITE_MRG,SW-MOH-AUDIO_UCast-MRG",
+        "ucm_group": "Default",
+        "date_time_group": f"{code}_DTG",
+        "softkey_template": "Standard User",
+        "device_mobility_group": "DMG",
+        "mobility_subnet": f"10.{(i >> 8) & 255}.{i & 255}.0",
+        "mobility_mask": "24",
+    }
+
+
+def make_rows(n: int) -> List[SiteRow]:
+    return [SiteRow(**site_record(i)) for i in range(n)]
+
+
+def write_csv(path: Path, n: int) -> Path:
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for i in range(n):
+            writer.writerow(site_record(i))
+    return path
+
+
+def naming_profile(with_dialplan: bool) -> NamingProfile:
+    data = yaml.safe_load(NAMING_PATH.read_text(encoding="utf-8"))
+    dialplan: Optional[dict] = None
+    if with_dialplan:
+        dialplan = yaml.safe_load(DIALPLAN_PATH.read_text(encoding="utf-8"))
+    return NamingProfile(data=data, dialplan=dialplan)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_stats(samples: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/max of per-step latencies, in milliseconds."""
+    return {
+        "steps": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+class Stopwatch:
+    def __enter__(self) -> "Stopwatch":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.seconds = time.perf_counter() - self.started
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(current: List[dict], baseline: List[dict], tolerance: float = 0.10) -> List[str]:
+    """Lines describing cases whose throughput dropped or p95 grew by more than tolerance."""
+    previous = {c["id"]: c for c in baseline}
+    lines = []
+    for case in current:
+        before = previous.get(case["id"])
+        if not before or "error" in case or "error" in before:
+            continue
+        tp, tp0 = case.get("throughput", 0), before.get("throughput", 0)
+        p95, p950 = case["latency"]["p95_ms"], before["latency"]["p95_ms"]
+        if tp0 and tp < tp0 * (1 - tolerance):
+            lines.append(f"{case['id']}: throughput {tp0:.1f} -> {tp:.1f} {case['unit']}/s")
+        if p950 and p95 > p950 * (1 + tolerance):
+            lines.append(f"{case['id']}: p95 {p950:.2f} -> {p95:.2f} ms")
+    return lines
@@ -0,0 +1,92 @@
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+import traceback
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.cases import build_cases
+from benchmarks.harness import compare, environment, peak_rss_mb
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def run_case(case_id: str) -> dict:
+    """Run one case in this process (peak RSS is this process's)."""
+    cases, _ = build_cases()
+    fn, kwargs = cases[case_id]
+    try:
+        out = fn(**kwargs)
+    except Exception as e:
+        out = {"error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+    return {"id": case_id, "params": kwargs, **out, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_isolated(case_id: str) -> dict:
+    """Run one case in a fresh interpreter so its peak RSS is not shared with other cases."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--case", case_id],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    lines = proc.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, ValueError):
+        return {"id": case_id, "error": f"case exited with {proc.returncode}", "stderr": proc.stderr[-2000:]}
+
+
+def _line(result: dict) -> str:
+    if "error" in result:
+        return f"{result['id']:<42} ERROR {result['error']}"
+    lat = result["latency"]
+    return (
+        f"{result['id']:<42} {result['throughput']:>12,.1f} {result['unit']}/s  "
+        f"p50 {lat['p50_ms']:>9.2f} ms  p95 {lat['p95_ms']:>9.2f} ms  rss {result['peak_rss_mb']:>7.1f} MB"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Planner / CSV / executor benchmarks")
+    parser.add_argument("--profile", choices=("quick", "full"), default="quick")
+    parser.add_argument("--filter", default="", help="only cases whose id contains this text")
+    parser.add_argument("--output", help="results JSON (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results JSON; regressions over 10%% fail the run")
+    parser.add_argument("--case", help=argparse.SUPPRESS)  # child mode
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case)))
+        return 0
+
+    _, profiles = build_cases()
+    ids = [c for c in profiles[args.profile] if args.filter in c]
+
+    results = []
+    for case_id in ids:
+        result = run_isolated(case_id)
+        results.append(result)
+        print(_line(result), flush=True)
+
+    report = {"environment": environment(), "profile": args.profile, "cases": results}
+    out = Path(args.output) if args.output else RESULTS_DIR / f"{report['environment']['timestamp'][:19].replace(':', '')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"results written to {out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["cases"]
+        regressions = compare(results, baseline)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import csv
+
+import pytest
+
+from app.db import db_connect, init_db
+from benchmarks.data import CSV_FIELDS, site_record
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh app database under tmp_path; yields a connection to it."""
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    init_db()
+    conn = db_connect()
+    yield conn
+    conn.close()
+
+
+def write_sites_csv(path, records, blank_after=()):
+    """Sites CSV with the given records; a blank line follows each index in blank_after."""
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for i, record in enumerate(records):
+            writer.writerow(record)
+            if i in blank_after:
+                fh.write("\r\n")
+    return path
+
+
+@pytest.fixture
+def sites_csv(tmp_path):
+    return lambda records, blank_after=(): write_sites_csv(tmp_path / "sites.csv", records, blank_after)
+
+
+@pytest.fixture
+def records():
+    return [site_record(i) for i in range(6)]
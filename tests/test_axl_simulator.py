@@ -0,0 +1,121 @@
+from __future__ import annotations
+import json
+
+import pytest
+
+from app import executor
+from app.integrations.axl_simulator import AxlSimulator, SimulatorConfig
+from app.integrations.ucm_axl import UcmAxlClient
+from app.journal import journal_path, read_state
+from app.planner import build_plan
+from benchmarks.data import make_rows, naming_profile
+
+SITES = 3
+
+
+@pytest.fixture
+def sim():
+    sim = AxlSimulator(SimulatorConfig(seed=1)).start()
+    # globals the demo dialplan references are expected to exist already
+    globals_ = (naming_profile(True).dialplan.get("globals") or {}).get("partitions", {})
+    sim.store.seed("partition", globals_.values())
+    yield sim
+    sim.stop()
+
+
+@pytest.fixture
+def client(sim):
+    client = UcmAxlClient(sim.url, "test", "test")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def plan(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_EXECUTIONS_DIR", str(tmp_path))
+    return build_plan(make_rows(SITES), naming_profile(True), org="TST", env_name="sim").plan
+
+
+def _adds(sim) -> int:
+    return sum(n for op, n in sim.stats.by_op.items() if op.startswith("add"))
+
+
+def _by_status(result: dict, status: str) -> list:
+    return [r for r in result["results"] if r["status"] == status]
+
+
+def test_execute_creates_every_object(sim, client, plan):
+    result = executor.execute_plan(plan, client, apply=True, workers=0)
+
+    assert result["status"] == "SUCCESS"
+    created = _by_status(result, "CREATED")
+    assert created
+    assert not _by_status(result, "FAILED")
+    for r in created:
+        assert sim.store.get(r["type"], r["name"]) is not None
+    assert _adds(sim) == len(created)
+
+
+def test_duplicate_add_is_reported_as_exists(sim, client, plan):
+    region = next(o for s in plan["sites"] for o in s["objects"] if o["type"] == "region")
+    sim.store.seed("region", [region["name"]])
+
+    # optimistic: no getXxx first, so the add is rejected as a duplicate
+    result = executor.execute_plan(plan, client, apply=True, workers=0, optimistic=True)
+
+    assert result["status"] == "SUCCESS"
+    statuses = {(r["type"], r["name"]): r["status"] for r in result["results"]}
+    assert statuses[("region", region["name"])] == "EXISTS"
+    assert not _by_status(result, "FAILED")
+
+
+def test_resume_after_partial_journal(sim, client, plan):
+    first = executor.execute_plan(plan, client, apply=True, workers=1)
+    created = _by_status(first, "CREATED")
+
+    # simulate a crash halfway: the journal stops after half of the results, and
+    # the objects behind the lost records were never created on the cluster
+    path = journal_path(plan["plan_id"])
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    results = [i for i, rec in enumerate(records) if rec["event"] == "result"]
+    cut = results[len(results) // 2]
+    lost = [rec["result"] for rec in records[cut:] if rec["event"] == "result"]
+    path.write_text("".join(json.dumps(rec) + "\n" for rec in records[:cut]))
+    for r in lost:
+        if r["status"] == "CREATED":
+            sim.store.remove(r["type"], r["name"])
+    adds_before = _adds(sim)
+
+    resumed = executor.execute_plan(plan, client, apply=True, workers=0, resume=True)
+
+    assert resumed["status"] == "SUCCESS"
+    # only the lost objects are sent again
+    assert _adds(sim) - adds_before == sum(1 for r in lost if r["status"] == "CREATED")
+    # the journal holds the kept and the new results: every object created exactly once
+    state = read_state(plan["plan_id"])
+    assert state["status"] == "SUCCESS"
+    assert sorted((r["type"], r["name"]) for r in _by_status(state, "CREATED")) == sorted(
+        (r["type"], r["name"]) for r in created
+    )
+
+
+def test_rollback_removes_created_objects(sim, client, plan):
+    seeded = sim.store.counts()
+    executor.execute_plan(plan, client, apply=True, workers=0)
+
+    result = executor.rollback_plan(plan["plan_id"], client, apply=True)
+
+    assert result["status"] == "SUCCESS"
+    assert result["results"]
+    assert all(r["status"] == "ROLLED_BACK" for r in result["results"])
+    assert sim.store.counts() == seeded
+
+
+@pytest.mark.parametrize("count,pages", [(0, 1), (4, 1), (5, 2), (10, 3), (11, 3)])
+def test_iter_names_pages_across_boundary(sim, client, count, pages):
+    names = [f"R{i:03d}" for i in range(count)]
+    sim.store.seed("region", names)
+
+    assert sorted(client.iter_names("region", page_size=5)) == names
+    # a full page always asks for the next one; a short page ends the listing
+    assert sim.stats.by_op.get("listRegion", 0) == pages
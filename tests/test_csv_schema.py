@@ -0,0 +1,104 @@
+from __future__ import annotations
+import csv
+
+import pytest
+from pydantic import ValidationError
+
+from app.csv_schema import (
+    CsvValidationError,
+    SiteRow,
+    iter_numbered_site_batches,
+    iter_site_batches,
+    validate_site_rows,
+)
+from benchmarks.data import CSV_FIELDS
+
+
+def _bad(record: dict) -> dict:
+    return {**record, "state": "XXX"}
+
+
+def _collect(path, **kwargs) -> list:
+    return [row.site_code for batch in iter_site_batches(path, **kwargs) for row in batch]
+
+
+def test_batches_keep_csv_order(sites_csv, records):
+    path = sites_csv(records, blank_after={1})
+
+    batches = list(iter_numbered_site_batches(path, batch_size=4))
+
+    assert [len(rows) for _, rows in batches] == [4, 2]
+    # line 1 is the header; the blank line after the 2nd row shifts the rest
+    assert [n for numbers, _ in batches for n in numbers] == [2, 3, 5, 6, 7, 8]
+    assert _collect(path, batch_size=4) == [r["site_code"] for r in records]
+
+
+def test_bad_rows_are_reported_after_the_good_ones(sites_csv, records):
+    records[1], records[4] = _bad(records[1]), _bad(records[4])
+    path = sites_csv(records)
+    good = []
+
+    with pytest.raises(CsvValidationError) as e:
+        for batch in iter_site_batches(path, batch_size=2):
+            good.extend(row.site_code for row in batch)
+
+    assert good == [records[i]["site_code"] for i in (0, 2, 3, 5)]
+    assert [m.split(":")[0] for m in e.value.errors] == ["Row 3", "Row 6"]
+    assert not e.value.truncated
+
+
+def test_reading_stops_at_max_errors(sites_csv, records):
+    path = sites_csv([_bad(r) for r in records])
+
+    with pytest.raises(CsvValidationError) as e:
+        _collect(path, batch_size=2, max_errors=3)
+
+    assert e.value.truncated
+    assert [m.split(":")[0] for m in e.value.errors] == ["Row 2", "Row 3", "Row 4"]
+
+
+def test_rows_with_extra_columns(sites_csv, records):
+    path = sites_csv(records[:2])
+    with open(path, "a", encoding="utf-8", newline="") as fh:
+        csv.writer(fh).writerow([records[2].get(f, "") for f in CSV_FIELDS] + ["extra"])
+    width = len(CSV_FIELDS)
+
+    with pytest.raises(CsvValidationError) as e:
+        _collect(path)
+    assert e.value.errors == [f"Row 4: expected {width} columns, got {width + 1}"]
+
+    # column errors count towards max_errors too
+    with pytest.raises(CsvValidationError) as e:
+        _collect(path, max_errors=1)
+    assert e.value.truncated
+    assert len(e.value.errors) == 1
+
+
+def test_missing_header(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("")
+
+    with pytest.raises(CsvValidationError, match="no header"):
+        _collect(path)
+
+
+def test_validate_site_rows_keeps_good_rows(records):
+    records[2] = _bad(records[2])
+    records[4] = {**records[4], "site_code": ""}
+
+    rows, errors = validate_site_rows(records)
+
+    assert [r.site_code for r in rows] == [records[i]["site_code"] for i in (0, 1, 3, 5)]
+    assert [e.split(":")[0] for e in errors] == ["Row 4", "Row 6"]
+    # worded exactly as validating the row alone
+    with pytest.raises(ValidationError) as alone:
+        SiteRow(**records[2])
+    assert errors[0] == f"Row 4: {alone.value}"
+
+
+def test_validate_site_rows_uses_given_numbers(records):
+    rows, errors = validate_site_rows([records[0], _bad(records[1])], row_numbers=[10, 14])
+
+    assert [r.site_code for r in rows] == [records[0]["site_code"]]
+    assert [e.split(":")[0] for e in errors] == ["Row 14"]
+    assert validate_site_rows([]) == ([], [])
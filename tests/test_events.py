@@ -0,0 +1,70 @@
+from __future__ import annotations
+import asyncio
+import json
+
+from app.events import bus, sse_stream
+
+CHANNEL = "execution:test"
+
+
+async def _connected() -> bool:
+    return False
+
+
+def _collect(**kwargs) -> list:
+    async def run():
+        return [chunk async for chunk in sse_stream(CHANNEL, is_disconnected=_connected, **kwargs)]
+
+    events = []
+    for chunk in asyncio.run(run()):
+        name, data = chunk.splitlines()[:2]
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_events_the_snapshot_covers_are_dropped():
+    def snapshot():
+        # published while the snapshot is read: the first two are already in it
+        for seq in (1, 2, 3):
+            bus.publish(CHANNEL, {"event": "result", "seq": seq})
+        bus.publish(CHANNEL, {"event": "finish", "seq": 4, "status": "SUCCESS"})
+        return {"status": "RUNNING", "seq": 2}
+
+    events = _collect(snapshot=snapshot)
+
+    assert [name for name, _ in events] == ["snapshot", "result", "finish"]
+    assert events[1][1]["seq"] == 3
+
+
+def test_stream_ends_on_finish():
+    def snapshot():
+        bus.publish(CHANNEL, {"event": "finish", "seq": 1, "status": "FAILED"})
+        bus.publish(CHANNEL, {"event": "result", "seq": 2})
+        return None
+
+    events = _collect(snapshot=snapshot)
+
+    assert events[0] == ("snapshot", {"status": "NOT_STARTED"})
+    assert events[-1][0] == "finish"
+    assert len(events) == 2
+
+
+def test_finished_snapshot_ends_stream():
+    events = _collect(
+        snapshot=lambda: {"status": "SUCCESS", "seq": 5},
+        is_done=lambda state: state["status"] == "SUCCESS",
+    )
+
+    assert events == [("snapshot", {"status": "SUCCESS", "seq": 5})]
+
+
+def test_new_run_restarts_numbering():
+    def snapshot():
+        bus.publish(CHANNEL, {"event": "start", "seq": 1, "header": {"started_at": "later"}})
+        bus.publish(CHANNEL, {"event": "result", "seq": 2})
+        bus.publish(CHANNEL, {"event": "finish", "seq": 3, "status": "SUCCESS"})
+        return {"status": "FAILED", "seq": 7, "started_at": "earlier"}
+
+    events = _collect(snapshot=snapshot)
+
+    assert [name for name, _ in events] == ["snapshot", "start", "result", "finish"]
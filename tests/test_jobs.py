@@ -0,0 +1,90 @@
+from __future__ import annotations
+import threading
+import time
+
+import pytest
+
+from app.jobs import JobConflict, JobRunner
+
+
+@pytest.fixture
+def runner(db):
+    runner = JobRunner(max_workers=2, max_per_env=1)
+    yield runner
+    runner._pool.shutdown(wait=True)
+
+
+def _wait_for(runner, job_id, *statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} is {runner.get(job_id)['status']}, expected {statuses}")
+
+
+def _blocking(release: threading.Event):
+    def fn(control):
+        while not release.wait(0.01):
+            if not control.checkpoint():
+                break
+        return {"status": "SUCCESS", "results": []}
+    return fn
+
+
+def test_second_job_for_plan_is_rejected(runner):
+    release = threading.Event()
+    first = runner.submit("execute", "plan-1", "lab", _blocking(release))
+
+    with pytest.raises(JobConflict) as info:
+        runner.submit("rollback", "plan-1", "lab", _blocking(release))
+    assert info.value.job["id"] == first["id"]
+
+    release.set()
+    _wait_for(runner, first["id"], "SUCCEEDED")
+    # once the first job is done the plan accepts a new one
+    again = runner.submit("rollback", "plan-1", "lab", _blocking(release))
+    _wait_for(runner, again["id"], "SUCCEEDED")
+
+
+def test_cancel_queued_job_never_runs_it(runner):
+    release = threading.Event()
+    ran = threading.Event()
+    running = runner.submit("execute", "plan-1", "lab", _blocking(release))
+
+    def fn(control):
+        ran.set()
+        return {}
+
+    # same env: waits behind the running job
+    queued = runner.submit("execute", "plan-2", "lab", fn)
+    assert queued["status"] == "QUEUED"
+
+    assert runner.cancel(queued["id"])["status"] == "CANCELLED"
+    release.set()
+    _wait_for(runner, running["id"], "SUCCEEDED")
+    assert not ran.is_set()
+    assert runner.get(queued["id"])["status"] == "CANCELLED"
+
+
+def test_cancel_running_job(runner):
+    job = runner.submit("execute", "plan-1", "lab", _blocking(threading.Event()))
+    _wait_for(runner, job["id"], "RUNNING")
+
+    assert runner.cancel(job["id"])["status"] in ("CANCELLING", "CANCELLED")
+    _wait_for(runner, job["id"], "CANCELLED")
+
+
+def test_pause_and_resume(runner):
+    release = threading.Event()
+    job = runner.submit("execute", "plan-1", "lab", _blocking(release))
+    _wait_for(runner, job["id"], "RUNNING")
+
+    assert runner.pause(job["id"])["status"] == "PAUSED"
+    assert runner.resume(job["id"])["status"] == "RUNNING"
+
+    release.set()
+    _wait_for(runner, job["id"], "SUCCEEDED")
+    # a finished job can no longer be paused
+    assert runner.pause(job["id"])["status"] == "SUCCEEDED"
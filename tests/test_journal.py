@@ -0,0 +1,122 @@
+from __future__ import annotations
+import json
+
+import pytest
+
+from app.journal import Journal, read_state, replay, summary_path, write_json_atomic
+
+
+@pytest.fixture
+def exec_dir(tmp_path):
+    return tmp_path / "executions"
+
+
+def _result(name: str, status: str = "CREATED") -> dict:
+    return {"type": "region", "name": name, "status": status}
+
+
+def _run(exec_dir, results, finish=None) -> Journal:
+    journal = Journal("plan-1", exec_dir=exec_dir)
+    journal.start({"plan_id": "plan-1", "total_steps": len(results), "status": "RUNNING"})
+    for r in results:
+        journal.step({"type": r["type"], "name": r["name"]})
+        journal.result(r)
+    if finish:
+        journal.finish(finish)
+    else:
+        journal.close()
+    return journal
+
+
+def test_replay_rebuilds_state(exec_dir):
+    journal = _run(exec_dir, [_result("R1"), _result("R2")], finish="SUCCESS")
+
+    state = replay(journal.path)
+
+    assert state["status"] == "SUCCESS"
+    assert state["completed_steps"] == 2
+    assert [r["name"] for r in state["results"]] == ["R1", "R2"]
+    assert state["current_step"] is None
+    # seq numbers every record in order: start, 2 x (step, result), finish
+    assert state["seq"] == 6
+    seqs = [json.loads(line)["seq"] for line in journal.path.read_text().splitlines()]
+    assert seqs == list(range(1, 7))
+
+
+def test_replay_skips_torn_last_line(exec_dir):
+    journal = _run(exec_dir, [_result("R1"), _result("R2")])
+    with open(journal.path, "a", encoding="utf-8") as fh:
+        fh.write('{"event":"result","result":{"type":"region","na')
+
+    state = replay(journal.path)
+
+    assert [r["name"] for r in state["results"]] == ["R1", "R2"]
+    assert state["completed_steps"] == 2
+    assert state["seq"] == 5
+
+
+def test_replay_skips_partial_line_in_the_middle(exec_dir):
+    journal = _run(exec_dir, [_result("R1"), _result("R2")])
+    lines = journal.path.read_text().splitlines()
+    # the record for R1's result was cut short, later records are intact
+    lines[2] = lines[2][: len(lines[2]) // 2]
+    journal.path.write_text("\n".join(lines) + "\n\n")
+
+    state = replay(journal.path)
+
+    assert [r["name"] for r in state["results"]] == ["R2"]
+    assert state["seq"] == 5
+
+
+def test_replay_of_missing_journal(exec_dir):
+    assert replay(exec_dir / "nope.jsonl") is None
+    assert read_state("nope", exec_dir=exec_dir) is None
+
+
+def test_resume_continues_numbering_after_torn_line(exec_dir):
+    journal = _run(exec_dir, [_result("R1"), _result("R2", status="FAILED")])
+    with open(journal.path, "a", encoding="utf-8") as fh:
+        fh.write('{"event":"step","current')
+    previous = replay(journal.path)
+
+    resumed = Journal("plan-1", exec_dir=exec_dir)
+    resumed.resume({"plan_id": "plan-1", "total_steps": 2, "status": "RUNNING"}, 1, seq=previous["seq"])
+    resumed.step({"type": "region", "name": "R2"})
+    resumed.result(_result("R2"))
+    resumed.finish("SUCCESS")
+
+    records = []
+    for line in journal.path.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            pass  # the torn line, closed off by resume
+    seqs = [rec["seq"] for rec in records]
+    assert seqs == sorted(seqs) and len(set(seqs)) == len(seqs)
+    assert records[previous["seq"]]["event"] == "resume"
+    assert records[previous["seq"]]["seq"] == previous["seq"] + 1
+
+    state = replay(journal.path)
+    # the failed R2 from the first run is dropped by the resume record
+    assert [(r["name"], r["status"]) for r in state["results"]] == [("R1", "CREATED"), ("R2", "CREATED")]
+    assert state["completed_steps"] == 2
+    assert state["status"] == "SUCCESS"
+    assert state["seq"] == seqs[-1]
+
+
+def test_resume_of_legacy_json_run(exec_dir):
+    kept = [_result("R1"), _result("R2", status="SKIPPED")]
+    header = {"plan_id": "plan-1", "total_steps": 2, "status": "RUNNING", "results": kept}
+    write_json_atomic(summary_path("plan-1", exec_dir=exec_dir), header)
+    assert read_state("plan-1", exec_dir=exec_dir)["results"] == kept
+
+    journal = Journal("plan-1", exec_dir=exec_dir)
+    journal.resume(header, 1)
+    journal.result(_result("R3"))
+    journal.finish("SUCCESS")
+
+    state = read_state("plan-1", exec_dir=exec_dir)
+    assert [r["name"] for r in state["results"]] == ["R1", "R2", "R3"]
+    assert state["completed_steps"] == 2  # the SKIPPED result is not counted
+    # the rewritten summary no longer carries results; the journal does
+    assert "results" not in json.loads(summary_path("plan-1", exec_dir=exec_dir).read_text())
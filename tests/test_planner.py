@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from app import planner
+from app.csv_schema import SiteRow
+from app.planner import build_plan, site_fingerprint
+from benchmarks.data import make_rows, naming_profile, site_record
+
+
+def _plan(rows, previous=None):
+    return build_plan(rows, naming_profile(True), org="TST", env_name="lab", previous_plan=previous).plan
+
+
+def test_fingerprint_follows_inputs():
+    row = make_rows(1)[0]
+    fp = site_fingerprint(row, "TST", "v1")
+
+    assert site_fingerprint(make_rows(1)[0], "TST", "v1") == fp
+    assert site_fingerprint(row, "OTHER", "v1") != fp
+    assert site_fingerprint(row, "TST", "v2") != fp
+    assert site_fingerprint(row.model_copy(update={"city": "Elsewhere"}), "TST", "v1") != fp
+
+
+def test_unchanged_sites_are_reused():
+    rows = make_rows(4)
+    first = _plan(rows)
+
+    changed = SiteRow(**{**site_record(1), "city": "Elsewhere"})
+    added = make_rows(5)[4]
+    second = _plan([rows[0], changed, rows[2], added], previous=first)
+
+    changes = second["changes"]
+    assert changes["previous_plan_id"] == first["plan_id"]
+    assert changes["unchanged_count"] == 2
+    assert changes["changed"] == [changed.site_code]
+    assert changes["added"] == [added.site_code]
+    assert changes["removed"] == [rows[3].site_code]
+    # reused sites keep their objects as built by the first plan
+    assert second["sites"][0]["objects"] == first["sites"][0]["objects"]
+    assert second["sites"][2]["fingerprint"] == first["sites"][2]["fingerprint"]
+
+
+def test_planner_version_bump_rebuilds_every_site(monkeypatch):
+    rows = make_rows(3)
+    first = _plan(rows)
+
+    monkeypatch.setattr(planner, "PLANNER_VERSION", "test-bump")
+    second = _plan(rows, previous=first)
+
+    assert second["planner_version"] == "test-bump"
+    assert second["changes"]["unchanged_count"] == 0
+    assert second["changes"]["changed"] == [r.site_code for r in rows]
+    assert all(a["fingerprint"] != b["fingerprint"] for a, b in zip(first["sites"], second["sites"]))
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from app import secrets
+from app.secrets import TooManySessions, UnlockSessions
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(secrets.time, "time", lambda: now[0])
+    return now
+
+
+def test_session_expires_after_ttl(clock):
+    sessions = UnlockSessions(ttl=60, max_sessions=4)
+    session = sessions.unlock(b"k" * 32)
+
+    clock[0] += 59
+    assert sessions.key_for(session.token) == b"k" * 32
+    clock[0] += 1
+    assert sessions.key_for(session.token) is None
+    assert sessions.key_for("unknown") is None
+
+
+def test_lock_ends_session(clock):
+    sessions = UnlockSessions(ttl=60, max_sessions=4)
+    session = sessions.unlock(b"k" * 32)
+
+    assert sessions.lock(session.token)
+    assert sessions.key_for(session.token) is None
+    assert not sessions.lock(session.token)
+
+
+def test_full_table_refuses_instead_of_evicting(clock):
+    sessions = UnlockSessions(ttl=60, max_sessions=2)
+    first = sessions.unlock(b"a" * 32)
+    sessions.unlock(b"b" * 32)
+
+    with pytest.raises(TooManySessions):
+        sessions.unlock(b"c" * 32)
+    # the live sessions were left alone
+    assert sessions.key_for(first.token) == b"a" * 32
+
+
+def test_expired_sessions_free_their_slots(clock):
+    sessions = UnlockSessions(ttl=60, max_sessions=2)
+    first = sessions.unlock(b"a" * 32)
+    clock[0] += 30
+    second = sessions.unlock(b"b" * 32)
+
+    clock[0] += 30  # only the first has expired
+    third = sessions.unlock(b"c" * 32)
+
+    assert sessions.key_for(first.token) is None
+    assert sessions.key_for(second.token) == b"b" * 32
+    assert sessions.key_for(third.token) == b"c" * 32
+    with pytest.raises(TooManySessions):
+        sessions.unlock(b"d" * 32)
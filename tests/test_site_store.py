@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from app.csv_schema import CsvValidationError
+from app.site_store import load_sites, site_column, store_sites
+
+
+def test_store_and_load_in_csv_order(db, sites_csv, records):
+    assert store_sites(db, "u1", sites_csv(records)) == len(records)
+
+    rows = load_sites(db, "u1")
+
+    assert [r.site_code for r in rows] == [r["site_code"] for r in records]
+
+
+def test_load_filters_by_site_code_and_state(db, sites_csv, records):
+    store_sites(db, "u1", sites_csv(records))
+    first, second = records[0], records[1]
+
+    by_code = load_sites(db, "u1", site_codes=[first["site_code"].lower(), " " + second["site_code"]])
+    by_state = load_sites(db, "u1", states=[first["state"].lower()])
+    both = load_sites(db, "u1", site_codes=[first["site_code"]], states=[second["state"]])
+
+    assert [r.site_code for r in by_code] == [first["site_code"], second["site_code"]]
+    assert {r.state for r in by_state} == {first["state"]}
+    assert len(by_state) == sum(1 for r in records if r["state"] == first["state"])
+    assert both == []
+    assert load_sites(db, "other") == []
+
+
+def test_site_column(db, sites_csv, records):
+    store_sites(db, "u1", sites_csv(records))
+
+    assert site_column(db, "u1", "city", states=[records[2]["state"]]) == [records[2]["city"]]
+    with pytest.raises(ValueError):
+        site_column(db, "u1", "site_code; drop table sites")
+
+
+def test_invalid_stored_rows_report_their_csv_line(db, sites_csv, records):
+    # blank lines before the row must not shift the reported line
+    store_sites(db, "u1", sites_csv(records, blank_after={0, 1}))
+    db.execute("UPDATE sites SET site_code=NULL WHERE site_code=?", (records[3]["site_code"],))
+
+    with pytest.raises(CsvValidationError) as e:
+        load_sites(db, "u1")
+
+    # header is line 1, records[3] is the 4th row after two blank lines
+    assert len(e.value.errors) == 1
+    assert e.value.errors[0].startswith("Row 7:")
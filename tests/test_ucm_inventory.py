@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from app.integrations.ucm_inventory import AxlInventory, SqlExistenceOracle
+
+
+class FakeSqlClient:
+    """existing_names_sql over an in-memory cluster, matching names case-insensitively."""
+
+    def __init__(self, names):
+        self.names = set(names)
+        self.queries = []
+
+    def existing_names_sql(self, obj_type, names, chunk_size=None):
+        wanted = {n.lower() for n in names}
+        self.queries.append(sorted(wanted))
+        return {n for n in self.names if n.lower() in wanted}
+
+
+def test_inventory_ignores_case():
+    inventory = AxlInventory({"partition": ["PT-Site01", None]})
+
+    assert inventory("partition", "pt-site01")
+    assert inventory("partition", "PT-SITE01")
+    assert not inventory("partition", "PT-Site02")
+
+    inventory.add("partition", "PT-Site02")
+    assert inventory("partition", "pt-site02")
+    inventory.discard("partition", "pt-SITE01")
+    assert not inventory("partition", "PT-Site01")
+
+
+def test_inventory_falls_back_for_uncovered_types():
+    calls = []
+    inventory = AxlInventory({"region": ["R1"]}, fallback=lambda t, n: calls.append((t, n)) or True)
+
+    assert not inventory.covers("css")
+    assert inventory("css", "CSS1")
+    assert calls == [("css", "CSS1")]
+
+
+def test_sql_oracle_ignores_case():
+    client = FakeSqlClient(["PT-Site01", "O'Brien"])
+    oracle = SqlExistenceOracle(client, types=["partition"])
+
+    oracle.prefetch([("partition", "pt-site01"), ("partition", "PT-Site02"), ("partition", "o'brien")])
+
+    assert oracle("partition", "PT-SITE01")
+    assert oracle("partition", "O'BRIEN")
+    assert not oracle("partition", "pt-site02")
+    # every name was resolved by the one prefetch query, whatever its case
+    assert len(client.queries) == 1
+
+    oracle.add("partition", "PT-Site02")
+    assert oracle("partition", "pt-site02")
+    oracle.discard("partition", "pt-SITE01")
+    assert not oracle("partition", "PT-Site01")
+    assert len(client.queries) == 1
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import time
+
+import pytest
+
+from app.integrations import ucm_registry
+from app.integrations.ucm_registry import AxlClientRegistry
+
+ENV = {"cucm_url": "http://cucm.invalid", "cucm_username": "axl", "cucm_password": "secret"}
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    """No cluster: negotiation fails at once, and closed clients are recorded."""
+    closed = []
+
+    def negotiate(self):
+        raise ConnectionError("unreachable")
+
+    monkeypatch.setattr(ucm_registry.UcmAxlClient, "negotiate_version", negotiate)
+    monkeypatch.setattr(ucm_registry.UcmAxlClient, "close", lambda self: closed.append(self))
+    return closed
+
+
+def test_same_env_reuses_the_client():
+    registry = AxlClientRegistry()
+    assert registry.get("lab", ENV) is registry.get("lab", dict(ENV))
+
+
+def test_changed_credentials_rebuild_the_client(offline):
+    registry = AxlClientRegistry()
+    first = registry.get("lab", ENV)
+
+    second = registry.get("lab", {**ENV, "cucm_password": "rotated"})
+
+    assert second is not first
+    assert offline == [first]
+
+
+def test_idle_clients_are_evicted(offline):
+    registry = AxlClientRegistry(idle_timeout=0.01)
+    client = registry.get("lab", ENV)
+    time.sleep(0.02)
+
+    assert registry.evict_idle() == 1
+    assert offline == [client]
+    assert registry.get("lab", ENV) is not client
+
+
+def test_leased_client_survives_eviction_and_invalidate(offline):
+    registry = AxlClientRegistry(idle_timeout=0.01)
+
+    with registry.lease("lab", ENV) as client:
+        time.sleep(0.02)
+        assert registry.evict_idle() == 0
+        registry.invalidate("lab")
+        assert offline == []
+
+    # closed once the job is done with it
+    assert offline == [client]
+
+
+def test_failed_negotiation_backs_off(monkeypatch):
+    attempts = []
+    monkeypatch.setattr(
+        ucm_registry.UcmAxlClient, "negotiate_version", lambda self: attempts.append(1) or 1 / 0
+    )
+    registry = AxlClientRegistry(retry_after=60)
+
+    registry.get("lab", ENV)
+    registry.get("lab", ENV)
+
+    assert len(attempts) == 1
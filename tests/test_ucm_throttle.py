@@ -0,0 +1,126 @@
+from __future__ import annotations
+from http.client import RemoteDisconnected
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from app.integrations import ucm_axl
+from app.integrations.ucm_axl import UcmAxlClient
+from app.integrations.ucm_throttle import OP_READ, OP_WRITE, AdaptiveLimiter, is_retryable_error
+
+
+def _refused() -> requests.ConnectionError:
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.ConnectionError(MaxRetryError(None, "/axl/", reason))
+
+
+def _aborted() -> requests.ConnectionError:
+    reason = ProtocolError("Connection aborted.", RemoteDisconnected("closed"))
+    return requests.ConnectionError(reason)
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [_refused(), requests.exceptions.ConnectTimeout("connect timed out")],
+    ids=["refused", "connect-timeout"],
+)
+def test_writes_retry_when_no_connection_was_made(exc):
+    assert is_retryable_error(exc, OP_WRITE)
+    assert is_retryable_error(exc, OP_READ)
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [_aborted(), requests.exceptions.ReadTimeout("read timed out")],
+    ids=["aborted", "read-timeout"],
+)
+def test_writes_are_not_repeated_once_sent(exc):
+    assert not is_retryable_error(exc, OP_WRITE)
+    assert is_retryable_error(exc, OP_READ)
+
+
+class _Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = ""
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _Session:
+    def __init__(self, statuses):
+        self.responses = [_Response(s) for s in statuses]
+        self.sent = []
+
+    def post(self, url, **kwargs):
+        r = self.responses[len(self.sent)]
+        self.sent.append(r)
+        return r
+
+
+def test_throttled_responses_are_closed_before_retry(monkeypatch):
+    monkeypatch.setattr(ucm_axl.time, "sleep", lambda s: None)
+    client = UcmAxlClient("https://cucm.invalid", "test", "test")
+    client.session.close()
+    client.session = _Session([503, 503, 200])
+
+    r = client._post("<body/>", op=OP_WRITE)
+
+    assert r.status_code == 200 and not r.closed
+    assert [x.closed for x in client.session.sent] == [True, True, False]
+
+
+def _window(limiter: AdaptiveLimiter, latency: float, congested: bool = False) -> None:
+    """One full window of calls, keeping `limit` requests in flight."""
+    calls = max(limiter.window, limiter.limit)
+    while calls:
+        batch = min(limiter.limit, calls)
+        for _ in range(batch):
+            assert limiter.acquire()
+        for _ in range(batch):
+            limiter.release(latency, congested=congested)
+        calls -= batch
+
+
+def test_limiter_grows_while_healthy_and_saturated():
+    limiter = AdaptiveLimiter(max_limit=4, min_limit=1, initial=2, window=4)
+
+    _window(limiter, 0.1)
+    assert limiter.limit == 3
+    _window(limiter, 0.1)
+    _window(limiter, 0.1)
+    assert limiter.limit == 4  # capped at max_limit
+
+
+def test_limiter_does_not_grow_when_underused():
+    limiter = AdaptiveLimiter(max_limit=8, min_limit=1, initial=4, window=4)
+
+    for _ in range(4):
+        assert limiter.acquire()
+        limiter.release(0.1)
+
+    assert limiter.limit == 4
+
+
+def test_limiter_halves_on_congestion():
+    limiter = AdaptiveLimiter(max_limit=16, min_limit=1, initial=8, window=8)
+
+    _window(limiter, 0.1, congested=True)
+    assert limiter.limit == 4
+    _window(limiter, 0.1, congested=True)
+    _window(limiter, 0.1, congested=True)
+    _window(limiter, 0.1, congested=True)
+    assert limiter.limit == 1  # never below min_limit
+
+
+def test_limiter_backs_off_when_latency_rises():
+    limiter = AdaptiveLimiter(max_limit=16, min_limit=1, initial=8, window=8, tolerance=1.5)
+
+    _window(limiter, 0.1)
+    assert limiter.limit == 9
+    _window(limiter, 0.5)
+    assert limiter.limit == 6  # cut by a quarter